@@ -4,6 +4,7 @@ from pathlib import Path
 # ---------- Paths ----------
 BASE_DIR = Path(__file__).resolve().parent.parent
 TEMP_DIR = BASE_DIR / "output" / "tmp"
+OUTPUT_DIR = Path("/app/output")   # data/ (stored issues) and tmp/ of each run
 
 # ---------- Redis ----------
 REDIS_HOST = "newspaper_redis"   # docker-compose service name
@@ -11,9 +12,32 @@ REDIS_PORT = 6379
 
 # ---------- Download / Dedup ----------
 DOWNLOAD_TTL_DAYS = 2
+CONTENT_INDEX_TTL_DAYS = 30      # sha256 -> stored objects (cross-agency dedup)
+HTTP_VALIDATOR_TTL_DAYS = 7      # ETag / Last-Modified of homepages and listings
+UPLOAD_MANIFEST_TTL_DAYS = 30    # sha256 -> URI of the object holding that content
 
 # ---------- Scheduler ----------
 RUN_HOURS = "0,6,12,18"
+# Daemon mode (python -m app.main daemon): crontab expression per agency,
+# e.g. {"pishkhan": "*/30 5-9 * * *"}; unlisted agencies run at RUN_HOURS
+AGENCY_CRON = {}
+SCHEDULER_TIMEZONE = "UTC"
+SCHEDULER_RUN_ON_START = True            # run every agency once at startup
+SCHEDULER_MISFIRE_GRACE_SECONDS = 15 * 60  # a run starting later than this is dropped
+
+# ---------- Adaptive polling (daemon) ----------
+# "cron":     run each agency on AGENCY_CRON / RUN_HOURS
+# "adaptive": poll often inside the time-of-day window an agency's issues
+#             usually appear in (learned from past downloads), rarely
+#             outside it. Polling an unchanged site costs one conditional GET.
+SCHEDULER_MODE = "cron"
+POLL_FAST_SECONDS = 5 * 60           # inside the release window
+POLL_SLOW_SECONDS = 60 * 60          # outside it, and while no window is learned
+RELEASE_HISTORY_SIZE = 60            # release times kept per agency
+RELEASE_MIN_SAMPLES = 5              # releases needed before a window is used
+RELEASE_WINDOW_COVERAGE = 0.8        # share of past releases the window must hold
+RELEASE_WINDOW_MARGIN_MINUTES = 30   # widened by this on both sides
+RELEASE_WINDOW_MAX_MINUTES = 4 * 60  # wider (margins included) means no usable window
 
 # ---------- S3 / MinIO ----------
 S3_ENDPOINT = "minio:9000"
@@ -21,3 +45,87 @@ S3_ACCESS_KEY = "minioadmin"
 S3_SECRET_KEY = "minioadmin"
 S3_BUCKET = "newspapers"
 S3_SECURE = False
+# Known region skips the bucket-location lookup before the first request
+S3_REGION = "us-east-1"
+# Objects larger than one part go multipart; parts upload in parallel
+S3_PART_SIZE = 8 * 1024 * 1024  # >= 5 MiB (S3 minimum)
+S3_PARALLEL_PARTS = 4
+# Files of one issue (PDF, cover, derivatives) uploaded concurrently
+S3_UPLOAD_WORKERS = 4
+# Skip uploading content MinIO already holds, reusing the stored object
+# (remote keys are timestamped, so a retry or a re-processed issue gets a
+# new key for the same bytes):
+#   "off"      always upload
+#   "manifest" trust the Redis manifest of sha256 -> URI (no S3 request)
+#   "stat"     confirm with that object's sha256 metadata (one HEAD); the
+#              requested key itself is checked when the manifest has none
+UPLOAD_SKIP_MODE = "manifest"
+
+# ---------- Upload outbox ----------
+# "inline": upload to MinIO during the scrape
+# "outbox": store locally, queue the upload in Redis, a background
+#           drainer uploads and patches the stored remote URIs
+UPLOAD_MODE = "inline"
+OUTBOX_BATCH_SIZE = 20
+OUTBOX_POLL_SECONDS = 5
+OUTBOX_LEASE_SECONDS = 15 * 60       # claimed job returns to the queue after this
+OUTBOX_BACKOFF_SECONDS = 30          # doubled per failed attempt
+OUTBOX_BACKOFF_MAX_SECONDS = 60 * 60
+OUTBOX_FINAL_DRAIN_SECONDS = 120     # main() keeps draining this long before exit
+
+# ---------- HTTP ----------
+HTTP_RETRY_TOTAL = 3             # same policy as the requests Retry adapter
+HTTP_RETRY_BACKOFF = 1.5
+HTTP_MAX_CONNECTIONS = 100       # async engine: total in-flight requests
+HTTP_MAX_PER_HOST = 8            # async engine: in-flight requests per host
+
+# ---------- Scrapers ----------
+PAGE_CACHE_TTL_SECONDS = 600     # per-run memo of fetched + parsed pages
+
+# ---------- Pishkhan ----------
+PISHKHAN_RESOLVE_WORKERS = 8     # concurrent viewer -> PDF url resolutions
+PISHKHAN_PER_HOST_LIMIT = 4      # max in-flight requests per upstream host
+PISHKHAN_HTTP_ENGINE = "threads"  # "threads" (requests) or "aiohttp"
+
+# download -> cover -> upload pipeline (workers per stage, bounded queues)
+PISHKHAN_FETCH_WORKERS = 4
+PISHKHAN_RENDER_WORKERS = 2      # threads waiting on the cover process pool
+PISHKHAN_UPLOAD_WORKERS = 2
+PISHKHAN_QUEUE_SIZE = 4          # max items waiting in front of each stage
+PISHKHAN_RECORD_BATCH = 10       # stored papers recorded per Redis round trip
+
+# ---------- Covers ----------
+COVER_RENDER_WORKERS = 2         # render processes; 0 = render on the calling thread
+COVER_DPI = 200
+# Extra sizes cut from the same rasterization as the full-size PNG.
+# Saved next to it as {agency}-{ts}-{name}.{format}
+COVER_DERIVATIVES = [
+    {"name": "600w", "width": 600, "format": "webp", "quality": 80},
+    {"name": "200w", "width": 200, "format": "webp", "quality": 75},
+]
+
+# ---------- PDF merge ----------
+PDF_MERGE_ENGINE = "pypdf2"      # "pypdf2", or "pymupdf" (fitz insert_pdf, opt-in)
+PDF_MERGE_GARBAGE = 0            # pymupdf: 0 = off, 1..4 = garbage collection level
+PDF_MERGE_DEFLATE = False        # pymupdf: compress uncompressed streams on write
+
+# ---------- Execution ----------
+EXECUTION_MODE = "sequential"    # "sequential", "thread" or "process"
+AGENCY_DEADLINE_SECONDS = {      # wall-clock budget per agency (thread/process)
+    "etemad": 15 * 60,
+    "iran": 15 * 60,
+    "pishkhan": 60 * 60,
+}
+DEFAULT_AGENCY_DEADLINE_SECONDS = 30 * 60
+
+# ---------- Downloads ----------
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_MAX_BYTES = 200 * 1024 * 1024   # refuse anything bigger (per file)
+PARTIAL_DIR = BASE_DIR / "output" / "partial"   # resumable downloads (kept across runs)
+PARTIAL_MAX_AGE_HOURS = 48
+
+# ---------- Metrics ----------
+METRICS_ENABLED = True
+METRICS_DIR = BASE_DIR / "output" / "metrics"   # runs/run-*.json + textfile
+METRICS_TEXTFILE = "scraper.prom"               # for node_exporter's textfile collector
+METRICS_KEEP_REPORTS = 500                      # newest per-run JSON reports kept
@@ -0,0 +1,180 @@
+import signal
+import threading
+from datetime import datetime, timezone
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, JobSubmissionEvent
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.base import BaseTrigger
+from apscheduler.triggers.cron import CronTrigger
+
+from app import config
+from app.main import _start_outbox, agency_cron, run_agency
+from app.scrapers import agencies, get_scraper
+from app.services.clients import get_redis, get_storage
+from app.services.image_builder import shutdown_cover_renderer
+from app.services.release_schedule import (
+    format_window,
+    learn_window,
+    next_poll,
+    schedule_timezone,
+)
+from app.utils.logger import logger
+from app.utils.metrics import metrics
+
+
+# --------------------------------------------------
+# Long-running scheduler (python -m app.main daemon)
+# --------------------------------------------------
+# One cron job per agency, run on a thread of this process so HTTP
+# sessions, the Redis / MinIO pools, the cover render pool and the heavy
+# imports stay warm between runs. A run that is still going when its
+# next slot comes up makes the scheduler skip that slot (max_instances=1);
+# slots missed while the daemon was busy or down collapse into one run
+# (coalesce). Agency deadlines are not enforced here: threads cannot be
+# killed, use EXECUTION_MODE "process" with cron for that.
+#
+# With SCHEDULER_MODE "adaptive" the cron job is replaced by polling
+# around each agency's usual release time (ReleaseWindowTrigger). A poll
+# is an ordinary run: on an unchanged site it stops after the conditional
+# GET of the issue id source.
+
+
+def _scheduled_run(agency: str) -> str:
+    # Reports keep the latest run of every agency; the window restarts here
+    metrics.reset(agency)
+    status = run_agency(agency)
+    metrics.write_reports()
+    return status
+
+
+def _on_skipped(event: JobSubmissionEvent) -> None:
+    logger.warning("Previous run still in progress, skipped: %s", event.job_id)
+    with metrics.agency(event.job_id):
+        metrics.inc("runs_skipped")
+
+
+class ReleaseWindowTrigger(BaseTrigger):
+    """
+    Fires every POLL_FAST_SECONDS inside the agency's release window and
+    every POLL_SLOW_SECONDS outside it. The window is re-learned from the
+    release history before every fire, so it follows the agency when its
+    publication time drifts.
+    """
+
+    def __init__(self, agency: str):
+        self.agency = agency
+        self.timezone = schedule_timezone()
+        self.window = None
+
+    def _learn(self):
+        try:
+            history = get_redis().release_history(self.agency)
+        except Exception:
+            # Keep the last window (the error is logged by RedisClient)
+            return self.window
+
+        window = learn_window(history, self.timezone)
+        if window != self.window:
+            logger.info(
+                "Release window of %s: %s (%d releases)",
+                self.agency,
+                format_window(window),
+                len(history),
+            )
+        self.window = window
+        return window
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        return next_poll(now, self._learn(), self.timezone)
+
+    def __str__(self) -> str:
+        return f"release window {format_window(self.window)}"
+
+
+def _trigger(agency: str) -> BaseTrigger:
+    if config.SCHEDULER_MODE == "adaptive":
+        return ReleaseWindowTrigger(agency)
+    if config.SCHEDULER_MODE == "cron":
+        return CronTrigger.from_crontab(
+            agency_cron(agency),
+            timezone=config.SCHEDULER_TIMEZONE,
+        )
+    raise ValueError(f"Unknown SCHEDULER_MODE: {config.SCHEDULER_MODE}")
+
+
+def _warm_up() -> None:
+    """
+    Import the scrapers, connect to Redis and build the storage client
+    now, so a broken backend shows up at startup. Runs retry on their
+    own if this fails.
+    """
+    try:
+        for agency in agencies():
+            get_scraper(agency)
+        get_redis()
+        get_storage()
+    except Exception:
+        logger.exception("Backends unavailable at startup, runs will retry")
+
+
+def build_scheduler(names: list[str]) -> BackgroundScheduler:
+    scheduler = BackgroundScheduler(
+        executors={"default": ThreadPoolExecutor(max_workers=len(names))},
+        job_defaults={
+            "max_instances": 1,
+            "coalesce": True,
+            "misfire_grace_time": config.SCHEDULER_MISFIRE_GRACE_SECONDS,
+        },
+        timezone=config.SCHEDULER_TIMEZONE,
+    )
+    scheduler.add_listener(_on_skipped, EVENT_JOB_MAX_INSTANCES)
+
+    for agency in names:
+        options = {}
+        if config.SCHEDULER_RUN_ON_START:
+            options["next_run_time"] = datetime.now(timezone.utc)
+
+        scheduler.add_job(
+            _scheduled_run,
+            _trigger(agency),
+            args=(agency,),
+            id=agency,
+            name=f"scrape-{agency}",
+            **options,
+        )
+
+    return scheduler
+
+
+def serve() -> int:
+    """
+    Run until SIGTERM / SIGINT. A running scrape is allowed to finish
+    before the process exits.
+    """
+    stop = threading.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, lambda *_: stop.set())
+
+    logger.info("Starting scraper daemon")
+    metrics.reset()
+    _warm_up()
+
+    scheduler = build_scheduler(agencies())
+    outbox = _start_outbox()
+    scheduler.start()
+
+    for job in scheduler.get_jobs():
+        logger.info("Scheduled %s: %s (next run %s)", job.id, job.trigger, job.next_run_time)
+
+    try:
+        stop.wait()
+    finally:
+        logger.info("Stopping scraper daemon")
+        scheduler.shutdown(wait=True)
+        if outbox is not None:
+            outbox.stop(drain_timeout=config.OUTBOX_FINAL_DRAIN_SECONDS)
+        shutdown_cover_renderer()
+        metrics.write_reports()
+
+    return 0
@@ -1,35 +1,340 @@
-from pathlib import Path
-from app.runner import run
-from app.scrapers.pishkhan import PishkhanScraper
-from app.scrapers.etemad import EtemadScraper
-from app.scrapers.iran import IranScraper
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from app import config
+from app.scrapers import agencies, get_scraper
 from app.utils.logger import logger
+from app.utils.metrics import metrics
+
+# Only light modules are imported here: the runner, the scrapers and
+# their libraries (PyMuPDF, PyPDF2, minio, redis, bs4 ...) load when an
+# agency actually runs, so `status` and `--help` start instantly.
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+
 
+def _deadline(agency: str) -> float:
+    return config.AGENCY_DEADLINE_SECONDS.get(
+        agency,
+        config.DEFAULT_AGENCY_DEADLINE_SECONDS,
+    )
 
-BASE_DIR = Path("/app/output")
 
-SCRAPERS = [
-    ("etemad", EtemadScraper()),
-    ("iran",IranScraper()),
-    ("pishkhan",PishkhanScraper())
+def agency_cron(agency: str) -> str:
+    return config.AGENCY_CRON.get(agency, f"0 {config.RUN_HOURS} * * *")
 
-]
 
+def _schedule(agency: str, redis=None) -> str:
+    if config.SCHEDULER_MODE != "adaptive":
+        return agency_cron(agency)
+    if redis is None:
+        return "adaptive"
 
-def main():
-    logger.info("Starting scraper runner")
+    try:
+        from app.services.release_schedule import (
+            format_window,
+            learn_window,
+            schedule_timezone,
+        )
 
-    for agency, scraper in SCRAPERS:
-        scraper_name = scraper.__class__.__name__
+        history = redis.release_history(agency)
+        return f"adaptive {format_window(learn_window(history, schedule_timezone()))}"
+    except Exception:
+        return "adaptive"
+
+
+def run_agency(agency: str) -> str:
+    """
+    Run one scraper, isolating its failures from the other agencies.
+    """
+    scraper_name = agency
+    with metrics.agency(agency), metrics.timer("run"):
         try:
+            from app.runner import run
+
+            scraper = get_scraper(agency)
+            scraper_name = scraper.__class__.__name__
             logger.info("Running scraper: %s", scraper_name)
-            run(scraper=scraper, agency=agency, base_dir=BASE_DIR)
+            run(scraper=scraper, agency=agency, base_dir=config.OUTPUT_DIR)
             logger.info("Scraper finished successfully: %s", scraper_name)
+            metrics.inc("runs_ok")
+            return STATUS_OK
         except Exception:
             logger.exception("Scraper failed and will be skipped: %s", scraper_name)
+            metrics.inc("runs_failed")
+            return STATUS_FAILED
+
+
+# --------------------------------------------------
+# Execution modes
+# --------------------------------------------------
+def _run_sequential(names: list[str]) -> dict[str, str]:
+    return {agency: run_agency(agency) for agency in names}
+
+
+def _run_threads(names: list[str]) -> dict[str, str]:
+    """
+    One daemon thread per agency. A thread that misses its deadline is
+    reported as timed out and abandoned (threads cannot be killed); being
+    a daemon it does not keep the process alive.
+    """
+    results: dict[str, str] = {}
+    threads = []
+    started = time.monotonic()
+
+    for agency in names:
+        def target(agency=agency):
+            results[agency] = run_agency(agency)
+
+        t = threading.Thread(target=target, name=f"agency-{agency}", daemon=True)
+        t.start()
+        threads.append((agency, t))
+
+    for agency, t in threads:
+        t.join(max(0.0, started + _deadline(agency) - time.monotonic()))
+        if t.is_alive():
+            logger.error("Scraper exceeded its deadline: %s", agency)
+            results[agency] = STATUS_TIMEOUT
+            with metrics.agency(agency):
+                metrics.inc("runs_timeout")
+
+    return {agency: results[agency] for agency, _ in threads}
+
+
+def _metrics_partial(agency: str, pid: int):
+    return config.METRICS_DIR / f"partial-{agency}-{pid}.json"
+
+
+def _agency_process(agency: str) -> None:
+    metrics.reset()
+    status = run_agency(agency)
+
+    # Hand this child's metrics to the parent (merged in _run_processes)
+    try:
+        path = _metrics_partial(agency, os.getpid())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(metrics.snapshot()))
+    except Exception:
+        logger.exception("Failed to save metrics of %s", agency)
+
+    sys.exit(0 if status == STATUS_OK else 1)
+
+
+def _collect_metrics(agency: str, pid: int) -> None:
+    path = _metrics_partial(agency, pid)
+    try:
+        if path.exists():
+            metrics.merge(json.loads(path.read_text()))
+            path.unlink()
+    except Exception:
+        logger.exception("Failed to collect metrics of %s", agency)
+
+
+def _run_processes(names: list[str]) -> dict[str, str]:
+    """
+    One child process per agency; a child that misses its deadline is
+    terminated.
+    """
+    results: dict[str, str] = {}
+    processes = []
+    started = time.monotonic()
+
+    for agency in names:
+        p = multiprocessing.Process(
+            target=_agency_process,
+            args=(agency,),
+            name=f"agency-{agency}",
+        )
+        p.start()
+        processes.append((agency, p))
+
+    for agency, p in processes:
+        p.join(max(0.0, started + _deadline(agency) - time.monotonic()))
+
+        if p.is_alive():
+            logger.error("Scraper exceeded its deadline, terminating: %s", agency)
+            p.terminate()
+            p.join(5)
+            if p.is_alive():
+                p.kill()
+                p.join()
+            results[agency] = STATUS_TIMEOUT
+            with metrics.agency(agency):
+                metrics.inc("runs_timeout")
+        else:
+            results[agency] = STATUS_OK if p.exitcode == 0 else STATUS_FAILED
+
+        _collect_metrics(agency, p.pid)
+
+    return results
+
+
+EXECUTION_MODES = {
+    "sequential": _run_sequential,
+    "thread": _run_threads,
+    "process": _run_processes,
+}
+
+
+def _start_outbox():
+    """
+    Drain queued uploads (this run's and leftovers from earlier runs)
+    in the background while the scrapers work.
+    """
+    if config.UPLOAD_MODE != "outbox":
+        return None
+
+    try:
+        from app.services.clients import get_outbox
+
+        outbox = get_outbox()
+        outbox.start()
+        return outbox
+    except Exception:
+        logger.exception("Upload outbox unavailable, uploads stay queued")
+        return None
+
+
+def main(names: Optional[list[str]] = None) -> int:
+    """
+    Run the given agencies (default: all registered) once.
+    """
+    mode = config.EXECUTION_MODE
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"Unknown EXECUTION_MODE: {mode}")
+
+    names = names or agencies()
+    logger.info("Starting scraper runner (mode=%s): %s", mode, ", ".join(names))
+    metrics.reset()
+
+    outbox = _start_outbox()
+    try:
+        results = EXECUTION_MODES[mode](names)
+    finally:
+        if outbox is not None:
+            outbox.stop(drain_timeout=config.OUTBOX_FINAL_DRAIN_SECONDS)
+
+    metrics.write_reports()
+
+    failed = {a: s for a, s in results.items() if s != STATUS_OK}
+    logger.info(
+        "All scrapers processed: %d ok, %d failed (%s)",
+        len(results) - len(failed),
+        len(failed),
+        ", ".join(f"{a}={s}" for a, s in failed.items()) or "-",
+    )
+
+    return 1 if failed else 0
+
+
+# --------------------------------------------------
+# Status
+# --------------------------------------------------
+def _last_runs(limit: int = 50) -> dict[str, dict]:
+    """
+    agency -> its entry in the newest run report that covers it.
+    """
+    last: dict[str, dict] = {}
+    reports = sorted((config.METRICS_DIR / "runs").glob("run-*.json"), reverse=True)
+
+    for path in reports[:limit]:
+        try:
+            report = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+
+        for agency, stages in report.get("stages", {}).items():
+            if agency in last or "run" not in stages:
+                continue
+            counters = report.get("counters", {}).get(agency, {})
+            outcome = next(
+                (s for s in ("failed", "timeout", "ok") if counters.get(f"runs_{s}")),
+                "unknown",
+            )
+            last[agency] = {
+                "finished": report.get("finished"),
+                "seconds": stages["run"]["max_s"],
+                "outcome": outcome,
+            }
+
+    return last
+
+
+def status() -> int:
+    """
+    Print each agency's schedule and last run, then the Redis backlog.
+    Returns 1 if Redis is unreachable.
+    """
+    last = _last_runs()
+
+    try:
+        from app.services.redis_client import RedisClient
+
+        redis = RedisClient(quiet=True)
+    except Exception as e:
+        logger.warning("Redis unreachable: %s", e)
+        redis = None
+
+    for agency in agencies():
+        run = last.get(agency)
+        if run:
+            when = datetime.fromtimestamp(run["finished"]).strftime("%Y-%m-%d %H:%M:%S")
+            summary = f"last run {when} {run['outcome']} ({run['seconds']:.1f}s)"
+        else:
+            summary = "no run recorded"
+        print(f"{agency:<10} {_schedule(agency, redis):<22} {summary}")
+
+    if redis is None:
+        print(f"redis      {config.REDIS_HOST}:{config.REDIS_PORT} unreachable")
+        return 1
+
+    try:
+        pending = redis.pending_uploads()
+    except Exception as e:
+        print(f"redis      {config.REDIS_HOST}:{config.REDIS_PORT} unreachable ({e})")
+        return 1
+
+    print(f"redis      {config.REDIS_HOST}:{config.REDIS_PORT} ok, {pending} uploads queued")
+    return 0
+
+
+def cli(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.main")
+    commands = parser.add_subparsers(dest="command")
+
+    run_parser = commands.add_parser("run", help="run the scrapers once (default)")
+    run_parser.add_argument(
+        "--agency",
+        action="append",
+        choices=agencies(),
+        help="run only this agency (repeatable)",
+    )
+    commands.add_parser("status", help="schedules, last runs and the upload backlog")
+    commands.add_parser(
+        "daemon",
+        help="stay up and run each agency on its schedule (SCHEDULER_MODE)",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        return status()
+
+    if args.command == "daemon":
+        from app.daemon import serve
+        return serve()
 
-    logger.info("All scrapers processed")
+    return main(getattr(args, "agency", None))
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
@@ -2,22 +2,39 @@ import logging
 import time
 from pathlib import Path
 
-from app.services.redis_client import RedisClient
-from app.services.image_builder import build_cover_png
-from app.services.object_storage import CompositeStorage
+from app.scrapers.base import NotModified
+from app import config
+from app.services.clients import get_outbox, get_redis, get_storage
+from app.services.image_builder import render_cover
+from app.services.content_index import (
+    duplicate_payload,
+    find_duplicate,
+    remember_content,
+)
+from app.services.downloader import prune_partials, sha256_file
+from app.services.upload_outbox import upload_files
 from app.utils.file_manager import cleanup_temp
+from app.utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 
 def run(scraper, agency: str, base_dir: Path):
-    redis = RedisClient()
-    storage = CompositeStorage()
+    redis = get_redis()
+    storage = get_storage()
 
     tmp_root = base_dir / "tmp"
     data_root = base_dir / "data"
 
-    issue_id = scraper.get_issue_id()
+    scraper.begin_run(validators=redis)
+
+    try:
+        with metrics.timer("get_issue_id"):
+            issue_id = scraper.get_issue_id()
+    except NotModified:
+        logger.info("Upstream unchanged since last run, skipping: %s", agency)
+        return
+
     logger.info("Starting scraper: agency=%s, issue_id=%s", agency, issue_id)
 
     try:
@@ -34,6 +51,7 @@ def run(scraper, agency: str, base_dir: Path):
             if not getattr(scraper, "multi_issue", False):
                 if redis.is_downloaded(agency, issue_id):
                     logger.info("Already processed: %s / %s", agency, issue_id)
+                    scraper.commit_validators()
                     return
 
             temp_dir = tmp_root / agency / issue_id
@@ -44,11 +62,17 @@ def run(scraper, agency: str, base_dir: Path):
                 getattr(scraper, "multi_issue", False),
             )
 
-            result = scraper.download(temp_dir)
+            try:
+                with metrics.timer("scrape"):
+                    result = scraper.download(temp_dir)
+            except NotModified:
+                logger.info("Upstream unchanged since last run, skipping: %s", agency)
+                return
 
             # ---------------- MULTI ISSUE ----------------
             # (e.g. Pishkhan – handled inside scraper)
             if getattr(scraper, "multi_issue", False):
+                scraper.commit_validators()
                 logger.info("Multi-issue scraper finished successfully")
                 return
 
@@ -58,23 +82,44 @@ def run(scraper, agency: str, base_dir: Path):
                 return
 
             today = time.strftime("%Y-%m-%d")
+            ts = int(time.time())
+
+            # -------- CONTENT DEDUP --------
+            sha256 = scraper.result_sha256 or sha256_file(result)
+            existing = find_duplicate(redis, sha256)
+            if existing:
+                redis.record_download(
+                    agency=agency,
+                    issue_no=issue_id,
+                    payload=duplicate_payload(existing, sha256, timestamp=ts),
+                )
+                redis.record_release(agency)
+                result.unlink(missing_ok=True)
+                scraper.commit_validators()
+                logger.info(
+                    "Identical content already stored, reused: agency=%s issue_id=%s (%s:%s)",
+                    agency,
+                    issue_id,
+                    existing.get("agency"),
+                    existing.get("issue_no"),
+                )
+                return
+
             final_dir = data_root / agency / today
             final_dir.mkdir(parents=True, exist_ok=True)
 
-            ts = int(time.time())
-
             final_pdf = final_dir / f"{agency}-{ts}.pdf"
             final_png = final_dir / f"{agency}-{ts}.png"
 
             # Move PDF to final location
             result.replace(final_pdf)
 
-            # Build PNG cover
+            # Build PNG cover (+ smaller derivatives)
+            cover = None
             try:
-                build_cover_png(
-                    pdf_path=final_pdf,
+                cover = render_cover(
                     output_png=final_png,
-                    dpi=200,
+                    pdf_path=final_pdf,
                 )
             except Exception:
                 logger.exception("Cover generation failed")
@@ -83,28 +128,52 @@ def run(scraper, agency: str, base_dir: Path):
             pdf_remote_key = f"{agency}/{today}/{final_pdf.name}"
             png_remote_key = f"{agency}/{today}/{final_png.name}"
 
-            pdf_uri = storage.save(final_pdf, pdf_remote_key)
-            png_uri = None
+            has_png = final_png.exists()
+            cover_files = cover.derivatives if cover else {}
 
-            if final_png.exists():
-                png_uri = storage.save(final_png, png_remote_key)
+            files = [(final_pdf, pdf_remote_key, "pdf")]
+            if has_png:
+                files.append((final_png, png_remote_key, "png"))
+            files += [
+                (path, f"{agency}/{today}/{path.name}", f"derivatives.{name}")
+                for name, path in cover_files.items()
+            ]
+
+            # Inline: PDF, cover and derivatives are uploaded concurrently.
+            # Outbox: remote URIs are patched in once the drainer uploads.
+            outbox = get_outbox() if config.UPLOAD_MODE == "outbox" else None
+            with metrics.timer("upload"):
+                remote = {} if outbox else upload_files(storage, files)
+
+            derivatives = {
+                name: {"local": str(path), "remote": remote.get(f"derivatives.{name}")}
+                for name, path in cover_files.items()
+            }
 
             # -------- REDIS METADATA --------
+            payload = {
+                "pdf": {
+                    "local": str(final_pdf),
+                    "remote": remote.get("pdf"),
+                },
+                "png": {
+                    "local": str(final_png) if has_png else None,
+                    "remote": remote.get("png"),
+                },
+                "derivatives": derivatives,
+                "sha256": sha256,
+                "timestamp": ts,
+            }
             redis.record_download(
                 agency=agency,
                 issue_no=issue_id,
-                payload={
-                    "pdf": {
-                        "local": str(final_pdf),
-                        "remote": pdf_uri,
-                    },
-                    "png": {
-                        "local": str(final_png) if final_png.exists() else None,
-                        "remote": png_uri,
-                    },
-                    "timestamp": ts,
-                },
+                payload=payload,
             )
+            remember_content(redis, sha256, agency, issue_id, payload)
+            redis.record_release(agency)
+            if outbox:
+                outbox.enqueue(agency, issue_id, files, sha256=sha256)
+            scraper.commit_validators()
 
             logger.info(
                 "Single issue processed successfully: agency=%s issue_id=%s",
@@ -113,8 +182,15 @@ def run(scraper, agency: str, base_dir: Path):
             )
 
     finally:
+        logger.info("Page cache for %s: %s", agency, scraper.page_cache.stats())
+
         # -------- CLEAN TEMP --------
         try:
-            cleanup_temp()
+            cleanup_temp(root=tmp_root / agency)
         except Exception:
             logger.warning("Temp cleanup failed")
+
+        try:
+            prune_partials()
+        except Exception:
+            logger.warning("Partial download cleanup failed")
@@ -0,0 +1,41 @@
+import importlib
+import threading
+from typing import Dict
+
+# --------------------------------------------------
+# Scraper registry
+# --------------------------------------------------
+# agency -> "module:Class". Modules (and with them bs4, requests, the
+# PDF libraries ...) are imported when the agency first runs.
+REGISTRY: Dict[str, str] = {
+    "etemad": "app.scrapers.etemad:EtemadScraper",
+    "iran": "app.scrapers.iran:IranScraper",
+    "pishkhan": "app.scrapers.pishkhan:PishkhanScraper",
+}
+
+_instances: Dict[str, object] = {}
+_lock = threading.Lock()
+
+
+def agencies() -> list[str]:
+    return list(REGISTRY)
+
+
+def scraper_class(agency: str) -> type:
+    try:
+        module, _, name = REGISTRY[agency].partition(":")
+    except KeyError:
+        raise ValueError(f"Unknown agency: {agency}") from None
+    return getattr(importlib.import_module(module), name)
+
+
+def get_scraper(agency: str):
+    """
+    Shared scraper instance for `agency`, built on first call.
+    """
+    scraper = _instances.get(agency)
+    if scraper is None:
+        cls = scraper_class(agency)
+        with _lock:
+            scraper = _instances.setdefault(agency, cls())
+    return scraper
@@ -1,5 +1,49 @@
+import asyncio
+import contextvars
+import time
 from abc import ABC
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
+
+import requests
+from bs4 import SoupStrainer
+
+from app.scrapers.page_cache import CachedPage, PageCache
+from app.services.clients import get_session
+from app.utils.html import parse_html, response_charset
+from app.utils.logger import logger
+from app.utils.metrics import metrics
+
+
+class NotModified(Exception):
+    """
+    Upstream page unchanged (HTTP 304) since the last successful run:
+    there is nothing new to scrape.
+    """
+
+    def __init__(self, url: str):
+        super().__init__(f"Not modified: {url}")
+        self.url = url
+
+
+def run_sync(coro):
+    """
+    Drive a coroutine to completion from blocking code (e.g. Pishkhan's
+    aiohttp viewer resolver, called from the runner's thread).
+
+    asyncio.run cannot nest: called from a thread that already runs an
+    event loop, the coroutine gets its own loop on a worker thread and
+    the caller blocks until it is done.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-sync") as pool:
+        return pool.submit(context.run, asyncio.run, coro).result()
 
 
 class BaseScraper(ABC):
@@ -11,6 +55,13 @@ class BaseScraper(ABC):
     agency: str  # e.g. "iran", "etemad"
     multi_issue: bool = False  # important for runner logic
 
+    # Validator store (RedisClient), bound per run by the runner
+    validators = None
+
+    # SHA-256 of download()'s file when the scraper already hashed it
+    # (while streaming); None makes the runner hash the file itself
+    result_sha256: Optional[str] = None
+
     def get_issue_id(self) -> str:
         """
         Return unique issue identifier (used for deduplication).
@@ -26,3 +77,143 @@ class BaseScraper(ABC):
             can return a dummy file (runner must skip PDF handling)
         """
         raise NotImplementedError
+
+    # --------------------------------------------------
+    # HTTP session (shared, created on first use)
+    # --------------------------------------------------
+    def _init_session(self) -> requests.Session:
+        return requests.Session()
+
+    @property
+    def session(self) -> requests.Session:
+        return get_session(self.agency, self._init_session)
+
+    # --------------------------------------------------
+    # Per-run state
+    # --------------------------------------------------
+    def begin_run(self, validators=None) -> None:
+        """
+        Called by the runner before each run: binds the validator store
+        and starts from an empty page cache and no result hash.
+        """
+        self.bind_validators(validators)
+        self.page_cache.reset()
+        self.result_sha256 = None
+
+    @property
+    def page_cache(self) -> PageCache:
+        cache = getattr(self, "_page_cache", None)
+        if cache is None:
+            cache = self._page_cache = PageCache()
+        return cache
+
+    def get_page(
+        self,
+        session: requests.Session,
+        url: str,
+        parse_only: Optional[SoupStrainer] = None,
+        **kwargs,
+    ) -> CachedPage:
+        """
+        Fetch (conditionally) and parse `url` once per run; later calls
+        reuse the response and the parsed tree until the TTL expires or
+        page_cache.invalidate(url) is called.
+
+        `parse_only` restricts the tree to the elements the scraper
+        queries (see app.utils.html.keep_elements).
+        """
+        page = self.page_cache.get(url)
+        if page is not None:
+            metrics.inc("page_cache_hits")
+            return page
+
+        with metrics.timer("page_fetch"):
+            r = self.conditional_get(session, url, **kwargs)
+        with metrics.timer("parse"):
+            soup = parse_html(r.content, parse_only, response_charset(r))
+
+        page = CachedPage(
+            response=r,
+            soup=soup,
+            fetched_at=time.monotonic(),
+        )
+        self.page_cache.put(url, page)
+        return page
+
+    # --------------------------------------------------
+    # Conditional requests (ETag / Last-Modified)
+    # --------------------------------------------------
+    def bind_validators(self, store) -> None:
+        """
+        Start a run with a validator store (get_validators/set_validators).
+        """
+        self.validators = store
+        self._pending_validators: dict[str, dict] = {}
+        self._conditional_seen: set[str] = set()
+
+    def conditional_get(
+        self,
+        session: requests.Session,
+        url: str,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        GET that sends the stored ETag / Last-Modified on the first
+        request to `url` in this run and raises NotModified on 304.
+
+        New validators stay pending until commit_validators(), which the
+        runner calls only after a successful run, so a failed run is
+        never skipped next time.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        store = self.validators
+
+        if store is not None and url not in self._conditional_seen:
+            cached = store.get_validators(url) or {}
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        r = session.get(url, headers=headers, **kwargs)
+
+        if store is not None:
+            self._conditional_seen.add(url)
+
+        if r.status_code == 304:
+            logger.info("Upstream not modified: %s", url)
+            metrics.inc("not_modified")
+            raise NotModified(url)
+
+        r.raise_for_status()
+
+        if store is not None:
+            fresh = {
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+            }
+            fresh = {k: v for k, v in fresh.items() if v}
+            if fresh:
+                self._pending_validators[url] = fresh
+
+        return r
+
+    def commit_validators(self) -> None:
+        if self.validators is None:
+            return
+
+        for url, fresh in self._pending_validators.items():
+            try:
+                self.validators.set_validators(url, fresh)
+            except Exception:
+                logger.warning("Failed to store validators for %s", url)
+
+        self._pending_validators = {}
+
+    def discard_validators(self) -> None:
+        """
+        Forget this run's validators (e.g. some papers failed), so the
+        next run fetches the page in full again.
+        """
+        if self.validators is not None:
+            self._pending_validators = {}
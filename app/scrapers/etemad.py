@@ -1,11 +1,12 @@
 import re
 import requests
-from bs4 import BeautifulSoup
 from pathlib import Path
 
-from app.scrapers.base import BaseScraper
-from app.utils.converters import extract_files_from_zip
-from app.services.pdf_builder import merge_pdfs
+from app.scrapers.base import BaseScraper, NotModified
+from app.scrapers.page_cache import CachedPage
+from app.services.downloader import ZIP_MAGIC, stream_download
+from app.services.pdf_builder import merge_pdfs_from_zip
+from app.utils.html import keep_elements
 from app.utils.logger import logger
 
 
@@ -15,28 +16,38 @@ class EtemadScraper(BaseScraper):
     BASE_URL = "https://www.etemadnewspaper.ir"
     DOWNLOAD_ENDPOINT = "/fa/download-pages"
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
+    # Only the issue number and the download container are queried
+    HOMEPAGE_NODES = keep_elements(
+        ids=("ContentPlaceHolder1_activedate_lblNPNNO", "divcp2"),
+    )
+
+    def _init_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0",
                 "Referer": self.BASE_URL,
             }
         )
+        return session
 
-    def fetch_homepage(self) -> str:
+    def fetch_homepage(self) -> CachedPage:
         try:
-            response = self.session.get(self.BASE_URL, timeout=30)
-            response.raise_for_status()
-            return response.text
+            return self.get_page(
+                self.session,
+                self.BASE_URL,
+                parse_only=self.HOMEPAGE_NODES,
+                timeout=30,
+            )
+        except NotModified:
+            raise
         except Exception:
             logger.exception("Failed to fetch Etemad homepage")
             raise
 
     def get_issue_id(self) -> str:
         try:
-            html = self.fetch_homepage()
-            soup = BeautifulSoup(html, "html.parser")
+            soup = self.fetch_homepage().soup
 
             span = soup.select_one(
                 "span#ContentPlaceHolder1_activedate_lblNPNNO"
@@ -54,18 +65,19 @@ class EtemadScraper(BaseScraper):
             logger.info("Etemad issue_id detected: %s", issue_id)
             return issue_id
 
+        except NotModified:
+            raise
+
         except Exception:
             logger.exception("Failed to extract issue_id for Etemad")
             raise
 
     def download(self, temp_dir: Path) -> Path:
         zip_path = None
-        extract_dir = None
         final_pdf = None
 
         try:
-            html = self.fetch_homepage()
-            soup = BeautifulSoup(html, "html.parser")
+            soup = self.fetch_homepage().soup
 
             container = soup.find("div", id="divcp2")
             if not container:
@@ -79,29 +91,22 @@ class EtemadScraper(BaseScraper):
 
             logger.info("Starting Etemad download with params: %s", params)
 
-            response = self.session.post(
+            zip_path = temp_dir / "etemad_pages.zip"
+            stream_download(
+                self.session,
                 f"{self.BASE_URL}{self.DOWNLOAD_ENDPOINT}",
+                zip_path,
+                method="POST",
+                magic=ZIP_MAGIC,
                 data=params,
                 timeout=60,
             )
-            response.raise_for_status()
-
-            zip_path = temp_dir / "etemad_pages.zip"
-            zip_path.write_bytes(response.content)
 
             logger.info("Etemad zip downloaded: %s", zip_path)
 
-            extract_dir = temp_dir / "pages"
-            files = extract_files_from_zip(zip_path, extract_dir)
-
-            pdfs = sorted(
-                file for file in files if file.suffix.lower() == ".pdf"
-            )
-            if not pdfs:
-                raise RuntimeError("No PDFs extracted from Etemad zip")
-
+            # Merge straight from the archive, no extraction to disk
             final_pdf = temp_dir / "etemad_final.pdf"
-            merge_pdfs(pdfs, final_pdf)
+            merge_pdfs_from_zip(zip_path, final_pdf)
 
             logger.info("Etemad final PDF created: %s", final_pdf)
             return final_pdf
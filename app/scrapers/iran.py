@@ -1,9 +1,11 @@
 import re
 import requests
-from bs4 import BeautifulSoup
 from pathlib import Path
 
-from app.scrapers.base import BaseScraper
+from app.scrapers.base import BaseScraper, NotModified
+from app.scrapers.page_cache import CachedPage
+from app.services.downloader import stream_download
+from app.utils.html import keep_elements
 from app.utils.logger import logger
 
 
@@ -11,27 +13,36 @@ class IranScraper(BaseScraper):
     agency = "iran"
     BASE_URL = "https://irannewspaper.ir"
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
+    # Issue title span + anchors (the full-PDF link is an <a> around a span)
+    HOMEPAGE_NODES = keep_elements(classes=(("title",),), tags=("a",))
+
+    def _init_session(self) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(
             {
                 "User-Agent": "Mozilla/5.0",
                 "Referer": self.BASE_URL,
             }
         )
+        return session
 
-    def fetch_homepage(self) -> str:
+    def fetch_homepage(self) -> CachedPage:
         try:
-            r = self.session.get(self.BASE_URL, timeout=30)
-            r.raise_for_status()
-            return r.text
+            return self.get_page(
+                self.session,
+                self.BASE_URL,
+                parse_only=self.HOMEPAGE_NODES,
+                timeout=30,
+            )
+        except NotModified:
+            raise
         except Exception:
             logger.exception("Failed to fetch Iran homepage")
             raise
 
     def get_issue_id(self) -> str:
         try:
-            soup = BeautifulSoup(self.fetch_homepage(), "html.parser")
+            soup = self.fetch_homepage().soup
 
             span = soup.select_one("span.title[data-title]")
             if not span:
@@ -46,13 +57,16 @@ class IranScraper(BaseScraper):
             logger.info("Iran issue_id detected: %s", digits)
             return digits
 
+        except NotModified:
+            raise
+
         except Exception:
             logger.exception("Failed to extract issue_id for Iran")
             raise
 
     def download(self, temp_dir: Path) -> Path:
         try:
-            soup = BeautifulSoup(self.fetch_homepage(), "html.parser")
+            soup = self.fetch_homepage().soup
 
             span = soup.find(
                 "span",
@@ -71,12 +85,9 @@ class IranScraper(BaseScraper):
 
             logger.info("Starting Iran PDF download: %s", url)
 
-            r = self.session.get(url, timeout=60)
-            r.raise_for_status()
-
             pdf_path = temp_dir / "iran_final.pdf"
-            with open(pdf_path, "wb") as f:
-                f.write(r.content)
+            result = stream_download(self.session, url, pdf_path, timeout=60, resume=True)
+            self.result_sha256 = result.sha256
 
             logger.info("Iran final PDF saved: %s", pdf_path)
             return pdf_path
@@ -0,0 +1,78 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from bs4 import BeautifulSoup
+
+from app import config
+
+
+@dataclass
+class CachedPage:
+    response: requests.Response
+    soup: BeautifulSoup
+    fetched_at: float
+
+    @property
+    def text(self) -> str:
+        return self.response.text
+
+
+class PageCache:
+    """
+    Per-run memo of fetched + parsed pages, keyed by URL.
+
+    Entries expire after `ttl` seconds and can be dropped explicitly;
+    hit/miss counters show how many round trips and parses were saved.
+    """
+
+    def __init__(self, ttl: float = config.PAGE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._pages: dict[str, CachedPage] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._pages.get(url)
+
+            if page is not None and time.monotonic() - page.fetched_at > self.ttl:
+                del self._pages[url]
+                page = None
+
+            if page is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return page
+
+    def put(self, url: str, page: CachedPage) -> None:
+        with self._lock:
+            self._pages[url] = page
+
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """
+        Drop one URL, or every page when `url` is None.
+        """
+        with self._lock:
+            if url is None:
+                self._pages.clear()
+            else:
+                self._pages.pop(url, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pages.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._pages),
+            }
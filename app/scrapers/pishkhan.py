@@ -1,21 +1,63 @@
+import asyncio
 import time
 import re
 import hashlib
+import threading
 import requests
+from dataclasses import dataclass, field
 from pathlib import Path
-from urllib.parse import urljoin
-from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urljoin, urlsplit
+from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from requests.exceptions import ConnectionError, Timeout, RequestException
 
-from app.scrapers.base import BaseScraper
-from app.services.redis_client import RedisClient
-from app.services.image_builder import build_cover_png
-from app.services.object_storage import CompositeStorage
+from app import config
+from app.scrapers.base import BaseScraper, NotModified, run_sync
+from app.services.content_index import (
+    content_entry,
+    duplicate_payload,
+    find_duplicate,
+)
+from app.services.downloader import (
+    DownloadError,
+    UnexpectedContentError,
+    stream_download,
+)
+from app.services.clients import get_outbox, get_redis, get_storage
+from app.services.image_builder import render_cover
+from app.services.upload_outbox import IssueFile, upload_files
+from app.utils.concurrency import bounded_map
+from app.utils.html import keep_elements
 from app.utils.logger import logger
+from app.utils.metrics import metrics
+from app.utils.pipeline import Pipeline, Stage
+
+if TYPE_CHECKING:
+    from app.services.http_async import AsyncHttpClient
+    from app.services.object_storage import CompositeStorage
+    from app.services.redis_client import RedisClient
+
+
+@dataclass
+class PaperJob:
+    """
+    One Pishkhan paper moving through the fetch/render/upload stages.
+    """
+
+    paper: str
+    shamsi_date: str
+    gregorian_date: str
+    pdf_url: str
+    issue_id: str
+    ts: int
+    pdf_path: Path
+    png_path: Path
+    sha256: Optional[str] = None
+    derivatives: dict[str, Path] = field(default_factory=dict)
 
 
 class PishkhanScraper(BaseScraper):
@@ -23,25 +65,49 @@ class PishkhanScraper(BaseScraper):
     multi_issue = True
     BASE_URL = "https://www.pishkhan.com"
 
+    PDF_LINK_TITLE = "دانلود پی‌دی‌اف"
+
+    # /all lists every paper for several days. Only the date header, the
+    # section titles and the PDF links are built into the tree; links are
+    # matched to their section by document order (see _collect_viewers).
+    ALL_PAGE_NODES = keep_elements(
+        classes=(("mash-list-items", "right"), ("section-title",)),
+        attrs=(("a", "title", PDF_LINK_TITLE),),
+    )
+
     # --------------------------------------------------
-    # Init
+    # Shared clients (created on first use)
     # --------------------------------------------------
-    def __init__(self):
-        self.session = self._init_session()
-        self.redis = RedisClient()
-        self.storage = CompositeStorage()
+    @property
+    def redis(self) -> "RedisClient":
+        return get_redis()
+
+    @property
+    def storage(self) -> "CompositeStorage":
+        return get_storage()
 
     def _init_session(self) -> requests.Session:
         retry = Retry(
-            total=3,
-            connect=3,
-            read=3,
-            backoff_factor=1.5,
+            total=config.HTTP_RETRY_TOTAL,
+            connect=config.HTTP_RETRY_TOTAL,
+            read=config.HTTP_RETRY_TOTAL,
+            backoff_factor=config.HTTP_RETRY_BACKOFF,
             allowed_methods=["GET", "POST"],
             raise_on_status=False,
         )
 
-        adapter = HTTPAdapter(max_retries=retry)
+        # One pooled connection per resolver/fetch thread, otherwise urllib3
+        # discards the extra connections and we pay for new handshakes.
+        pool_size = max(
+            10,
+            config.PISHKHAN_RESOLVE_WORKERS,
+            config.PISHKHAN_FETCH_WORKERS,
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+        )
 
         session = requests.Session()
         session.mount("https://", adapter)
@@ -59,9 +125,13 @@ class PishkhanScraper(BaseScraper):
     # --------------------------------------------------
     def _fetch_all_page(self) -> BeautifulSoup:
         try:
-            r = self.session.get(f"{self.BASE_URL}/all", timeout=(5, 20))
-            r.raise_for_status()
-            return BeautifulSoup(r.text, "html.parser")
+            page = self.get_page(
+                self.session,
+                f"{self.BASE_URL}/all",
+                parse_only=self.ALL_PAGE_NODES,
+                timeout=(5, 20),
+            )
+            return page.soup
         except (ConnectionError, Timeout) as e:
             raise RuntimeError("Network/DNS error while connecting to Pishkhan") from e
 
@@ -101,30 +171,30 @@ class PishkhanScraper(BaseScraper):
         today_text = f"{parts[0]} {parts[1]}"
 
         viewers = set()
-
-        for section in soup.select("div.section"):
-            title = section.select_one("h3.section-title")
-            if not title or today_text not in title.text:
-                continue
-
-            for a in section.select("a[title='دانلود پی‌دی‌اف']:not(.IconCTL)"):
-                viewers.add(urljoin(self.BASE_URL, a["href"]))
+        in_today = False
+
+        # Section titles and PDF links in document order: a link belongs
+        # to the last title before it
+        for node in soup.select(
+            f"h3.section-title, a[title='{self.PDF_LINK_TITLE}']:not(.IconCTL)"
+        ):
+            if node.name == "h3":
+                in_today = today_text in node.text
+            elif in_today:
+                viewers.add(urljoin(self.BASE_URL, node["href"]))
 
         logger.info("Collected %d viewer links (%s)", len(viewers), today_text)
-        return list(viewers)
+        return sorted(viewers)
 
     # --------------------------------------------------
     # Extract real PDF URL
     # --------------------------------------------------
-    def _extract_pdf(self, viewer_url: str):
-        try:
-            r = self.session.get(viewer_url, timeout=(5, 20))
-            r.raise_for_status()
-        except RequestException:
-            return None
-
-        text = r.text
+    PDF_FILES_ENDPOINT = "/tools/PDFFiles/PDFFiles.php"
 
+    def _viewer_payload(self, viewer_url: str, text: str):
+        """
+        Parse a viewer page into (paper_name, PDFFiles.php form data).
+        """
         match_paper = re.search(r"pdfviewer\.php\?paper=([^&]+)", viewer_url)
         if not match_paper:
             return None
@@ -143,10 +213,31 @@ class PishkhanScraper(BaseScraper):
             "paper": paper.group(1),
             "id": issue.group(1),
         }
+        return paper_name, payload
+
+    def _pdf_result(self, paper_name: str, payload: dict, text: str):
+        pdf_rel_path = text.strip()
+        if not pdf_rel_path or pdf_rel_path == "null":
+            return None
+
+        return paper_name, payload["date"], urljoin(self.BASE_URL, pdf_rel_path)
+
+    def _extract_pdf(self, viewer_url: str):
+        try:
+            r = self.session.get(viewer_url, timeout=(5, 20))
+            r.raise_for_status()
+        except RequestException:
+            return None
+
+        parsed = self._viewer_payload(viewer_url, r.text)
+        if not parsed:
+            return None
+
+        paper_name, payload = parsed
 
         try:
             resp = self.session.post(
-                f"{self.BASE_URL}/tools/PDFFiles/PDFFiles.php",
+                f"{self.BASE_URL}{self.PDF_FILES_ENDPOINT}",
                 data=payload,
                 headers={"X-Requested-With": "XMLHttpRequest"},
                 timeout=(5, 20),
@@ -154,106 +245,485 @@ class PishkhanScraper(BaseScraper):
         except RequestException:
             return None
 
-        pdf_rel_path = resp.text.strip()
-        if not pdf_rel_path or pdf_rel_path == "null":
+        return self._pdf_result(paper_name, payload, resp.text)
+
+    async def _aextract_pdf(self, client: "AsyncHttpClient", viewer_url: str):
+        import aiohttp
+
+        try:
+            r = await client.get(viewer_url, timeout=(5, 20))
+            r.raise_for_status()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             return None
 
-        return paper_name, date.group(1), urljoin(self.BASE_URL, pdf_rel_path)
+        parsed = self._viewer_payload(viewer_url, r.text)
+        if not parsed:
+            return None
+
+        paper_name, payload = parsed
+
+        try:
+            resp = await client.post(
+                f"{self.BASE_URL}{self.PDF_FILES_ENDPOINT}",
+                data=payload,
+                headers={"X-Requested-With": "XMLHttpRequest"},
+                timeout=(5, 20),
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+
+        return self._pdf_result(paper_name, payload, resp.text)
 
     # --------------------------------------------------
-    # Core download + Dual Write
+    # Resolve viewer links concurrently
     # --------------------------------------------------
-    def download(self, temp_dir: Path) -> Path:
+    def _safe_extract_pdf(self, viewer_url: str):
         try:
-            soup = self._fetch_all_page()
-            shamsi_date = self._extract_shamsi_date(soup)
-            gregorian_date = self._today_gregorian()
-            viewers = self._collect_viewers(soup)
+            return self._extract_pdf(viewer_url)
+        except Exception:
+            logger.exception("Viewer resolution failed: %s", viewer_url)
+            return None
 
-            output_root = Path("/app/output/data") / self.agency
-            output_root.mkdir(parents=True, exist_ok=True)
+    async def _aresolve_all(self, viewers: list[str]) -> list:
+        """
+        Resolve every viewer on one event loop. The connector caps
+        in-flight requests per host, the semaphore caps open viewers.
+        """
+        # aiohttp is only imported when this engine is selected
+        from app.services.http_async import AsyncHttpClient
 
-            downloaded = 0
+        semaphore = asyncio.Semaphore(config.PISHKHAN_RESOLVE_WORKERS)
 
-            for viewer in viewers:
-                result = self._extract_pdf(viewer)
-                if not result:
-                    continue
+        async with AsyncHttpClient(
+            headers=dict(self.session.headers),
+            limit_per_host=config.PISHKHAN_PER_HOST_LIMIT,
+        ) as client:
 
-                paper, pdf_shamsi_date, pdf_url = result
-                pdf_issue_id = f"{paper}:{pdf_shamsi_date}:{self._hash(pdf_url)}"
+            async def resolve(viewer_url: str):
+                async with semaphore:
+                    try:
+                        return await self._aextract_pdf(client, viewer_url)
+                    except Exception:
+                        logger.exception("Viewer resolution failed: %s", viewer_url)
+                        return None
 
-                if self.redis.is_downloaded(self.agency, pdf_issue_id):
-                    continue
+            return await asyncio.gather(*(resolve(v) for v in viewers))
 
-                paper_dir = output_root / paper / gregorian_date
-                paper_dir.mkdir(parents=True, exist_ok=True)
+    def _seconds_until_day_end(self) -> int:
+        now = datetime.utcnow()
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return int((tomorrow - now).total_seconds())
 
-                ts = int(time.time())
-                pdf_path = paper_dir / f"{self.agency}-{ts}.pdf"
-                png_path = paper_dir / f"{self.agency}-{ts}.png"
+    def _cached_viewers(self, page_date: str, viewers: list[str]) -> dict:
+        try:
+            return self.redis.get_resolved_viewers(page_date, viewers)
+        except Exception:
+            logger.warning("Viewer cache unavailable, resolving all viewers")
+            return {}
+
+    def _resolve_viewers(
+        self,
+        viewers: list[str],
+        page_date: str = "",
+    ) -> list[tuple[str, str, str]]:
+        """
+        Resolve viewer links to (paper, shamsi_date, pdf_url).
+
+        Viewers resolved earlier today come from Redis (one MGET); only
+        the rest hit the network, on a bounded thread pool sharing the
+        retrying session or on the aiohttp engine
+        (PISHKHAN_HTTP_ENGINE="aiohttp"). Results keep the order of
+        `viewers`, failed links are dropped.
+        """
+        started = time.monotonic()
+
+        cached = self._cached_viewers(page_date, viewers) if page_date else {}
+        misses = [v for v in viewers if not cached.get(v)]
+
+        if not misses:
+            fresh = []
+        elif config.PISHKHAN_HTTP_ENGINE == "aiohttp":
+            fresh = run_sync(self._aresolve_all(misses))
+        else:
+            fresh = bounded_map(
+                self._safe_extract_pdf,
+                misses,
+                workers=config.PISHKHAN_RESOLVE_WORKERS,
+                key=lambda url: urlsplit(url).netloc,
+                per_key_limit=config.PISHKHAN_PER_HOST_LIMIT,
+            )
 
-                try:
-                    r = self.session.get(pdf_url, timeout=120)
-                    r.raise_for_status()
+        fresh_by_url = {v: r for v, r in zip(misses, fresh) if r}
 
-                    if not r.content.startswith(b"%PDF"):
-                        continue
+        if page_date and fresh_by_url:
+            try:
+                self.redis.cache_resolved_viewers(
+                    page_date,
+                    fresh_by_url,
+                    ttl=self._seconds_until_day_end(),
+                )
+            except Exception:
+                logger.warning("Failed to cache %d resolved viewers", len(fresh_by_url))
+
+        resolved = []
+        for viewer in viewers:
+            result = cached.get(viewer) or fresh_by_url.get(viewer)
+            if result:
+                resolved.append(tuple(result))
+
+        elapsed = time.monotonic() - started
+        metrics.observe("viewer_resolve", elapsed)
+        metrics.inc("viewers_cached", len(viewers) - len(misses))
+        metrics.inc("viewers_unresolved", len(viewers) - len(resolved))
+
+        logger.info(
+            "Resolved %d/%d viewer links in %.1fs (%d cached, %s)",
+            len(resolved),
+            len(viewers),
+            elapsed,
+            len(viewers) - len(misses),
+            config.PISHKHAN_HTTP_ENGINE,
+        )
+        return resolved
 
-                    pdf_path.write_bytes(r.content)
+    # --------------------------------------------------
+    # Pipeline stages: fetch -> render -> upload
+    # --------------------------------------------------
+    def _plan_jobs(
+        self,
+        resolved: list[tuple[str, str, str]],
+        output_root: Path,
+        gregorian_date: str,
+    ) -> list[PaperJob]:
+        """
+        Drop already-downloaded papers (one MGET for the whole listing)
+        and reserve a unique output path for each remaining one (stages
+        run concurrently, so two papers must never share a timestamped
+        file name).
+        """
+        jobs = []
+        reserved: set[Path] = set()
+
+        issue_ids = [
+            f"{paper}:{pdf_shamsi_date}:{self._hash(pdf_url)}"
+            for paper, pdf_shamsi_date, pdf_url in resolved
+        ]
+        downloaded = self.redis.are_downloaded(self.agency, issue_ids)
+
+        for (paper, pdf_shamsi_date, pdf_url), pdf_issue_id in zip(resolved, issue_ids):
+            if downloaded.get(pdf_issue_id):
+                continue
 
-                    try:
-                        build_cover_png(pdf_path, png_path, dpi=200)
-                    except Exception as e:
-                        logger.warning("Cover build failed: %s (%s)", pdf_path, e)
-
-                except RequestException as e:
-                    logger.warning("PDF download failed: %s (%s)", pdf_url, e)
-                    continue
-
-                # -------- Dual Write --------
-                pdf_remote_key = f"{self.agency}/{paper}/{gregorian_date}/{pdf_path.name}"
-                png_remote_key = f"{self.agency}/{paper}/{gregorian_date}/{png_path.name}"
-
-                pdf_remote_uri = self.storage.save(pdf_path, pdf_remote_key)
-                png_remote_uri = (
-                    self.storage.save(png_path, png_remote_key)
-                    if png_path.exists()
-                    else None
+            paper_dir = output_root / paper / gregorian_date
+            paper_dir.mkdir(parents=True, exist_ok=True)
+
+            ts = int(time.time())
+            while (
+                paper_dir / f"{self.agency}-{ts}.pdf" in reserved
+                or (paper_dir / f"{self.agency}-{ts}.pdf").exists()
+            ):
+                ts += 1
+
+            pdf_path = paper_dir / f"{self.agency}-{ts}.pdf"
+            reserved.add(pdf_path)
+
+            jobs.append(
+                PaperJob(
+                    paper=paper,
+                    shamsi_date=pdf_shamsi_date,
+                    gregorian_date=gregorian_date,
+                    pdf_url=pdf_url,
+                    issue_id=pdf_issue_id,
+                    ts=ts,
+                    pdf_path=pdf_path,
+                    png_path=paper_dir / f"{self.agency}-{ts}.png",
                 )
+            )
 
-                self.redis.record_download(
-                    agency=self.agency,
-                    issue_no=pdf_issue_id,
-                    payload={
-                        "paper": paper,
-                        "shamsi_date": pdf_shamsi_date,
-                        "gregorian_date": gregorian_date,
-                        "pdf": {
-                            "local": str(pdf_path),
-                            "remote": pdf_remote_uri,
-                        },
-                        "png": {
-                            "local": str(png_path) if png_path.exists() else None,
-                            "remote": png_remote_uri,
-                        },
-                        "timestamp": ts,
-                    },
-                )
+        return jobs
+
+    def _fetch_stage(self, job: PaperJob):
+        try:
+            result = stream_download(
+                self.session,
+                job.pdf_url,
+                job.pdf_path,
+                timeout=120,
+                resume=True,
+            )
+        except UnexpectedContentError as e:
+            logger.warning("Not a PDF, skipped: %s (%s)", job.pdf_url, e)
+            return None
+        except (RequestException, DownloadError) as e:
+            logger.warning("PDF download failed: %s (%s)", job.pdf_url, e)
+            self._failed = True
+            return None
+
+        job.sha256 = result.sha256
+
+        # -------- Content dedup (skip render + upload) --------
+        existing = find_duplicate(self.redis, job.sha256)
+        if existing:
+            self._record_duplicate(job, existing)
+            return None
+
+        with self._content_lock:
+            owner = self._content_owners.setdefault(job.sha256, job)
+
+        if owner is not job:
+            # Same bytes as another paper of this run: link it once the
+            # owner has been stored (see download)
+            job.pdf_path.unlink(missing_ok=True)
+            self._deferred_duplicates.append(job)
+            return None
+
+        return job
+
+    def _record_duplicate(self, job: PaperJob, existing: dict) -> None:
+        job.pdf_path.unlink(missing_ok=True)
+
+        payload = duplicate_payload(
+            existing,
+            job.sha256,
+            paper=job.paper,
+            shamsi_date=job.shamsi_date,
+            gregorian_date=job.gregorian_date,
+            timestamp=job.ts,
+        )
+        with self._content_lock:
+            self._duplicates += 1
+        self._add_record(job.issue_id, payload)
+        logger.info(
+            "Identical PDF already stored, reused: %s (%s:%s)",
+            job.pdf_url,
+            existing.get("agency"),
+            existing.get("issue_no"),
+        )
 
-                downloaded += 1
-                logger.info("Saved PDF (dual): %s", pdf_path)
+    def _render_stage(self, job: PaperJob):
+        try:
+            cover = render_cover(job.png_path, pdf_path=job.pdf_path)
+            job.derivatives = cover.derivatives
+        except Exception as e:
+            logger.warning("Cover build failed: %s (%s)", job.pdf_path, e)
+        return job
+
+    def _upload_stage(self, job: PaperJob):
+        # -------- Dual Write --------
+        prefix = f"{self.agency}/{job.paper}/{job.gregorian_date}"
+        pdf_remote_key = f"{prefix}/{job.pdf_path.name}"
+        png_remote_key = f"{prefix}/{job.png_path.name}"
+
+        has_png = job.png_path.exists()
+
+        files: list[IssueFile] = [(job.pdf_path, pdf_remote_key, "pdf")]
+        if has_png:
+            files.append((job.png_path, png_remote_key, "png"))
+        files += [
+            (path, f"{prefix}/{path.name}", f"derivatives.{name}")
+            for name, path in job.derivatives.items()
+        ]
+
+        # Inline: PDF, cover and derivatives are uploaded concurrently.
+        # Outbox: queued after the records are flushed (see _flush_records).
+        outbox = config.UPLOAD_MODE == "outbox"
+        remote = {} if outbox else upload_files(self.storage, files)
+
+        derivatives = {
+            name: {"local": str(path), "remote": remote.get(f"derivatives.{name}")}
+            for name, path in job.derivatives.items()
+        }
+
+        payload = {
+            "paper": job.paper,
+            "shamsi_date": job.shamsi_date,
+            "gregorian_date": job.gregorian_date,
+            "pdf": {
+                "local": str(job.pdf_path),
+                "remote": remote.get("pdf"),
+            },
+            "png": {
+                "local": str(job.png_path) if has_png else None,
+                "remote": remote.get("png"),
+            },
+            "derivatives": derivatives,
+            "sha256": job.sha256,
+            "timestamp": job.ts,
+        }
+
+        self._add_record(
+            job.issue_id,
+            payload,
+            content=content_entry(self.agency, job.issue_id, payload) if job.sha256 else None,
+            upload=(job.issue_id, files, job.sha256) if outbox else None,
+            sha256=job.sha256,
+        )
+
+        logger.info("Saved PDF (dual): %s", job.pdf_path)
+        return job
+
+    def _build_pipeline(self) -> Pipeline:
+        return Pipeline([
+            Stage(
+                "fetch",
+                self._fetch_stage,
+                workers=config.PISHKHAN_FETCH_WORKERS,
+                queue_size=config.PISHKHAN_QUEUE_SIZE,
+            ),
+            Stage(
+                "render",
+                self._render_stage,
+                workers=config.PISHKHAN_RENDER_WORKERS,
+                queue_size=config.PISHKHAN_QUEUE_SIZE,
+            ),
+            Stage(
+                "upload",
+                self._upload_stage,
+                workers=config.PISHKHAN_UPLOAD_WORKERS,
+                queue_size=config.PISHKHAN_QUEUE_SIZE,
+            ),
+        ])
+
+    def _add_record(
+        self,
+        issue_id: str,
+        payload: dict,
+        content: Optional[dict] = None,
+        upload: Optional[tuple] = None,
+        sha256: Optional[str] = None,
+    ) -> None:
+        """
+        Queue a download record (plus its content index entry and outbox
+        uploads); every PISHKHAN_RECORD_BATCH records are written as the
+        upload stage goes, so a run that dies late loses at most one batch.
+        """
+        with self._content_lock:
+            self._records.append((issue_id, payload))
+            if content is not None:
+                self._contents[sha256] = content
+                self._stored[sha256] = content
+            if upload is not None:
+                self._uploads.append(upload)
+
+            if len(self._records) < config.PISHKHAN_RECORD_BATCH:
+                return
+            batch = self._take_records()
+
+        self._write_records(*batch)
+
+    def _take_records(self):
+        # Caller holds self._content_lock
+        batch = self._records, self._contents, self._uploads
+        self._records, self._contents, self._uploads = [], {}, []
+        return batch
+
+    def _flush_records(self) -> None:
+        """
+        Write the records still pending. Called from download's finally,
+        so papers already stored are recorded even if the run fails later.
+        """
+        with self._content_lock:
+            batch = self._take_records()
+        self._write_records(*batch)
+
+    def _write_records(self, records, contents, uploads) -> None:
+        """
+        Write download records and content index entries in one pipelined
+        round trip, then queue their outbox uploads. If Redis fails the
+        run's validators are dropped, so the next run stores these papers
+        again instead of getting a 304 on /all.
+        """
+        if not records and not contents:
+            return
 
-            if downloaded == 0:
+        try:
+            self.redis.record_downloads(self.agency, records, contents)
+        except Exception:
+            logger.exception(
+                "Failed to record %d Pishkhan downloads", len(records)
+            )
+            self._failed = True
+            self.discard_validators()
+            return
+
+        with self._content_lock:
+            self._recorded += len(records)
+
+        for issue_id, files, sha256 in uploads:
+            try:
+                get_outbox().enqueue(self.agency, issue_id, files, sha256=sha256)
+            except Exception:
+                logger.exception("Failed to queue uploads for %s", issue_id)
+
+    # --------------------------------------------------
+    # Core download + Dual Write
+    # --------------------------------------------------
+    def download(self, temp_dir: Path) -> Path:
+        self._records: list[tuple[str, dict]] = []
+        self._contents: dict[str, dict] = {}
+        self._uploads: list[tuple[str, list[IssueFile], Optional[str]]] = []
+        self._stored: dict[str, dict] = {}  # sha256 -> content entry, whole run
+        self._content_lock = threading.Lock()
+        self._failed = False
+        self._recorded = 0
+
+        try:
+            soup = self._fetch_all_page()
+            shamsi_date = self._extract_shamsi_date(soup)
+            gregorian_date = self._today_gregorian()
+            viewers = self._collect_viewers(soup)
+
+            output_root = config.OUTPUT_DIR / "data" / self.agency
+            output_root.mkdir(parents=True, exist_ok=True)
+
+            resolved = self._resolve_viewers(viewers, page_date=shamsi_date)
+            jobs = self._plan_jobs(resolved, output_root, gregorian_date)
+            self._content_owners = {}
+            self._deferred_duplicates = []
+            self._duplicates = 0
+
+            done = self._build_pipeline().run(jobs)
+            downloaded = len(done)
+
+            for job in self._deferred_duplicates:
+                existing = self._stored.get(job.sha256)
+                if existing:
+                    self._record_duplicate(job, existing)
+                else:
+                    # Owner failed in fetch/render/upload: fetch again next run
+                    logger.warning("Duplicate left unrecorded, owner failed: %s", job.pdf_url)
+                    self._failed = True
+
+            if self._failed or len(resolved) < len(viewers):
+                # Retry the failed papers next run even if /all is unchanged
+                self.discard_validators()
+
+            if downloaded == 0 and self._duplicates == 0:
                 logger.warning("No new PDFs from Pishkhan")
+            else:
+                logger.info(
+                    "Pishkhan saved %d/%d new PDFs (%d duplicates reused)",
+                    downloaded,
+                    len(jobs),
+                    self._duplicates,
+                )
+
+        except NotModified:
+            logger.info("Pishkhan /all unchanged since last run, nothing new")
 
         except RuntimeError as e:
+            self.discard_validators()
             logger.error("Pishkhan network/structure error: %s", e)
 
         except Exception:
+            self.discard_validators()
             logger.exception("Unexpected Pishkhan scraper failure")
 
         finally:
+            self._flush_records()
+            # One release sample per run, however many batches were written
+            if self._recorded:
+                self.redis.record_release(self.agency)
             done_file = temp_dir / "pishkhan.done"
             done_file.write_text("OK")
             return done_file
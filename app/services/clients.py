@@ -0,0 +1,103 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+from app import config
+
+if TYPE_CHECKING:
+    import requests
+
+    from app.services.object_storage import CompositeStorage
+    from app.services.redis_client import RedisClient
+    from app.services.upload_outbox import UploadOutbox
+
+
+# --------------------------------------------------
+# Process-wide client registry
+# --------------------------------------------------
+# Redis, MinIO and HTTP clients are created on first use and shared by
+# every scraper/run in the process, so importing app.main never touches
+# the network and each backend keeps a single connection pool. Client
+# modules (redis, minio) are imported on first use too.
+_lock = threading.Lock()
+_redis: Optional["RedisClient"] = None
+_storage: Optional["CompositeStorage"] = None
+_outbox: Optional["UploadOutbox"] = None
+_sessions: Dict[str, "requests.Session"] = {}
+
+
+def get_redis() -> "RedisClient":
+    """
+    Shared RedisClient (connects and pings on first call).
+    """
+    global _redis
+    if _redis is None:
+        from app.services.redis_client import RedisClient
+
+        with _lock:
+            if _redis is None:
+                _redis = RedisClient()
+    return _redis
+
+
+def get_storage() -> "CompositeStorage":
+    """
+    Shared CompositeStorage (the bucket check runs on first upload).
+    Uses the Redis upload manifest unless UPLOAD_SKIP_MODE is "off".
+    """
+    global _storage
+    if _storage is None:
+        from app.services.object_storage import CompositeStorage
+
+        manifest = get_redis() if config.UPLOAD_SKIP_MODE != "off" else None
+        with _lock:
+            if _storage is None:
+                _storage = CompositeStorage(manifest=manifest)
+    return _storage
+
+
+def get_outbox() -> "UploadOutbox":
+    """
+    Shared upload outbox (UPLOAD_MODE "outbox").
+    """
+    global _outbox
+    if _outbox is None:
+        from app.services.upload_outbox import UploadOutbox
+
+        redis, storage = get_redis(), get_storage()
+        with _lock:
+            if _outbox is None:
+                _outbox = UploadOutbox(redis, storage)
+    return _outbox
+
+
+def get_session(
+    name: str,
+    factory: Callable[[], "requests.Session"],
+) -> "requests.Session":
+    """
+    Shared HTTP session for `name`, built by `factory` on first call.
+    """
+    session = _sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _sessions.get(name)
+            if session is None:
+                session = _sessions[name] = factory()
+    return session
+
+
+def reset_clients() -> None:
+    """
+    Forget every client (pooled sockets must not be shared with a forked
+    child); the next get_* call builds fresh ones.
+    """
+    global _redis, _storage, _outbox, _lock
+    _lock = threading.Lock()
+    _redis = None
+    _storage = None
+    _outbox = None
+    _sessions.clear()
+
+
+os.register_at_fork(after_in_child=reset_clients)
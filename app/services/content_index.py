@@ -0,0 +1,78 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from app.utils.logger import logger
+
+if TYPE_CHECKING:
+    from app.services.redis_client import RedisClient
+
+# Payload fields that point at stored objects and can be shared
+MEDIA_FIELDS = ("pdf", "png", "derivatives")
+
+
+def find_duplicate(redis: "RedisClient", sha256: Optional[str]) -> Optional[Dict]:
+    """
+    Return the index entry for content we already stored, if its local
+    PDF is still on disk (otherwise the bytes must be processed again).
+    """
+    if not sha256:
+        return None
+
+    entry = redis.get_content(sha256)
+    if not entry:
+        return None
+
+    local_pdf = (entry.get("pdf") or {}).get("local")
+    if not local_pdf or not Path(local_pdf).exists():
+        logger.info("Content index entry is stale, ignoring: %s", sha256[:12])
+        return None
+
+    return entry
+
+
+def remember_content(
+    redis: "RedisClient",
+    sha256: Optional[str],
+    agency: str,
+    issue_no: str,
+    payload: Dict,
+) -> None:
+    """
+    Index a freshly stored issue so identical bytes seen later, under any
+    URL or agency, reuse its objects.
+    """
+    if not sha256:
+        return
+
+    redis.record_content(sha256, content_entry(agency, issue_no, payload))
+
+
+def content_entry(agency: str, issue_no: str, payload: Dict) -> Dict:
+    entry = {field: payload.get(field) for field in MEDIA_FIELDS}
+    entry.update({"agency": agency, "issue_no": issue_no})
+    return entry
+
+
+def remote_fields(entry: Dict) -> List[Tuple[List[str], Optional[str]]]:
+    """
+    (field path, remote URI) of every locally stored object in a payload
+    or index entry, e.g. (["derivatives", "600w"], "s3://..." or None).
+    """
+    items = [([name], entry.get(name)) for name in ("pdf", "png")]
+    items += [
+        (["derivatives", name], item)
+        for name, item in (entry.get("derivatives") or {}).items()
+    ]
+    return [(field, item.get("remote")) for field, item in items if item and item.get("local")]
+
+
+def duplicate_payload(entry: Dict, sha256: str, **fields) -> Dict:
+    """
+    Download record for a duplicate: the original's objects plus this
+    issue's own metadata (paper, dates, timestamp, ...).
+    """
+    payload = {field: entry.get(field) for field in MEDIA_FIELDS}
+    payload.update(fields)
+    payload["sha256"] = sha256
+    payload["duplicate_of"] = f"{entry.get('agency')}:{entry.get('issue_no')}"
+    return payload
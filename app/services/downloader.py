@@ -0,0 +1,357 @@
+import hashlib
+import json
+import shutil
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from app import config
+from app.utils.concurrency import KeyedLimiter
+from app.utils.logger import logger
+from app.utils.metrics import metrics
+
+PDF_MAGIC = b"%PDF"
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+class UnexpectedContentError(DownloadError):
+    """
+    Body does not start with the expected magic bytes.
+    """
+
+
+class DownloadTooLargeError(DownloadError):
+    pass
+
+
+class _RangeMismatch(Exception):
+    """
+    The server cannot continue the partial file (416, or a 206 for
+    another range): it is discarded and the download restarts from zero.
+    """
+
+
+@dataclass
+class DownloadResult:
+    path: Path
+    size: int
+    sha256: str
+    resumed_from: int = 0
+
+
+# --------------------------------------------------
+# Partial files (resumable downloads)
+# --------------------------------------------------
+_partial_locks = KeyedLimiter(1)
+
+
+def _partial_paths(url: str) -> tuple[Path, Path]:
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    part = config.PARTIAL_DIR / f"{key}.part"
+    return part, part.with_suffix(".json")
+
+
+def _read_sidecar(sidecar: Path, url: str) -> Optional[dict]:
+    try:
+        meta = json.loads(sidecar.read_text())
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("url") == url else None
+
+
+def _write_sidecar(sidecar: Path, meta: dict) -> None:
+    tmp = sidecar.with_name(sidecar.name + ".tmp")
+    tmp.write_text(json.dumps(meta))
+    tmp.replace(sidecar)
+
+
+def _discard_partial(part: Path, sidecar: Path) -> None:
+    part.unlink(missing_ok=True)
+    sidecar.unlink(missing_ok=True)
+
+
+def prune_partials(max_age_hours: float = config.PARTIAL_MAX_AGE_HOURS) -> None:
+    """
+    Drop partial downloads nobody resumed in time.
+    """
+    if not config.PARTIAL_DIR.exists():
+        return
+
+    cutoff = time.time() - max_age_hours * 3600
+    for item in config.PARTIAL_DIR.iterdir():
+        try:
+            if item.stat().st_mtime < cutoff:
+                item.unlink()
+                logger.info("Removed stale partial download: %s", item)
+        except OSError:
+            logger.warning("Failed to remove partial download: %s", item)
+
+
+def _hash_existing(part: Path, offset: int, magic_len: int):
+    """
+    Re-hash the bytes we already have (streamed, constant memory).
+    """
+    digest = hashlib.sha256()
+    head = b""
+    remaining = offset
+
+    with open(part, "rb") as f:
+        while remaining:
+            chunk = f.read(min(config.DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if len(head) < magic_len:
+                head += chunk[: magic_len - len(head)]
+            digest.update(chunk)
+            remaining -= len(chunk)
+
+    return digest, head
+
+
+def _range_headers(meta: dict, offset: int) -> dict:
+    headers = {"Range": f"bytes={offset}-"}
+
+    # If-Range makes the server send the full body when the file changed
+    etag = meta.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["If-Range"] = etag
+    elif meta.get("last_modified"):
+        headers["If-Range"] = meta["last_modified"]
+
+    return headers
+
+
+# --------------------------------------------------
+# Streaming download
+# --------------------------------------------------
+@metrics.timed("download")
+def stream_download(
+    session: requests.Session,
+    url: str,
+    dest: Path,
+    method: str = "GET",
+    magic: Optional[bytes] = PDF_MAGIC,
+    max_bytes: int = config.DOWNLOAD_MAX_BYTES,
+    chunk_size: int = config.DOWNLOAD_CHUNK_SIZE,
+    timeout=120,
+    resume: bool = False,
+    **request_kwargs,
+) -> DownloadResult:
+    """
+    Stream a response body straight to `dest`.
+
+    Memory use is one chunk regardless of file size. While streaming it:
+        - checks the magic bytes (e.g. %PDF) as soon as they arrive
+        - computes the SHA-256 of the body
+        - aborts once the body exceeds `max_bytes`
+    The body is written to a `.part` file and moved to `dest` on success,
+    so a failed download never leaves a truncated `dest` behind.
+
+    With `resume=True` (GET only) the partial file and a JSON sidecar
+    (offset + ETag/Last-Modified) are kept in PARTIAL_DIR when the
+    transfer breaks, and the next call for the same URL continues with a
+    Range request. Servers that ignore Range, or whose validator changed,
+    answer 200 and the download restarts from zero; a 416, or a 206 for
+    any other range, drops the partial file and retries without Range.
+    The partial file is per URL, so concurrent resumable downloads of one
+    URL take turns.
+    """
+    resume = resume and method.upper() == "GET"
+
+    with _partial_locks.hold(url) if resume else nullcontext():
+        return _stream_download(
+            session,
+            url,
+            dest,
+            method=method,
+            magic=magic,
+            max_bytes=max_bytes,
+            chunk_size=chunk_size,
+            timeout=timeout,
+            resume=resume,
+            **request_kwargs,
+        )
+
+
+def _stream_download(
+    session: requests.Session,
+    url: str,
+    dest: Path,
+    *,
+    method: str,
+    magic: Optional[bytes],
+    max_bytes: int,
+    chunk_size: int,
+    timeout,
+    resume: bool,
+    **request_kwargs,
+) -> DownloadResult:
+    if resume:
+        tmp, sidecar = _partial_paths(url)
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+    else:
+        tmp, sidecar = dest.with_name(dest.name + ".part"), None
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    caller_headers = request_kwargs.pop("headers", None) or {}
+
+    # A resumed request the server cannot continue restarts from zero
+    while True:
+        meta: dict = {"url": url}
+        offset = 0
+
+        if resume:
+            previous = _read_sidecar(sidecar, url)
+            if previous and tmp.exists():
+                meta = previous
+                offset = tmp.stat().st_size
+            else:
+                _discard_partial(tmp, sidecar)
+
+        headers = dict(caller_headers)
+        if offset:
+            headers.update(_range_headers(meta, offset))
+
+        digest = hashlib.sha256()
+        head = b""
+        size = 0
+
+        try:
+            with session.request(
+                method,
+                url,
+                stream=True,
+                timeout=timeout,
+                headers=headers,
+                **request_kwargs,
+            ) as r:
+                if offset and r.status_code == 416:
+                    raise _RangeMismatch(url)
+
+                r.raise_for_status()
+
+                content_range = r.headers.get("Content-Range", "")
+                if offset and r.status_code == 200:
+                    logger.info("Server sent full body, restarting: %s", url)
+                    offset = 0
+                elif offset and not (
+                    r.status_code == 206
+                    and content_range.startswith(f"bytes {offset}-")
+                ):
+                    raise _RangeMismatch(url)
+
+                if offset:
+                    digest, head = _hash_existing(tmp, offset, len(magic or b""))
+                    size = offset
+                    logger.info("Resuming %s from byte %d", url, offset)
+
+                declared = r.headers.get("Content-Length")
+                if declared and declared.isdigit() and offset + int(declared) > max_bytes:
+                    raise DownloadTooLargeError(
+                        f"{url} declares {offset + int(declared)} bytes (limit {max_bytes})"
+                    )
+
+                if resume:
+                    meta = {
+                        "url": url,
+                        "offset": offset,
+                        "etag": r.headers.get("ETag") or meta.get("etag"),
+                        "last_modified": (
+                            r.headers.get("Last-Modified") or meta.get("last_modified")
+                        ),
+                    }
+                    _write_sidecar(sidecar, meta)
+
+                with open(tmp, "ab" if offset else "wb") as f:
+                    for chunk in r.iter_content(chunk_size=chunk_size):
+                        if not chunk:
+                            continue
+
+                        if magic and len(head) < len(magic):
+                            head += chunk[: len(magic) - len(head)]
+                            if len(head) == len(magic) and head != magic:
+                                raise UnexpectedContentError(
+                                    f"{url} is not the expected type "
+                                    f"(starts with {head!r})"
+                                )
+
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise DownloadTooLargeError(
+                                f"{url} exceeded {max_bytes} bytes"
+                            )
+
+                        digest.update(chunk)
+                        f.write(chunk)
+
+            if magic and head != magic:
+                raise UnexpectedContentError(f"{url} returned {size} bytes, no {magic!r}")
+
+            shutil.move(str(tmp), str(dest))
+            if sidecar is not None:
+                sidecar.unlink(missing_ok=True)
+            break
+
+        except _RangeMismatch:
+            # The response is closed by now: drop the partial, start from zero
+            logger.warning("Server cannot resume from the partial file, restarting: %s", url)
+            _discard_partial(tmp, sidecar)
+            continue
+
+        except requests.RequestException:
+            # Transport/HTTP failure: keep what we have for the next attempt
+            if resume and tmp.exists() and tmp.stat().st_size:
+                meta["offset"] = tmp.stat().st_size
+                _write_sidecar(sidecar, meta)
+                logger.warning(
+                    "Download interrupted, kept %d bytes for resume: %s",
+                    meta["offset"],
+                    url,
+                )
+            elif resume:
+                _discard_partial(tmp, sidecar)
+            else:
+                tmp.unlink(missing_ok=True)
+            raise
+
+        except BaseException:
+            if resume:
+                _discard_partial(tmp, sidecar)
+            else:
+                tmp.unlink(missing_ok=True)
+            raise
+
+    metrics.inc("download_bytes", size - offset)
+
+    result = DownloadResult(
+        path=dest,
+        size=size,
+        sha256=digest.hexdigest(),
+        resumed_from=offset,
+    )
+    logger.info(
+        "Downloaded %s -> %s (%d bytes, resumed from %d, sha256=%s)",
+        url,
+        dest,
+        size,
+        offset,
+        result.sha256[:12],
+    )
+    return result
+
+
+def sha256_file(path: Path, chunk_size: int = config.DOWNLOAD_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,161 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+from app import config
+from app.utils.logger import logger
+
+
+class HttpStatusError(aiohttp.ClientError):
+    """
+    Raised by HttpResponse.raise_for_status() on 4xx/5xx.
+    """
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    url: str
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+    charset: Optional[str] = None  # from the Content-Type header
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.body.decode(self.charset or "utf-8", errors="replace")
+        except LookupError:
+            # Unknown charset name: the sites serve UTF-8
+            return self.body.decode("utf-8", errors="replace")
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise HttpStatusError(self.status, self.url)
+
+
+def backoff_delay(retry: int, backoff_factor: float) -> float:
+    """
+    Sleep before the n-th retry (1-based), matching urllib3's Retry:
+    no sleep before the first retry, then factor * 2 ** (n - 1).
+    """
+    if retry <= 1:
+        return 0.0
+    return backoff_factor * (2 ** (retry - 1))
+
+
+class AsyncHttpClient:
+    """
+    aiohttp-based HTTP engine, used by Pishkhan to resolve viewer links
+    when PISHKHAN_HTTP_ENGINE is "aiohttp".
+
+    One client (one connection pool) is shared by every coroutine of a
+    fan-out, so a single event loop can keep hundreds of requests in
+    flight. Connection and read errors are retried with the
+    same policy as the requests sessions (HTTP_RETRY_*); HTTP error
+    statuses are returned as-is, like `raise_on_status=False`.
+
+    Usage:
+        async with AsyncHttpClient(headers=...) as client:
+            r = await client.get(url)
+    """
+
+    def __init__(
+        self,
+        headers: Optional[dict] = None,
+        retries: int = config.HTTP_RETRY_TOTAL,
+        backoff_factor: float = config.HTTP_RETRY_BACKOFF,
+        limit: int = config.HTTP_MAX_CONNECTIONS,
+        limit_per_host: int = config.HTTP_MAX_PER_HOST,
+    ):
+        self.headers = headers or {}
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncHttpClient":
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # --------------------------------------------------
+    # Core request with retry/backoff
+    # --------------------------------------------------
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: tuple[float, float] = (5, 20),
+        **kwargs,
+    ) -> HttpResponse:
+        if self._session is None:
+            raise RuntimeError("AsyncHttpClient used outside 'async with'")
+
+        connect_timeout, read_timeout = timeout
+        client_timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout,
+            sock_read=read_timeout,
+        )
+
+        attempt = 0
+        while True:
+            try:
+                async with self._session.request(
+                    method,
+                    url,
+                    timeout=client_timeout,
+                    **kwargs,
+                ) as resp:
+                    body = await resp.read()
+                    return HttpResponse(
+                        status=resp.status,
+                        url=str(resp.url),
+                        headers=dict(resp.headers),
+                        body=body,
+                        charset=resp.charset,
+                    )
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+
+                delay = backoff_delay(attempt, self.backoff_factor)
+                logger.warning(
+                    "%s %s failed (%s), retry %d/%d in %.1fs",
+                    method,
+                    url,
+                    e.__class__.__name__,
+                    attempt,
+                    self.retries,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("POST", url, **kwargs)
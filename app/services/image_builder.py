@@ -1,41 +1,166 @@
+import atexit
+import multiprocessing
+import multiprocessing.util
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-import fitz  # PyMuPDF
+from typing import TYPE_CHECKING, Optional
 
+from app import config
 from app.utils.logger import logger
+from app.utils.metrics import metrics
 
+if TYPE_CHECKING:
+    import fitz
 
-def build_cover_png(pdf_path: Path, output_png: Path, dpi: int = 200) -> None:
+
+@dataclass
+class CoverRender:
+    """
+    Result of one cover render, with per-step timings in milliseconds.
+    """
+
+    output_png: Path
+    open_ms: float
+    render_ms: float
+    save_ms: float
+    derive_ms: float = 0.0
+    derivatives: dict[str, Path] = field(default_factory=dict)
+
+    @property
+    def total_ms(self) -> float:
+        return self.open_ms + self.render_ms + self.save_ms + self.derive_ms
+
+
+# --------------------------------------------------
+# Derivatives (thumbnails / WebP / JPEG)
+# --------------------------------------------------
+_PIL_FORMATS = {"png": "PNG", "webp": "WEBP", "jpeg": "JPEG", "jpg": "JPEG"}
+
+
+def derivative_path(output_png: Path, spec: dict) -> Path:
+    """
+    {agency}-{ts}.png -> {agency}-{ts}-{name}.{format}
+    """
+    ext = spec.get("format", "png").lower()
+    return output_png.with_name(f"{output_png.stem}-{spec['name']}.{ext}")
+
+
+def _save_derivatives(
+    pix: "fitz.Pixmap",
+    output_png: Path,
+    specs: list[dict],
+) -> dict[str, Path]:
+    from PIL import Image
+
+    mode = "RGBA" if pix.alpha else "RGB"
+    full = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+    if mode == "RGBA":
+        full = full.convert("RGB")
+
+    saved = {}
+    for spec in specs:
+        fmt = _PIL_FORMATS.get(spec.get("format", "png").lower())
+        if fmt is None:
+            raise ValueError(f"Unsupported cover format: {spec.get('format')}")
+
+        width = spec.get("width")
+        img = full
+        if width and width < full.width:
+            height = max(1, round(full.height * width / full.width))
+            img = full.resize((width, height), Image.LANCZOS)
+
+        path = derivative_path(output_png, spec)
+        options = {}
+        if fmt in ("WEBP", "JPEG"):
+            options["quality"] = spec.get("quality", 80)
+        if fmt == "PNG":
+            options["optimize"] = True
+
+        img.save(path, format=fmt, **options)
+        saved[spec["name"]] = path
+
+    return saved
+
+
+def build_cover_png(
+    pdf_path: Optional[Path],
+    output_png: Path,
+    dpi: int = 200,
+    pdf_bytes: Optional[bytes] = None,
+    derivatives: Optional[list[dict]] = None,
+) -> CoverRender:
     """
     Extract first page of PDF and save as PNG using PyMuPDF.
     Does NOT require poppler or system dependencies.
+    The PDF is read from `pdf_path`, or from `pdf_bytes` when given.
+    `derivatives` (see COVER_DERIVATIVES) are resized from the same
+    rasterization instead of rendering the page again.
     """
+    # Imported on first render; with a render pool only the workers load it
+    import fitz  # PyMuPDF
+
     doc = None
+    source = pdf_path if pdf_bytes is None else f"<{len(pdf_bytes)} bytes>"
 
     try:
-        logger.info("Building cover PNG from PDF: %s", pdf_path)
+        logger.info("Building cover PNG from PDF: %s", source)
 
-        doc = fitz.open(pdf_path)
+        t0 = time.perf_counter()
+        if pdf_bytes is not None:
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        else:
+            doc = fitz.open(pdf_path)
 
         if doc.page_count == 0:
             raise RuntimeError("PDF has no pages")
 
         page = doc.load_page(0)
+        t1 = time.perf_counter()
 
         # Convert DPI to zoom factor (72 is default PDF DPI)
         zoom = dpi / 72
         matrix = fitz.Matrix(zoom, zoom)
 
         pix = page.get_pixmap(matrix=matrix)
+        t2 = time.perf_counter()
 
         output_png.parent.mkdir(parents=True, exist_ok=True)
         pix.save(str(output_png))
+        t3 = time.perf_counter()
+
+        saved = _save_derivatives(pix, output_png, derivatives) if derivatives else {}
+        t4 = time.perf_counter()
+
+        result = CoverRender(
+            output_png=output_png,
+            open_ms=(t1 - t0) * 1000,
+            render_ms=(t2 - t1) * 1000,
+            save_ms=(t3 - t2) * 1000,
+            derive_ms=(t4 - t3) * 1000,
+            derivatives=saved,
+        )
 
-        logger.info("Cover PNG created successfully: %s", output_png)
+        logger.info(
+            "Cover PNG created successfully: %s (+%d derivatives, %.0f ms: "
+            "open %.0f, render %.0f, save %.0f, derive %.0f)",
+            output_png,
+            len(saved),
+            result.total_ms,
+            result.open_ms,
+            result.render_ms,
+            result.save_ms,
+            result.derive_ms,
+        )
+        return result
 
     except Exception:
         logger.exception(
             "Failed to build cover PNG from PDF: %s",
-            pdf_path,
+            source,
         )
         raise
 
@@ -44,4 +169,136 @@ def build_cover_png(pdf_path: Path, output_png: Path, dpi: int = 200) -> None:
             try:
                 doc.close()
             except Exception:
-                logger.exception("Failed to close PDF document: %s", pdf_path)
+                logger.exception("Failed to close PDF document: %s", source)
+
+
+# --------------------------------------------------
+# Process-pool renderer
+# --------------------------------------------------
+class CoverRenderer:
+    """
+    Renders covers on a pool of worker processes, so PyMuPDF work runs
+    off the calling (fetch) thread and on every core.
+
+    Workers are started with `spawn`: the callers are multi-threaded and
+    forking a threaded process is unsafe.
+    """
+
+    def __init__(self, workers: int = config.COVER_RENDER_WORKERS):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def submit(
+        self,
+        output_png: Path,
+        pdf_path: Optional[Path] = None,
+        pdf_bytes: Optional[bytes] = None,
+        dpi: int = config.COVER_DPI,
+        derivatives: Optional[list[dict]] = None,
+    ) -> "Future[CoverRender]":
+        if (pdf_path is None) == (pdf_bytes is None):
+            raise ValueError("Pass exactly one of pdf_path / pdf_bytes")
+
+        return self._executor().submit(
+            build_cover_png,
+            pdf_path,
+            output_png,
+            dpi,
+            pdf_bytes,
+            derivatives,
+        )
+
+    def render(self, output_png: Path, **kwargs) -> CoverRender:
+        return self.submit(output_png, **kwargs).result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+_renderer: Optional[CoverRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_cover_renderer() -> CoverRenderer:
+    """
+    Process-wide renderer; the pool starts on first use.
+
+    It is closed at interpreter exit, and also when a multiprocessing
+    child exits (those skip atexit and would otherwise wait forever on
+    the idle workers).
+    """
+    global _renderer
+
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = CoverRenderer()
+            atexit.register(_renderer.close)
+            # Above the queues' own finalizers (10), which would close the
+            # pool's call queue before the workers get their stop signal
+            multiprocessing.util.Finalize(None, _renderer.close, exitpriority=20)
+        return _renderer
+
+
+def _forget_inherited_renderer() -> None:
+    # A forked child gets the parent's renderer without its worker
+    # processes or manager thread; it starts its own pool on first use.
+    global _renderer, _renderer_lock
+
+    _renderer = None
+    _renderer_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_forget_inherited_renderer)
+
+
+def shutdown_cover_renderer() -> None:
+    """
+    Stop the shared pool now (e.g. before measuring child resource use).
+    """
+    with _renderer_lock:
+        renderer = _renderer
+    if renderer is not None:
+        renderer.close()
+
+
+@metrics.timed("cover_render")
+def render_cover(
+    output_png: Path,
+    pdf_path: Optional[Path] = None,
+    pdf_bytes: Optional[bytes] = None,
+    dpi: int = config.COVER_DPI,
+    derivatives: Optional[list[dict]] = config.COVER_DERIVATIVES,
+) -> CoverRender:
+    """
+    Render a cover (plus its derivatives) on the shared process pool,
+    or inline when COVER_RENDER_WORKERS is 0.
+    """
+    if config.COVER_RENDER_WORKERS <= 0:
+        return build_cover_png(
+            pdf_path,
+            output_png,
+            dpi=dpi,
+            pdf_bytes=pdf_bytes,
+            derivatives=derivatives,
+        )
+
+    return get_cover_renderer().render(
+        output_png,
+        pdf_path=pdf_path,
+        pdf_bytes=pdf_bytes,
+        dpi=dpi,
+        derivatives=derivatives,
+    )
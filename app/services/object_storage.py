@@ -1,80 +1,256 @@
+from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional, Union
+import hashlib
 import logging
+import mimetypes
+import threading
 
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 
 from app import config
+from app.services.downloader import sha256_file
+from app.utils.concurrency import bounded_map
+from app.utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Bytes already in memory, or the local file to stream
+UploadSource = Union[Path, bytes]
+
+# (local path, remote key[, bytes]) accepted by save_many
+UploadItem = Union[tuple[Path, str], tuple[Path, str, Optional[bytes]]]
+
+# Object metadata holding the content hash (x-amz-meta-sha256)
+CHECKSUM_META = "sha256"
+
+
+def content_type_for(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
 
 class StorageBackend:
-    def save(self, local_path: Path, remote_path: str) -> Optional[str]:
+    def save(
+        self,
+        local_path: Path,
+        remote_path: str,
+        data: Optional[bytes] = None,
+    ) -> Optional[str]:
         """
         Save a file to storage backend.
+        `data`, when given, is the file's content already in memory.
         Returns final URI if successful.
         """
         raise NotImplementedError
 
+    def save_many(self, items: list[UploadItem]) -> list[Optional[str]]:
+        """
+        Save several files concurrently; URIs are returned in input order.
+        """
+        return bounded_map(
+            lambda item: self.save(*item),
+            items,
+            workers=config.S3_UPLOAD_WORKERS,
+        )
+
 
 class LocalStorage(StorageBackend):
-    def save(self, local_path: Path, remote_path: str) -> str:
+    def save(
+        self,
+        local_path: Path,
+        remote_path: str,
+        data: Optional[bytes] = None,
+    ) -> str:
         # File already exists locally; return local URI
         logger.debug(f"LocalStorage: using local file {local_path}")
         return f"file://{local_path}"
 
 
 class MinIOStorage(StorageBackend):
-    def __init__(self) -> None:
+    """
+    `manifest` (RedisClient) remembers which object holds each uploaded
+    sha256, so content uploaded before is reused instead of uploaded
+    again under a new key; see UPLOAD_SKIP_MODE.
+    """
+
+    def __init__(self, manifest=None) -> None:
+        # Enough pooled connections for every file and part in flight
+        pool_size = max(10, config.S3_UPLOAD_WORKERS * config.S3_PARALLEL_PARTS)
+
         self.client = Minio(
             endpoint=config.S3_ENDPOINT.replace("http://", "").replace("https://", ""),
             access_key=config.S3_ACCESS_KEY,
             secret_key=config.S3_SECRET_KEY,
             secure=config.S3_SECURE,
+            region=config.S3_REGION,
+            http_client=urllib3.PoolManager(
+                maxsize=pool_size,
+                timeout=urllib3.Timeout(connect=10, read=300),
+                retries=urllib3.Retry(
+                    total=5,
+                    backoff_factor=0.2,
+                    status_forcelist=[500, 502, 503, 504],
+                ),
+            ),
         )
 
         self.bucket = config.S3_BUCKET
-        self._ensure_bucket()
+        self.manifest = manifest
+        self._bucket_ready = False
+        self._bucket_lock = threading.Lock()
 
     def _ensure_bucket(self) -> None:
         """
-        Ensure bucket exists.
+        Ensure bucket exists. Checked once, on the first upload.
         """
+        if self._bucket_ready:
+            return
+
+        with self._bucket_lock:
+            if self._bucket_ready:
+                return
+            try:
+                if not self.client.bucket_exists(self.bucket):
+                    self.client.make_bucket(self.bucket)
+                    logger.info(f"MinIO bucket created: {self.bucket}")
+                self._bucket_ready = True
+            except S3Error as exc:
+                logger.exception(f"Failed to ensure bucket {self.bucket}: {exc}")
+                raise
+
+    def _uri(self, remote_path: str) -> str:
+        return f"s3://{self.bucket}/{remote_path}"
+
+    def find_uploaded(self, remote_path: str, sha256: str) -> Optional[str]:
+        """
+        URI of an object in this bucket that already holds this content,
+        under `remote_path` or the key it was first uploaded under.
+        Lookup failures count as "not uploaded" (we upload).
+        """
+        mode = config.UPLOAD_SKIP_MODE
+        if mode not in ("manifest", "stat"):
+            return None
+
+        prefix = self._uri("")
+        key = remote_path
+
         try:
-            if not self.client.bucket_exists(self.bucket):
-                self.client.make_bucket(self.bucket)
-                logger.info(f"MinIO bucket created: {self.bucket}")
+            if self.manifest is not None:
+                recorded = self.manifest.get_upload_uri(sha256)
+                if recorded and recorded.startswith(prefix):
+                    if mode == "manifest":
+                        return recorded
+                    key = recorded[len(prefix):]
+
+            if mode == "stat":
+                stat = self.client.stat_object(self.bucket, key)
+                metadata = stat.metadata or {}
+                if metadata.get(f"x-amz-meta-{CHECKSUM_META}") == sha256:
+                    return self._uri(key)
+
         except S3Error as exc:
-            logger.exception(f"Failed to ensure bucket {self.bucket}: {exc}")
-            raise
+            if exc.code not in ("NoSuchKey", "NoSuchObject", "ResourceNotFound"):
+                logger.warning(f"Stat failed for {key}: {exc}")
+        except Exception as exc:
+            logger.warning(f"Upload manifest lookup failed for {remote_path}: {exc}")
+
+        return None
+
+    def put(
+        self,
+        source: UploadSource,
+        remote_path: str,
+        sha256: Optional[str] = None,
+    ) -> str:
+        """
+        Upload bytes or a local file with put_object. Objects larger than
+        S3_PART_SIZE go multipart, S3_PARALLEL_PARTS parts at a time.
+        """
+        self._ensure_bucket()
+
+        stream: BinaryIO
+        if isinstance(source, bytes):
+            stream, length = BytesIO(source), len(source)
+        else:
+            stream, length = open(source, "rb"), source.stat().st_size
 
-    def save(self, local_path: Path, remote_path: str) -> Optional[str]:
         try:
-            self.client.fput_object(
+            self.client.put_object(
                 bucket_name=self.bucket,
                 object_name=remote_path,
-                file_path=str(local_path),
+                data=stream,
+                length=length,
+                content_type=content_type_for(remote_path),
+                metadata={CHECKSUM_META: sha256} if sha256 else None,
+                part_size=config.S3_PART_SIZE,
+                num_parallel_uploads=config.S3_PARALLEL_PARTS,
             )
+        finally:
+            stream.close()
+
+        return self._uri(remote_path)
 
-            uri = f"s3://{self.bucket}/{remote_path}"
+    @metrics.timed("storage_save")
+    def save(
+        self,
+        local_path: Path,
+        remote_path: str,
+        data: Optional[bytes] = None,
+    ) -> Optional[str]:
+        try:
+            sha256 = (
+                hashlib.sha256(data).hexdigest()
+                if data is not None
+                else sha256_file(local_path)
+            )
+
+            existing = self.find_uploaded(remote_path, sha256)
+            if existing:
+                logger.info(f"MinIO already holds {remote_path}, upload skipped: {existing}")
+                metrics.inc("uploads_skipped")
+                return existing
+
+            uri = self.put(
+                data if data is not None else local_path,
+                remote_path,
+                sha256=sha256,
+            )
             logger.info(f"MinIO upload successful: {uri}")
+            metrics.inc(
+                "upload_bytes",
+                len(data) if data is not None else local_path.stat().st_size,
+            )
+
+            if self.manifest is not None:
+                try:
+                    self.manifest.record_upload(sha256, uri)
+                except Exception as exc:
+                    # The object is stored; a later upload of it is just not skipped
+                    logger.warning(f"Upload manifest not updated for {uri}: {exc}")
+
             return uri
 
-        except S3Error as exc:
+        except (S3Error, OSError, urllib3.exceptions.HTTPError) as exc:
             logger.exception(f"MinIO upload failed for {local_path}: {exc}")
+            metrics.inc("uploads_failed")
             return None
 
 
 class CompositeStorage(StorageBackend):
-    def __init__(self) -> None:
+    def __init__(self, manifest=None) -> None:
         self.local = LocalStorage()
-        self.remote = MinIOStorage()
+        self.remote = MinIOStorage(manifest=manifest)
 
-    def save(self, local_path: Path, remote_path: str) -> Optional[str]:
+    def save(
+        self,
+        local_path: Path,
+        remote_path: str,
+        data: Optional[bytes] = None,
+    ) -> Optional[str]:
         # Always keep local copy
         self.local.save(local_path, remote_path)
 
         # Best-effort remote upload
-        return self.remote.save(local_path, remote_path)
+        return self.remote.save(local_path, remote_path, data)
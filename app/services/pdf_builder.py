@@ -1,33 +1,119 @@
+import io
 from pathlib import Path
-from PyPDF2 import PdfMerger
+from typing import Iterable, Union
 
+from app import config
+from app.utils.converters import iter_zip_pdfs
 from app.utils.logger import logger
+from app.utils.metrics import metrics
 
+# (label for logs, file path or in-memory PDF bytes)
+PdfSource = tuple[str, Union[Path, bytes]]
+
+
+def _merge_pypdf2(sources: Iterable[PdfSource], output_pdf: Path) -> int:
+    from PyPDF2 import PdfMerger
 
-def merge_pdfs(pdf_files: list[Path], output_pdf: Path) -> None:
     merger = None
+    count = 0
 
     try:
-        if not pdf_files:
-            raise ValueError("PDF list is empty")
+        merger = PdfMerger()
+
+        for label, src in sources:
+            logger.info("Appending PDF: %s", label)
+            merger.append(io.BytesIO(src) if isinstance(src, bytes) else str(src))
+            count += 1
+
+        if count:
+            merger.write(str(output_pdf))
+        return count
+
+    finally:
+        if merger is not None:
+            try:
+                merger.close()
+            except Exception:
+                logger.exception("Failed to close PdfMerger")
+
+
+def _merge_pymupdf(
+    sources: Iterable[PdfSource],
+    output_pdf: Path,
+    garbage: int = config.PDF_MERGE_GARBAGE,
+    deflate: bool = config.PDF_MERGE_DEFLATE,
+) -> int:
+    """
+    Merge with PyMuPDF's native page insertion; pages are copied in C
+    and never materialised as Python objects.
+    """
+    import fitz  # PyMuPDF
+
+    merged = fitz.open()
+    count = 0
+
+    try:
+        for label, src in sources:
+            logger.info("Appending PDF: %s", label)
+            if isinstance(src, bytes):
+                doc = fitz.open(stream=src, filetype="pdf")
+            else:
+                doc = fitz.open(src)
+
+            with doc:
+                merged.insert_pdf(doc)
+            count += 1
+
+        if count:
+            merged.save(str(output_pdf), garbage=garbage, deflate=deflate)
+        return count
+
+    finally:
+        merged.close()
+
 
-        output_pdf.parent.mkdir(parents=True, exist_ok=True)
+MERGE_ENGINES = {
+    "pymupdf": _merge_pymupdf,
+    "pypdf2": _merge_pypdf2,
+}
 
+
+def _merge(
+    sources: Iterable[PdfSource],
+    output_pdf: Path,
+    engine: str | None,
+) -> int:
+    engine = engine or config.PDF_MERGE_ENGINE
+
+    if engine not in MERGE_ENGINES:
+        raise ValueError(f"Unknown PDF merge engine: {engine}")
+
+    output_pdf.parent.mkdir(parents=True, exist_ok=True)
+
+    with metrics.timer("merge_pdfs"):
+        count = MERGE_ENGINES[engine](sources, output_pdf)
+    if count:
         logger.info(
-            "Merging %d PDFs into %s",
-            len(pdf_files),
+            "Final merged PDF created: %s (%d PDFs, engine=%s)",
             output_pdf,
+            count,
+            engine,
         )
+    return count
 
-        merger = PdfMerger()
 
-        for pdf in pdf_files:
-            logger.info("Appending PDF: %s", pdf)
-            merger.append(str(pdf))
+def merge_pdfs(
+    pdf_files: list[Path],
+    output_pdf: Path,
+    engine: str | None = None,
+) -> None:
+    try:
+        if not pdf_files:
+            raise ValueError("PDF list is empty")
 
-        merger.write(str(output_pdf))
+        logger.info("Merging %d PDFs into %s", len(pdf_files), output_pdf)
 
-        logger.info("Final merged PDF created: %s", output_pdf)
+        _merge(((str(p), p) for p in pdf_files), output_pdf, engine)
 
     except Exception:
         logger.exception(
@@ -36,9 +122,29 @@ def merge_pdfs(pdf_files: list[Path], output_pdf: Path) -> None:
         )
         raise
 
-    finally:
-        if merger is not None:
-            try:
-                merger.close()
-            except Exception:
-                logger.exception("Failed to close PdfMerger")
+
+def merge_pdfs_from_zip(
+    zip_path: Path,
+    output_pdf: Path,
+    engine: str | None = None,
+) -> int:
+    """
+    Merge the PDF members of a ZIP in name order, reading each member
+    into memory instead of extracting the archive to disk.
+    Returns the number of merged PDFs.
+    """
+    try:
+        logger.info("Merging PDFs from ZIP %s into %s", zip_path, output_pdf)
+
+        count = _merge(iter_zip_pdfs(zip_path), output_pdf, engine)
+        if not count:
+            raise RuntimeError(f"No PDFs found in ZIP: {zip_path}")
+        return count
+
+    except Exception:
+        logger.exception(
+            "Failed to merge PDFs from ZIP %s into %s",
+            zip_path,
+            output_pdf,
+        )
+        raise
@@ -2,18 +2,29 @@ import json
 import time
 import redis
 from contextlib import contextmanager
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 
 from app.config import (
     REDIS_HOST,
     REDIS_PORT,
     DOWNLOAD_TTL_DAYS,
+    CONTENT_INDEX_TTL_DAYS,
+    HTTP_VALIDATOR_TTL_DAYS,
+    UPLOAD_MANIFEST_TTL_DAYS,
+    RELEASE_HISTORY_SIZE,
 )
+from app.services.content_index import remote_fields
 from app.utils.logger import logger
+from app.utils.metrics import metrics
 
 
+@metrics.timed_methods("redis", exclude=("acquire_lock",))
 class RedisClient:
-    def __init__(self):
+    def __init__(self, quiet: bool = False):
+        """
+        Connect and ping. A failed connection is logged with its traceback
+        unless `quiet` (the caller reports it, e.g. `status`), then raised.
+        """
         try:
             self.r = redis.Redis(
                 host=REDIS_HOST,
@@ -23,7 +34,8 @@ class RedisClient:
             self.r.ping()
             logger.info("Connected to Redis at %s:%s", REDIS_HOST, REDIS_PORT)
         except Exception:
-            logger.exception("Failed to connect to Redis")
+            if not quiet:
+                logger.exception("Failed to connect to Redis")
             raise
 
     # --------------------------------------------------
@@ -35,6 +47,30 @@ class RedisClient:
     def _lock_key(self, agency: str, issue_no: str) -> str:
         return f"lock:{agency}:{issue_no}"
 
+    def _content_key(self, sha256: str) -> str:
+        return f"content:{sha256}"
+
+    def _duplicates_key(self, sha256: str) -> str:
+        return f"dups:{sha256}"
+
+    def _validator_key(self, url: str) -> str:
+        return f"httpcache:{url}"
+
+    def _viewer_key(self, page_date: str, viewer_url: str) -> str:
+        return f"viewer:{page_date}:{viewer_url}"
+
+    def _upload_key(self, sha256: str) -> str:
+        return f"uploaded:{sha256}"
+
+    def _outbox_key(self) -> str:
+        return "outbox:uploads"
+
+    def _outbox_job_key(self, job_id: str) -> str:
+        return f"outbox:job:{job_id}"
+
+    def _release_key(self, agency: str) -> str:
+        return f"releases:{agency}"
+
     # --------------------------------------------------
     # Dedup check
     # --------------------------------------------------
@@ -60,6 +96,34 @@ class RedisClient:
             )
             raise
 
+    def are_downloaded(
+        self,
+        agency: str,
+        issue_nos: List[str],
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Bulk is_downloaded: one MGET for all issues.
+        """
+        if not issue_nos:
+            return {}
+
+        try:
+            keys = [self._download_key(agency, issue_no) for issue_no in issue_nos]
+            values = self.r.mget(keys)
+
+            return {
+                issue_no: json.loads(value) if value else None
+                for issue_no, value in zip(issue_nos, values)
+            }
+
+        except Exception:
+            logger.exception(
+                "Failed to check download status for %d %s issues",
+                len(issue_nos),
+                agency,
+            )
+            raise
+
     # --------------------------------------------------
     # Distributed lock (CORRECT Context Manager)
     # --------------------------------------------------
@@ -129,11 +193,17 @@ class RedisClient:
         try:
             key = self._download_key(agency, issue_no)
 
-            self.r.setex(
+            pipe = self.r.pipeline(transaction=False)
+            pipe.setex(
                 key,
                 DOWNLOAD_TTL_DAYS * 86400,
                 json.dumps(payload),
             )
+            pending = self._link_duplicate(pipe, key, payload)
+            pipe.execute()
+
+            if pending:
+                self._catch_up_remotes([(key, payload)])
 
             logger.info(
                 "Recorded download in Redis for %s issue %s",
@@ -148,3 +218,384 @@ class RedisClient:
                 issue_no,
             )
             raise
+
+    def record_downloads(
+        self,
+        agency: str,
+        batch: List[Tuple[str, Dict]],
+        contents: Optional[Dict[str, Dict]] = None,
+    ) -> None:
+        """
+        Bulk record_download: every (issue_no, payload) in `batch`, plus
+        optional content index entries (sha256 -> entry), written with a
+        single pipelined round trip.
+        """
+        if not batch and not contents:
+            return
+
+        try:
+            pipe = self.r.pipeline(transaction=False)
+            pending = []
+
+            for issue_no, payload in batch:
+                key = self._download_key(agency, issue_no)
+                pipe.setex(
+                    key,
+                    DOWNLOAD_TTL_DAYS * 86400,
+                    json.dumps(payload),
+                )
+                if self._link_duplicate(pipe, key, payload):
+                    pending.append((key, payload))
+
+            for sha256, entry in (contents or {}).items():
+                pipe.setex(
+                    self._content_key(sha256),
+                    CONTENT_INDEX_TTL_DAYS * 86400,
+                    json.dumps(entry),
+                )
+
+            pipe.execute()
+
+            if pending:
+                self._catch_up_remotes(pending)
+
+            logger.info(
+                "Recorded %d downloads (%d content entries) in Redis for %s",
+                len(batch),
+                len(contents or {}),
+                agency,
+            )
+
+        except Exception:
+            logger.exception(
+                "Failed to record %d downloads for %s",
+                len(batch),
+                agency,
+            )
+            raise
+
+    # --------------------------------------------------
+    # Duplicates waiting for the original's uploads (outbox)
+    # --------------------------------------------------
+    def _link_duplicate(self, pipe, key: str, payload: Dict) -> bool:
+        """
+        Register a duplicate record whose copied remote URIs are still
+        unset under its content, so patch_remote reaches it once the
+        original's files are uploaded. Returns True if it was registered.
+        """
+        sha256 = payload.get("sha256")
+        if not payload.get("duplicate_of") or not sha256:
+            return False
+        if all(uri for _, uri in remote_fields(payload)):
+            return False
+
+        duplicates = self._duplicates_key(sha256)
+        pipe.sadd(duplicates, key)
+        pipe.expire(duplicates, DOWNLOAD_TTL_DAYS * 86400)
+        return True
+
+    def _catch_up_remotes(self, pending: List[Tuple[str, Dict]]) -> None:
+        """
+        Copy URIs the drainer set on the content entry before these
+        duplicates were registered (later ones arrive via patch_remote).
+        """
+        entries = self.r.mget(
+            [self._content_key(payload["sha256"]) for _, payload in pending]
+        )
+        for (key, payload), raw in zip(pending, entries):
+            if not raw:
+                continue
+            copied = {tuple(field): uri for field, uri in remote_fields(payload)}
+            for field, uri in remote_fields(json.loads(raw)):
+                if uri and not copied.get(tuple(field)):
+                    self._patch_remote(key, field, uri)
+
+    # --------------------------------------------------
+    # Release history (when new issues were recorded)
+    # --------------------------------------------------
+    def record_release(self, agency: str) -> None:
+        """
+        Note that a run of `agency` recorded something new. Called once
+        per run by its runner, never per record; a failure only costs the
+        adaptive schedule one sample, so it is logged, not raised.
+        """
+        try:
+            key = self._release_key(agency)
+            pipe = self.r.pipeline(transaction=False)
+            pipe.lpush(key, int(time.time()))
+            pipe.ltrim(key, 0, RELEASE_HISTORY_SIZE - 1)
+            pipe.execute()
+
+        except Exception:
+            logger.exception("Failed to record release for %s", agency)
+
+    def release_history(self, agency: str) -> List[float]:
+        """
+        Unix times at which new issues of `agency` were recorded, newest
+        first (one per run that found something new, see record_release).
+        """
+        try:
+            return [float(ts) for ts in self.r.lrange(self._release_key(agency), 0, -1)]
+
+        except Exception:
+            logger.exception("Failed to read release history for %s", agency)
+            raise
+
+    # --------------------------------------------------
+    # Content-addressed index (sha256 of the PDF)
+    # --------------------------------------------------
+    def get_content(self, sha256: str) -> Optional[Dict]:
+        try:
+            value = self.r.get(self._content_key(sha256))
+            return json.loads(value) if value else None
+
+        except Exception:
+            logger.exception("Failed to read content index for %s", sha256)
+            raise
+
+    def record_content(self, sha256: str, entry: Dict) -> None:
+        try:
+            self.r.setex(
+                self._content_key(sha256),
+                CONTENT_INDEX_TTL_DAYS * 86400,
+                json.dumps(entry),
+            )
+
+        except Exception:
+            logger.exception("Failed to record content index for %s", sha256)
+            raise
+
+    # --------------------------------------------------
+    # Upload manifest (sha256 -> remote object holding it)
+    # --------------------------------------------------
+    def get_upload_uri(self, sha256: str) -> Optional[str]:
+        try:
+            return self.r.get(self._upload_key(sha256))
+
+        except Exception:
+            logger.exception("Failed to read upload manifest for %s", sha256[:12])
+            raise
+
+    def record_upload(self, sha256: str, uri: str) -> None:
+        try:
+            self.r.setex(
+                self._upload_key(sha256),
+                UPLOAD_MANIFEST_TTL_DAYS * 86400,
+                uri,
+            )
+
+        except Exception:
+            logger.exception("Failed to record upload manifest for %s", uri)
+            raise
+
+    # --------------------------------------------------
+    # Upload outbox (sorted set of job ids scored by due time)
+    # --------------------------------------------------
+    def enqueue_uploads(self, jobs: List[Dict], due: float) -> None:
+        if not jobs:
+            return
+
+        try:
+            pipe = self.r.pipeline(transaction=True)
+            for job in jobs:
+                pipe.set(self._outbox_job_key(job["id"]), json.dumps(job))
+            pipe.zadd(self._outbox_key(), {job["id"]: due for job in jobs})
+            pipe.execute()
+
+        except Exception:
+            logger.exception("Failed to enqueue %d uploads", len(jobs))
+            raise
+
+    def claim_uploads(self, now: float, limit: int, lease: int) -> List[Dict]:
+        """
+        Claim up to `limit` due jobs by pushing their due time `lease`
+        seconds ahead (atomically, so concurrent drainers never share a
+        job). A drainer that dies mid-job gives it back when the lease
+        runs out.
+        """
+        key = self._outbox_key()
+
+        try:
+            with self.r.pipeline() as pipe:
+                while True:
+                    try:
+                        pipe.watch(key)
+                        ids = pipe.zrangebyscore(key, "-inf", now, start=0, num=limit)
+                        if not ids:
+                            pipe.unwatch()
+                            return []
+
+                        pipe.multi()
+                        pipe.zadd(key, {job_id: now + lease for job_id in ids})
+                        pipe.execute()
+                        break
+
+                    except redis.WatchError:
+                        continue
+
+            values = self.r.mget([self._outbox_job_key(job_id) for job_id in ids])
+            orphans = [job_id for job_id, value in zip(ids, values) if not value]
+            if orphans:
+                self.r.zrem(key, *orphans)
+
+            return [json.loads(value) for value in values if value]
+
+        except Exception:
+            logger.exception("Failed to claim uploads from the outbox")
+            raise
+
+    def reschedule_upload(self, job: Dict, due: float) -> None:
+        try:
+            pipe = self.r.pipeline(transaction=True)
+            pipe.set(self._outbox_job_key(job["id"]), json.dumps(job))
+            pipe.zadd(self._outbox_key(), {job["id"]: due})
+            pipe.execute()
+
+        except Exception:
+            logger.exception("Failed to reschedule upload %s", job.get("id"))
+            raise
+
+    def complete_upload(self, job_id: str) -> None:
+        try:
+            pipe = self.r.pipeline(transaction=True)
+            pipe.zrem(self._outbox_key(), job_id)
+            pipe.delete(self._outbox_job_key(job_id))
+            pipe.execute()
+
+        except Exception:
+            logger.exception("Failed to complete upload %s", job_id)
+            raise
+
+    def pending_uploads(self) -> int:
+        return self.r.zcard(self._outbox_key())
+
+    def patch_remote(
+        self,
+        agency: str,
+        issue_no: str,
+        field: List[str],
+        uri: str,
+        sha256: Optional[str] = None,
+    ) -> bool:
+        """
+        Set the "remote" URI of one stored file (field path such as
+        ["pdf"] or ["derivatives", "600w"]) in the download record and,
+        if given, the content index entry and the duplicates recorded
+        from it. Returns False if the download record no longer exists.
+        """
+        try:
+            patched = self._patch_remote(self._download_key(agency, issue_no), field, uri)
+            if sha256:
+                # Index entry first: a duplicate registered after the
+                # SMEMBERS below copies the URI from it (_catch_up_remotes)
+                self._patch_remote(self._content_key(sha256), field, uri)
+                for key in self.r.smembers(self._duplicates_key(sha256)):
+                    self._patch_remote(key, field, uri)
+            return patched
+
+        except Exception:
+            logger.exception(
+                "Failed to patch remote URI for %s issue %s", agency, issue_no
+            )
+            raise
+
+    def _patch_remote(self, key: str, field: List[str], uri: str) -> bool:
+        with self.r.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    value = pipe.get(key)
+                    if not value:
+                        pipe.unwatch()
+                        return False
+
+                    payload = json.loads(value)
+                    node = payload
+                    for part in field:
+                        node = node.setdefault(part, {})
+                    node["remote"] = uri
+
+                    pipe.multi()
+                    pipe.set(key, json.dumps(payload), keepttl=True)
+                    pipe.execute()
+                    return True
+
+                except redis.WatchError:
+                    continue
+
+    # --------------------------------------------------
+    # HTTP validators (conditional requests)
+    # --------------------------------------------------
+    def get_validators(self, url: str) -> Optional[Dict]:
+        try:
+            value = self.r.get(self._validator_key(url))
+            return json.loads(value) if value else None
+
+        except Exception:
+            logger.exception("Failed to read HTTP validators for %s", url)
+            raise
+
+    def set_validators(self, url: str, validators: Dict) -> None:
+        try:
+            self.r.setex(
+                self._validator_key(url),
+                HTTP_VALIDATOR_TTL_DAYS * 86400,
+                json.dumps(validators),
+            )
+
+        except Exception:
+            logger.exception("Failed to store HTTP validators for %s", url)
+            raise
+
+    # --------------------------------------------------
+    # Pishkhan viewer -> (paper, date, pdf_url) cache
+    # --------------------------------------------------
+    def get_resolved_viewers(
+        self,
+        page_date: str,
+        viewer_urls: List[str],
+    ) -> Dict[str, Optional[tuple]]:
+        """
+        Look up every viewer in one MGET round trip.
+        """
+        if not viewer_urls:
+            return {}
+
+        try:
+            keys = [self._viewer_key(page_date, url) for url in viewer_urls]
+            values = self.r.mget(keys)
+
+            return {
+                url: tuple(json.loads(value)) if value else None
+                for url, value in zip(viewer_urls, values)
+            }
+
+        except Exception:
+            logger.exception("Failed to read viewer cache for %s", page_date)
+            raise
+
+    def cache_resolved_viewers(
+        self,
+        page_date: str,
+        resolved: Dict[str, tuple],
+        ttl: int,
+    ) -> None:
+        """
+        Store resolved viewers with one pipelined round trip.
+        """
+        if not resolved:
+            return
+
+        try:
+            pipe = self.r.pipeline(transaction=False)
+            for url, result in resolved.items():
+                pipe.setex(
+                    self._viewer_key(page_date, url),
+                    max(1, ttl),
+                    json.dumps(list(result)),
+                )
+            pipe.execute()
+
+        except Exception:
+            logger.exception("Failed to write viewer cache for %s", page_date)
+            raise
@@ -0,0 +1,94 @@
+import math
+from datetime import datetime, timedelta, tzinfo
+from typing import Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app import config
+
+# --------------------------------------------------
+# Release windows (SCHEDULER_MODE = "adaptive")
+# --------------------------------------------------
+# A window is (start, end) in minutes of the day, end exclusive; it wraps
+# past midnight when end < start. (0, 1440) is the whole day.
+
+DAY_MINUTES = 24 * 60
+Window = Tuple[int, int]
+
+
+def schedule_timezone() -> tzinfo:
+    return ZoneInfo(config.SCHEDULER_TIMEZONE)
+
+
+def minute_of_day(moment: datetime, tz: tzinfo) -> float:
+    local = moment.astimezone(tz)
+    return local.hour * 60 + local.minute + local.second / 60
+
+
+def learn_window(timestamps: Iterable[float], tz: tzinfo) -> Optional[Window]:
+    """
+    Shortest time-of-day span holding RELEASE_WINDOW_COVERAGE of the past
+    release times, widened by RELEASE_WINDOW_MARGIN_MINUTES on both sides.
+    None until RELEASE_MIN_SAMPLES releases are known, and while they are
+    too spread out to fit in RELEASE_WINDOW_MAX_MINUTES (fast polling most
+    of the day would cost more than it saves).
+    """
+    minutes = sorted(
+        int(minute_of_day(datetime.fromtimestamp(ts, tz), tz))
+        for ts in timestamps
+    )
+    n = len(minutes)
+    if n < max(config.RELEASE_MIN_SAMPLES, 1):
+        return None
+
+    # Try every sample as the start of a span covering k samples, going
+    # round midnight, and keep the shortest
+    k = max(1, math.ceil(config.RELEASE_WINDOW_COVERAGE * n))
+    start, length = min(
+        (
+            (minutes[i], (minutes[(i + k - 1) % n] - minutes[i]) % DAY_MINUTES)
+            for i in range(n)
+        ),
+        key=lambda span: span[1],
+    )
+
+    margin = config.RELEASE_WINDOW_MARGIN_MINUTES
+    length += 2 * margin + 1
+    if length > config.RELEASE_WINDOW_MAX_MINUTES:
+        return None
+    if length >= DAY_MINUTES:
+        return (0, DAY_MINUTES)
+
+    start = (start - margin) % DAY_MINUTES
+    return (start, (start + length) % DAY_MINUTES)
+
+
+def in_window(window: Window, minute: float) -> bool:
+    start, end = window
+    if start <= end:
+        return start <= minute < end
+    return minute >= start or minute < end
+
+
+def next_poll(now: datetime, window: Optional[Window], tz: tzinfo) -> datetime:
+    """
+    POLL_FAST_SECONDS from `now` inside the window; outside it (or with no
+    window yet) POLL_SLOW_SECONDS, cut short to the window's start.
+    """
+    if window is None:
+        return now + timedelta(seconds=config.POLL_SLOW_SECONDS)
+
+    minute = minute_of_day(now, tz)
+    if in_window(window, minute):
+        return now + timedelta(seconds=config.POLL_FAST_SECONDS)
+
+    until_start = (window[0] - minute) % DAY_MINUTES * 60
+    return now + timedelta(seconds=min(config.POLL_SLOW_SECONDS, until_start))
+
+
+def format_window(window: Optional[Window]) -> str:
+    if window is None:
+        return "none (polling slowly)"
+    if window == (0, DAY_MINUTES):
+        return "all day"
+    start, end = window
+    return f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
@@ -0,0 +1,171 @@
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app import config
+from app.utils.concurrency import bounded_map
+from app.utils.logger import logger
+
+# (local file, remote key, payload field) e.g. (png, "etemad/.../x.png", "png")
+# or (webp, "...", "derivatives.600w")
+IssueFile = Tuple[Path, str, str]
+
+
+def upload_files(storage, files: List[IssueFile]) -> Dict[str, Optional[str]]:
+    """
+    Upload an issue's files now (UPLOAD_MODE "inline").
+    Returns payload field -> remote URI (None if that upload failed).
+    """
+    uris = storage.save_many([(path, key) for path, key, _ in files])
+    return {field: uri for (_, _, field), uri in zip(files, uris)}
+
+
+class UploadOutbox:
+    """
+    Durable queue of pending MinIO uploads, kept in Redis.
+
+    The scrape path stores files locally, records the download with
+    "remote": None and enqueues one job per file. The drainer (a
+    background thread, or drain_once from any process) claims due jobs,
+    uploads them, patches the URI into the stored payload and retries
+    failures with exponential backoff. Jobs survive restarts.
+    """
+
+    def __init__(self, redis, storage):
+        self.redis = redis
+        self.storage = storage
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stop_deadline = 0.0
+
+    # --------------------------------------------------
+    # Producer side
+    # --------------------------------------------------
+    def enqueue(
+        self,
+        agency: str,
+        issue_no: str,
+        files: List[IssueFile],
+        sha256: Optional[str] = None,
+    ) -> None:
+        jobs = [
+            {
+                "id": uuid.uuid4().hex,
+                "agency": agency,
+                "issue_no": issue_no,
+                "local": str(path),
+                "remote_key": key,
+                "field": field,
+                "sha256": sha256,
+                "attempts": 0,
+            }
+            for path, key, field in files
+        ]
+        self.redis.enqueue_uploads(jobs, due=time.time())
+        logger.info("Queued %d uploads for %s / %s", len(jobs), agency, issue_no)
+
+    # --------------------------------------------------
+    # Drainer
+    # --------------------------------------------------
+    def drain_once(self, limit: int = config.OUTBOX_BATCH_SIZE) -> int:
+        """
+        Claim and process one batch of due jobs. Returns the batch size.
+        """
+        jobs = self.redis.claim_uploads(
+            now=time.time(),
+            limit=limit,
+            lease=config.OUTBOX_LEASE_SECONDS,
+        )
+        bounded_map(self._process, jobs, workers=config.S3_UPLOAD_WORKERS)
+        return len(jobs)
+
+    def _process(self, job: Dict) -> None:
+        local = Path(job["local"])
+
+        if not local.exists():
+            logger.error("Queued upload lost its local file, dropped: %s", local)
+            self.redis.complete_upload(job["id"])
+            return
+
+        uri = self.storage.remote.save(local, job["remote_key"])
+
+        if uri is None:
+            job["attempts"] += 1
+            delay = min(
+                config.OUTBOX_BACKOFF_MAX_SECONDS,
+                config.OUTBOX_BACKOFF_SECONDS * 2 ** (job["attempts"] - 1),
+            )
+            self.redis.reschedule_upload(job, due=time.time() + delay)
+            logger.warning(
+                "Upload failed (attempt %d), retrying in %ds: %s",
+                job["attempts"],
+                delay,
+                job["remote_key"],
+            )
+            return
+
+        patched = self.redis.patch_remote(
+            agency=job["agency"],
+            issue_no=job["issue_no"],
+            field=job["field"].split("."),
+            uri=uri,
+            sha256=job.get("sha256"),
+        )
+        if not patched:
+            logger.warning(
+                "Uploaded, but the download record has expired: %s / %s",
+                job["agency"],
+                job["issue_no"],
+            )
+
+        self.redis.complete_upload(job["id"])
+
+    # --------------------------------------------------
+    # Background thread
+    # --------------------------------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="upload-outbox",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("Upload outbox drainer started")
+
+    def stop(self, drain_timeout: float = 0.0) -> None:
+        """
+        Stop the drainer, first draining due jobs for up to
+        `drain_timeout` seconds. Whatever is left stays queued.
+        """
+        if self._thread is None:
+            return
+
+        self._stop_deadline = time.monotonic() + drain_timeout
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+        logger.info("Upload outbox drainer stopped")
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                processed = self.drain_once()
+            except Exception:
+                logger.exception("Upload outbox drain failed")
+                processed = 0
+
+            if self._stop.is_set():
+                if processed == 0 or time.monotonic() >= self._stop_deadline:
+                    return
+                continue
+
+            if processed == 0:
+                self._stop.wait(config.OUTBOX_POLL_SECONDS)
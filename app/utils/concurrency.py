@@ -0,0 +1,97 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Hashable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class KeyedLimiter:
+    """
+    Per-key concurrency cap (e.g. max in-flight requests per host).
+    Semaphores are created lazily, one per key.
+    """
+
+    def __init__(self, limit: int):
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._semaphores: dict[Hashable, threading.BoundedSemaphore] = {}
+        self._holders: dict[Hashable, int] = {}
+
+    def get(self, key: Hashable) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(key)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.limit)
+                self._semaphores[key] = sem
+            return sem
+
+    @contextmanager
+    def hold(self, key: Hashable) -> Iterator[None]:
+        """
+        Take one of `key`'s slots. The key's semaphore is dropped once
+        nobody holds or waits for it, so an unbounded key space (e.g.
+        URLs) does not grow the limiter; don't mix with get() on a key.
+        """
+        with self._lock:
+            sem = self._semaphores.get(key)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.limit)
+                self._semaphores[key] = sem
+            self._holders[key] = self._holders.get(key, 0) + 1
+
+        try:
+            with sem:
+                yield
+        finally:
+            with self._lock:
+                self._holders[key] -= 1
+                if not self._holders[key]:
+                    del self._holders[key]
+                    del self._semaphores[key]
+
+
+def bounded_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    workers: int,
+    key: Optional[Callable[[T], Hashable]] = None,
+    per_key_limit: Optional[int] = None,
+) -> list[R]:
+    """
+    Run func over items on a thread pool.
+
+    - at most `workers` calls run at once
+    - if `key` and `per_key_limit` are given, at most `per_key_limit`
+      calls share the same key at once
+    - results are returned in input order
+    - the first exception raised by func is re-raised
+    - calls see the caller's context variables (e.g. metrics agency)
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    limiter = KeyedLimiter(per_key_limit) if key and per_key_limit else None
+
+    def call(item: T) -> R:
+        if limiter is None:
+            return func(item)
+
+        with limiter.get(key(item)):
+            return func(item)
+
+    workers = max(1, min(workers, len(items)))
+
+    if workers == 1:
+        return [call(item) for item in items]
+
+    context = contextvars.copy_context()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda item: context.copy().run(call, item), items))
@@ -1,5 +1,6 @@
 import zipfile
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+from typing import Iterator
 
 from app.utils.logger import logger
 
@@ -41,3 +42,35 @@ def extract_files_from_zip(zip_path: Path, output_dir: Path) -> list[Path]:
             zip_path,
         )
         raise
+
+
+def iter_zip_pdfs(zip_path: Path) -> Iterator[tuple[str, bytes]]:
+    """
+    Yield (member name, bytes) for every PDF inside a ZIP, ordered by
+    file name like extract_files_from_zip. Members are read one at a
+    time, nothing is written to disk; non-PDF members are skipped.
+    """
+    try:
+        with zipfile.ZipFile(zip_path, "r") as z:
+            members = sorted(
+                (
+                    info for info in z.infolist()
+                    if not info.is_dir()
+                    and PurePosixPath(info.filename).suffix.lower() == ".pdf"
+                ),
+                key=lambda info: PurePosixPath(info.filename).name,
+            )
+
+            logger.info(
+                "ZIP %s: %d PDF members of %d",
+                zip_path,
+                len(members),
+                len(z.infolist()),
+            )
+
+            for info in members:
+                yield info.filename, z.read(info)
+
+    except zipfile.BadZipFile:
+        logger.exception("Invalid or corrupted ZIP file: %s", zip_path)
+        raise
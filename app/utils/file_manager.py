@@ -5,20 +5,26 @@ from app.config import TEMP_DIR
 from app.utils.logger import logger
 
 
-def cleanup_temp(keep_dirs: list[Path] | None = None):
+def cleanup_temp(
+    keep_dirs: list[Path] | None = None,
+    root: Path | None = None,
+):
     """
     Remove temporary working directories but keep final outputs.
+    `root` narrows the cleanup to one subtree (e.g. a single agency),
+    so parallel runs do not delete each other's work.
     """
     try:
         keep_dirs = keep_dirs or []
+        root = root or TEMP_DIR
 
-        if not TEMP_DIR.exists():
-            logger.info("TEMP_DIR does not exist, nothing to clean")
+        if not root.exists():
+            logger.info("TEMP_DIR does not exist, nothing to clean: %s", root)
             return
 
-        logger.info("Starting cleanup of TEMP_DIR: %s", TEMP_DIR)
+        logger.info("Starting cleanup of TEMP_DIR: %s", root)
 
-        for item in TEMP_DIR.iterdir():
+        for item in root.iterdir():
             # Keep final output directories
             if any(item.resolve() == k.resolve() for k in keep_dirs):
                 logger.info("Skipping kept directory: %s", item)
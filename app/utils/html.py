@@ -0,0 +1,90 @@
+from typing import Callable, Optional, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# lxml is several times faster than the pure-Python "html.parser"
+PARSER = "lxml"
+
+# (tag name, raw attrs) -> keep this element and its subtree?
+TagFilter = Callable[[str, dict], bool]
+
+
+def parse_html(
+    markup: Union[str, bytes],
+    parse_only: Optional[Union[SoupStrainer, TagFilter]] = None,
+    encoding: Optional[str] = None,
+) -> BeautifulSoup:
+    """
+    Parse a page with the lxml backend.
+
+    With `parse_only` only matching elements (and their subtrees) are
+    built into the tree; the rest of the page is skipped while parsing,
+    which is where most of the time goes on large listing pages.
+    `encoding` is a hint for byte input (e.g. the HTTP charset).
+    """
+    if parse_only is not None and not isinstance(parse_only, SoupStrainer):
+        parse_only = SoupStrainer(parse_only)
+
+    if isinstance(markup, str):
+        encoding = None
+
+    return BeautifulSoup(
+        markup,
+        PARSER,
+        parse_only=parse_only,
+        from_encoding=encoding,
+    )
+
+
+def response_charset(response) -> Optional[str]:
+    """
+    Charset declared in the Content-Type header, if any (requests falls
+    back to ISO-8859-1 otherwise, which would garble Persian pages).
+    """
+    if "charset=" in response.headers.get("Content-Type", "").lower():
+        return response.encoding
+    return None
+
+
+def classes_of(attrs: dict) -> set[str]:
+    value = attrs.get("class") or ()
+    if isinstance(value, str):
+        value = value.split()
+    return set(value)
+
+
+def keep_elements(
+    ids: tuple[str, ...] = (),
+    classes: tuple[tuple[str, ...], ...] = (),
+    tags: tuple[str, ...] = (),
+    attrs: tuple[tuple[str, str, str], ...] = (),
+) -> SoupStrainer:
+    """
+    Build a parse_only strainer that keeps elements having one of `ids`,
+    all classes of one of the `classes` groups, one of the `tags`, or
+    one of the (tag, attribute, value) triples in `attrs`.
+
+        keep_elements(ids=("divcp2",), classes=(("mash-list-items", "right"),))
+        keep_elements(attrs=(("a", "title", "PDF"),))
+    """
+    id_set = set(ids)
+    class_groups = [set(group) for group in classes]
+    tag_set = set(tags)
+    attr_set = set(attrs)
+
+    def keep(name, tag_attrs) -> bool:
+        if name in tag_set:
+            return True
+        if id_set and tag_attrs.get("id") in id_set:
+            return True
+        if attr_set and any(
+            name == tag and tag_attrs.get(attr) == value
+            for tag, attr, value in attr_set
+        ):
+            return True
+        if class_groups:
+            have = classes_of(tag_attrs)
+            return any(group <= have for group in class_groups)
+        return False
+
+    return SoupStrainer(keep)
@@ -7,11 +7,24 @@ APP_NAME = "newspaper_service"
 
 # Absolute log directory inside container
 LOG_DIR = Path("/app/logs")
-LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 LOG_FILE = LOG_DIR / "cron.log"
 
 
+class _LazyFileHandler(logging.FileHandler):
+    """
+    FileHandler that creates the log directory and opens the file on the
+    first record, so importing the app touches no files.
+    """
+
+    def __init__(self, filename: Path):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
 def setup_logger() -> logging.Logger:
     """
     Configure and return application logger.
@@ -35,7 +48,7 @@ def setup_logger() -> logging.Logger:
     console_handler.setFormatter(formatter)
 
     # ---- File handler ----
-    file_handler = logging.FileHandler(LOG_FILE)
+    file_handler = _LazyFileHandler(LOG_FILE)
     file_handler.setFormatter(formatter)
 
     logger.addHandler(console_handler)
@@ -0,0 +1,241 @@
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from app import config
+from app.utils.logger import logger
+
+# Histogram buckets (seconds) for the Prometheus textfile
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Agency the current code runs for; set by the runner, inherited by the
+# pipeline / bounded_map worker threads
+_agency: contextvars.ContextVar[str] = contextvars.ContextVar("agency", default="-")
+
+Key = Tuple[str, str]  # (agency, stage or counter name)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile (q in 0..100) of unsorted samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Metrics:
+    """
+    In-process stage timings and counters for one run.
+
+    - observe(stage, seconds) / timer(stage): latency samples
+    - inc(name, value): counters (bytes, cache hits, skipped uploads ...)
+    - every sample is labelled with the current agency (see agency())
+
+    write_reports() renders a Prometheus textfile (histograms + counters,
+    for node_exporter's textfile collector) and a per-run JSON report
+    with p50/p95 per agency and stage.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, agency: Optional[str] = None) -> None:
+        """
+        Forget everything, or only `agency`'s samples and counters (the
+        daemon keeps the latest run of every agency). Either way the report
+        window restarts now; agency_started keeps when each agency's
+        current samples began.
+        """
+        with self._lock:
+            self.started = time.time()
+            if agency is not None:
+                self.samples = {k: v for k, v in self.samples.items() if k[0] != agency}
+                self.counters = {k: v for k, v in self.counters.items() if k[0] != agency}
+                self.agency_started[agency] = self.started
+                return
+
+            self.samples: Dict[Key, list[float]] = {}
+            self.counters: Dict[Key, float] = {}
+            self.agency_started: Dict[str, float] = {}
+
+    # --------------------------------------------------
+    # Recording
+    # --------------------------------------------------
+    @contextmanager
+    def agency(self, agency: str) -> Iterator[None]:
+        token = _agency.set(agency)
+        try:
+            yield
+        finally:
+            _agency.reset(token)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        key = (_agency.get(), stage)
+        with self._lock:
+            self.samples.setdefault(key, []).append(seconds)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        key = (_agency.get(), name)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str) -> Callable:
+        """
+        Decorator form of timer().
+        """
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def timed_methods(self, prefix: str, exclude: tuple = ()) -> Callable:
+        """
+        Class decorator: time every public method as "<prefix>.<name>".
+        """
+        def decorator(cls: type) -> type:
+            for name, attr in list(vars(cls).items()):
+                if name.startswith("_") or name in exclude or not callable(attr):
+                    continue
+                setattr(cls, name, self.timed(f"{prefix}.{name}")(attr))
+            return cls
+        return decorator
+
+    # --------------------------------------------------
+    # Child processes (EXECUTION_MODE "process")
+    # --------------------------------------------------
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "samples": [[a, s, v] for (a, s), v in self.samples.items()],
+                "counters": [[a, n, v] for (a, n), v in self.counters.items()],
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        with self._lock:
+            for agency, stage, values in snapshot.get("samples", []):
+                self.samples.setdefault((agency, stage), []).extend(values)
+            for agency, name, value in snapshot.get("counters", []):
+                key = (agency, name)
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    # --------------------------------------------------
+    # Reports
+    # --------------------------------------------------
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {k: list(v) for k, v in self.samples.items()}
+            counters = dict(self.counters)
+            agency_started = dict(self.agency_started)
+
+        stages: Dict[str, Dict[str, dict]] = {}
+        for (agency, stage), values in sorted(samples.items()):
+            stages.setdefault(agency, {})[stage] = {
+                "count": len(values),
+                "sum_s": round(sum(values), 4),
+                "p50_s": round(percentile(values, 50), 4),
+                "p95_s": round(percentile(values, 95), 4),
+                "max_s": round(max(values), 4),
+            }
+
+        totals: Dict[str, Dict[str, float]] = {}
+        for (agency, name), value in sorted(counters.items()):
+            totals.setdefault(agency, {})[name] = value
+
+        return {
+            "started": self.started,
+            "finished": time.time(),
+            "agency_started": agency_started,
+            "stages": stages,
+            "counters": totals,
+        }
+
+    def prometheus(self) -> str:
+        with self._lock:
+            samples = {k: list(v) for k, v in self.samples.items()}
+            counters = dict(self.counters)
+
+        lines = [
+            "# HELP scraper_stage_seconds Time spent per scrape stage.",
+            "# TYPE scraper_stage_seconds histogram",
+        ]
+        for (agency, stage), values in sorted(samples.items()):
+            labels = f'agency="{agency}",stage="{stage}"'
+            for bound in BUCKETS:
+                count = sum(1 for v in values if v <= bound)
+                lines.append(f'scraper_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'scraper_stage_seconds_bucket{{{labels},le="+Inf"}} {len(values)}')
+            lines.append(f"scraper_stage_seconds_sum{{{labels}}} {sum(values):.6f}")
+            lines.append(f"scraper_stage_seconds_count{{{labels}}} {len(values)}")
+
+        lines += [
+            "# HELP scraper_events_total Counters of the last run.",
+            "# TYPE scraper_events_total counter",
+        ]
+        for (agency, name), value in sorted(counters.items()):
+            lines.append(f'scraper_events_total{{agency="{agency}",name="{name}"}} {value:g}')
+
+        lines += [
+            "# HELP scraper_last_run_timestamp_seconds End of the last run.",
+            "# TYPE scraper_last_run_timestamp_seconds gauge",
+            f"scraper_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self, metrics_dir: Optional[Path] = None) -> Optional[Path]:
+        """
+        Write the Prometheus textfile (replaced atomically) and this run's
+        JSON report. Returns the report path.
+        """
+        if not config.METRICS_ENABLED:
+            return None
+
+        metrics_dir = metrics_dir or config.METRICS_DIR
+        try:
+            reports_dir = metrics_dir / "runs"
+            reports_dir.mkdir(parents=True, exist_ok=True)
+
+            textfile = metrics_dir / config.METRICS_TEXTFILE
+            tmp = textfile.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(self.prometheus())
+            tmp.replace(textfile)
+
+            summary = self.summary()
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(summary["finished"]))
+            report = reports_dir / f"run-{stamp}-{os.getpid()}.json"
+            report.write_text(json.dumps(summary, indent=2))
+
+            for old in sorted(reports_dir.glob("run-*.json"))[:-config.METRICS_KEEP_REPORTS]:
+                old.unlink(missing_ok=True)
+
+            logger.info("Run metrics written: %s", report)
+            return report
+
+        except Exception:
+            logger.exception("Failed to write run metrics")
+            return None
+
+
+# Process-wide instance
+metrics = Metrics()
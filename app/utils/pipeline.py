@@ -0,0 +1,137 @@
+import contextvars
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from app.utils.logger import logger
+from app.utils.metrics import metrics
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step.
+
+    func receives an item from the previous stage and returns the item
+    for the next stage, or None to drop it. Exceptions are logged and
+    the item is dropped; they never stop the pipeline. Each call is
+    timed as the "pipeline.<name>" metric.
+    """
+
+    name: str
+    func: Callable[[Any], Optional[Any]]
+    workers: int = 1
+    queue_size: int = 1  # bounded input queue -> backpressure upstream
+
+
+class Pipeline:
+    """
+    Thread-based staged pipeline with bounded queues between stages.
+
+    Every stage runs its own worker threads and reads from its own
+    bounded input queue, so a slow stage blocks the stages before it
+    instead of buffering unbounded work in memory. Different items are
+    processed by different stages at the same time.
+
+    Usage:
+        results = Pipeline([
+            Stage("fetch", fetch, workers=4, queue_size=8),
+            Stage("render", render, workers=1, queue_size=2),
+        ]).run(items)
+    """
+
+    def __init__(self, stages: list[Stage]):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        if any(s.workers < 1 for s in stages):
+            raise ValueError("Every stage needs at least one worker")
+        self.stages = stages
+
+    def run(self, items: Iterable[Any]) -> list[Any]:
+        """
+        Push items through every stage and return the outputs of the
+        last stage (order is not guaranteed).
+        """
+        queues = [queue.Queue(maxsize=max(1, s.queue_size)) for s in self.stages]
+        results: list[Any] = []
+        results_lock = threading.Lock()
+        threads: list[threading.Thread] = []
+
+        for index, stage in enumerate(self.stages):
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            downstream_workers = (
+                self.stages[index + 1].workers if outbox is not None else 0
+            )
+            remaining = [stage.workers]
+            remaining_lock = threading.Lock()
+
+            def worker(
+                stage=stage,
+                inbox=inbox,
+                outbox=outbox,
+                downstream_workers=downstream_workers,
+                remaining=remaining,
+                remaining_lock=remaining_lock,
+            ):
+                while True:
+                    item = inbox.get()
+                    if item is _DONE:
+                        break
+
+                    started = time.perf_counter()
+                    try:
+                        out = stage.func(item)
+                    except Exception:
+                        logger.exception("Pipeline stage '%s' failed", stage.name)
+                        metrics.inc(f"pipeline.{stage.name}.failed")
+                        continue
+                    finally:
+                        metrics.observe(
+                            f"pipeline.{stage.name}",
+                            time.perf_counter() - started,
+                        )
+
+                    if out is None:
+                        continue
+
+                    if outbox is not None:
+                        outbox.put(out)
+                    else:
+                        with results_lock:
+                            results.append(out)
+
+                # Last worker of this stage closes the next one
+                with remaining_lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+
+                if last and outbox is not None:
+                    for _ in range(downstream_workers):
+                        outbox.put(_DONE)
+
+            for n in range(stage.workers):
+                t = threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(worker,),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                )
+                t.start()
+                threads.append(t)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+
+            for t in threads:
+                t.join()
+
+        return results
@@ -0,0 +1,149 @@
+"""
+End-to-end benchmark: app.main against local stand-ins for the three
+upstream sites, Redis and MinIO, with no network access.
+
+    python -m benchmarks.bench_e2e --papers 150 --latency 0.05 --runs 2
+    python -m benchmarks.bench_e2e --redis 127.0.0.1:6379   # empty scratch Redis
+
+Each run is a fresh child process calling app.main.main(), like one cron
+invocation; the first run stores everything, later runs show the cost
+of a run with nothing new. Reports papers stored per second, wall time
+and peak RSS (largest of the run process and its render / agency
+children) per run.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import resource
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from app import config
+from benchmarks.redis_stub import RedisStub
+from benchmarks.s3_stub import S3Stub
+from benchmarks.upstream_stub import UpstreamStub
+
+
+def _run_main(urls: dict[str, str], log_level: str, queue) -> None:
+    from app import main as app_main
+    from app.scrapers import agencies, scraper_class
+    from app.services.image_builder import shutdown_cover_renderer
+    from app.utils.logger import logger
+
+    logger.setLevel(log_level)
+    logging.getLogger("app").setLevel(log_level)
+
+    for agency in agencies():
+        scraper_class(agency).BASE_URL = urls[agency]
+
+    rc = app_main.main()
+    # Reap the render workers so their peak RSS shows in RUSAGE_CHILDREN
+    shutdown_cover_renderer()
+
+    peak_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    queue.put({"exit_code": rc, "peak_rss_mb": round(peak_kb / 1024, 1)})
+
+
+def _stored_papers(client) -> int:
+    return len(client.keys("downloaded:*"))
+
+
+def run_once(urls: dict[str, str], log_level: str, client, upstream, s3) -> dict:
+    before = _stored_papers(client)
+    upstream.requests.clear()
+    s3.requests.clear()
+
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Process(target=_run_main, args=(urls, log_level, queue))
+
+    started = time.perf_counter()
+    p.start()
+    result = queue.get()
+    p.join()
+    wall = time.perf_counter() - started
+
+    papers = _stored_papers(client) - before
+    return {
+        **result,
+        "wall_seconds": round(wall, 2),
+        "papers": papers,
+        "papers_per_second": round(papers / wall, 2),
+        "upstream_requests": sum(upstream.requests.values()),
+        "s3_requests": dict(s3.requests),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--papers", type=int, default=150, help="papers on Pishkhan /all")
+    parser.add_argument("--pdf-pages", type=int, default=4)
+    parser.add_argument("--etemad-pages", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05, help="upstream seconds per request")
+    parser.add_argument("--s3-latency", type=float, default=0.005)
+    parser.add_argument("--s3-bandwidth-mb", type=float, default=50)
+    parser.add_argument("--redis", help="HOST:PORT of a real Redis (default: in-process stand-in)")
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--execution-mode", default=config.EXECUTION_MODE)
+    parser.add_argument("--upload-mode", default=config.UPLOAD_MODE)
+    parser.add_argument("--http-engine", default=config.PISHKHAN_HTTP_ENGINE)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        tmp = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        upstream = stack.enter_context(UpstreamStub(
+            papers=args.papers,
+            latency=args.latency,
+            pdf_pages=args.pdf_pages,
+            etemad_pages=args.etemad_pages,
+        ))
+        s3 = stack.enter_context(S3Stub(
+            latency=args.s3_latency,
+            bandwidth=args.s3_bandwidth_mb * 1024 * 1024,
+        ))
+
+        if args.redis:
+            host, _, port = args.redis.partition(":")
+            config.REDIS_HOST, config.REDIS_PORT = host, int(port or 6379)
+        else:
+            rs = stack.enter_context(RedisStub())
+            config.REDIS_HOST, config.REDIS_PORT = rs.host, rs.port
+
+        # Set before app.main (and with it redis_client) is first imported
+        config.S3_ENDPOINT = s3.endpoint
+        config.OUTPUT_DIR = tmp / "output"
+        config.TEMP_DIR = tmp / "output" / "tmp"
+        config.PARTIAL_DIR = tmp / "output" / "partial"
+        config.METRICS_DIR = tmp / "output" / "metrics"
+        config.EXECUTION_MODE = args.execution_mode
+        config.UPLOAD_MODE = args.upload_mode
+        config.PISHKHAN_HTTP_ENGINE = args.http_engine
+
+        import redis
+
+        client = redis.Redis(host=config.REDIS_HOST, port=config.REDIS_PORT)
+
+        runs = [
+            run_once(upstream.urls, args.log_level, client, upstream, s3)
+            for _ in range(args.runs)
+        ]
+
+    print(json.dumps({
+        "papers_listed": args.papers,
+        "latency": args.latency,
+        "execution_mode": args.execution_mode,
+        "upload_mode": args.upload_mode,
+        "http_engine": args.http_engine,
+        "redis": args.redis or "stub",
+        "runs": runs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Import-time budget for the CLI entry point.
+
+    python -m benchmarks.bench_import --budget-ms 150
+
+Imports app.main in fresh interpreters and exits with status 1 if the
+median import time is over budget or if the import loads any of the
+heavy libraries, which must only load when a scrape needs them.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY = (
+    "fitz",
+    "pymupdf",
+    "PyPDF2",
+    "PIL",
+    "minio",
+    "redis",
+    "bs4",
+    "lxml",
+    "aiohttp",
+    "requests",
+    "apscheduler",
+)
+
+SNIPPET = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def measure() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", SNIPPET],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeat)]
+    median_ms = statistics.median(r["seconds"] for r in runs) * 1000
+
+    loaded = sorted({
+        name.split(".")[0]
+        for r in runs
+        for name in r["modules"]
+        if name.split(".")[0] in HEAVY
+    })
+
+    print(json.dumps({
+        "median_ms": round(median_ms, 1),
+        "budget_ms": args.budget_ms,
+        "heavy_modules_loaded": loaded,
+    }, indent=2))
+
+    if median_ms > args.budget_ms or loaded:
+        print("FAIL: import of app.main is over budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Compare PDF merge engines on a synthetic 24-32 page issue.
+
+    python -m benchmarks.bench_merge --pages 32 --repeat 3
+
+Each engine runs in a fresh child process so peak RSS is not shared
+between engines.
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.fixtures import write_issue_pages
+
+
+def _measure(engine: str, files: list[Path], output: Path, queue) -> None:
+    from app.services.pdf_builder import merge_pdfs
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    merge_pdfs(files, output, engine=engine)
+    elapsed = time.perf_counter() - started
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    queue.put({
+        "seconds": elapsed,
+        "peak_rss_delta_mb": (rss_after - rss_before) / 1024,
+        "output_mb": output.stat().st_size / 1024 / 1024,
+    })
+
+
+def run(engine: str, files: list[Path], workdir: Path) -> dict:
+    queue = multiprocessing.Queue()
+    p = multiprocessing.Process(
+        target=_measure,
+        args=(engine, files, workdir / f"merged-{engine}.pdf", queue),
+    )
+    p.start()
+    result = queue.get()
+    p.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engines", default="pypdf2,pymupdf")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        files = write_issue_pages(workdir / "pages", args.pages)
+
+        report = {}
+        for engine in args.engines.split(","):
+            runs = [run(engine, files, workdir) for _ in range(args.repeat)]
+            report[engine] = {
+                "median_seconds": round(statistics.median(r["seconds"] for r in runs), 4),
+                "peak_rss_delta_mb": round(max(r["peak_rss_delta_mb"] for r in runs), 1),
+                "output_mb": round(runs[-1]["output_mb"], 2),
+            }
+
+    print(json.dumps({"pages": args.pages, "engines": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
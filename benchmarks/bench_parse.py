@@ -0,0 +1,104 @@
+"""
+Micro-benchmark of the HTML parsing layer on fixture pages.
+
+    python -m benchmarks.bench_parse --repeat 20
+    python -m benchmarks.bench_parse --pages-dir saved/   # real saved pages
+
+--pages-dir expects pishkhan_all.html, etemad_home.html, iran_home.html.
+Compares html.parser (old), lxml on the whole page, and lxml restricted
+to the nodes each scraper queries; the extracted values must match.
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from app.scrapers.etemad import EtemadScraper
+from app.scrapers.iran import IranScraper
+from app.scrapers.pishkhan import PishkhanScraper
+from app.utils.html import parse_html
+from benchmarks import fixtures
+
+
+def _pishkhan_extract(soup) -> tuple:
+    scraper = PishkhanScraper.__new__(PishkhanScraper)
+    return len(scraper._collect_viewers(soup)), scraper._extract_shamsi_date(soup)
+
+
+def _etemad_extract(soup) -> tuple:
+    span = soup.select_one("span#ContentPlaceHolder1_activedate_lblNPNNO")
+    container = soup.find("div", id="divcp2")
+    return span.get_text(strip=True), container.get("data-npnid")
+
+
+def _iran_extract(soup) -> tuple:
+    span = soup.select_one("span.title[data-title]")
+    link = soup.find("span", string=lambda s: s and "تمام صفحات" in s)
+    return span["data-title"], link.find_parent("a")["href"]
+
+
+PAGES = {
+    "pishkhan_all": (PishkhanScraper.ALL_PAGE_NODES, _pishkhan_extract),
+    "etemad_home": (EtemadScraper.HOMEPAGE_NODES, _etemad_extract),
+    "iran_home": (IranScraper.HOMEPAGE_NODES, _iran_extract),
+}
+
+
+def load_pages(pages_dir: Path | None, papers: int) -> dict[str, bytes]:
+    if pages_dir:
+        return {name: (pages_dir / f"{name}.html").read_bytes() for name in PAGES}
+
+    return {
+        "pishkhan_all": fixtures.pishkhan_all_page(papers=papers).encode(),
+        "etemad_home": fixtures.etemad_homepage().encode(),
+        "iran_home": fixtures.iran_homepage().encode(),
+    }
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--papers", type=int, default=150)
+    parser.add_argument("--pages-dir", type=Path)
+    args = parser.parse_args()
+
+    report = {}
+    for name, markup in load_pages(args.pages_dir, args.papers).items():
+        strainer, extract = PAGES[name]
+
+        variants = {
+            "html.parser": lambda: BeautifulSoup(markup, "html.parser"),
+            "lxml": lambda: parse_html(markup),
+            "lxml+parse_only": lambda: parse_html(markup, strainer),
+        }
+
+        row = {"kb": round(len(markup) / 1024)}
+        extracted = set()
+        for label, build in variants.items():
+            ms, soup = timed(build, args.repeat)
+            row[f"{label}_ms"] = round(ms, 2)
+            extracted.add(extract(soup))
+
+        if len(extracted) != 1:
+            raise SystemExit(f"{name}: parsers disagree: {extracted}")
+
+        report[name] = row
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compare issue uploads against the local S3 stand-in: the old serial
+fput_object per file versus MinIOStorage.save_many (files in parallel,
+large PDFs multipart with parallel parts).
+
+    python -m benchmarks.bench_upload --pdf-mb 40 --latency 0.02 --bandwidth-mb 25
+
+One "issue" is a PDF of --pdf-mb plus a cover PNG and two derivatives.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app import config
+from benchmarks.s3_stub import S3Stub
+
+
+def write_issue(workdir: Path, pdf_mb: float) -> list[Path]:
+    files = {
+        "issue.pdf": int(pdf_mb * 1024 * 1024),
+        "issue.png": 2 * 1024 * 1024,
+        "issue-600w.webp": 120 * 1024,
+        "issue-200w.webp": 20 * 1024,
+    }
+    paths = []
+    for name, size in files.items():
+        path = workdir / name
+        path.write_bytes(os.urandom(size))
+        paths.append(path)
+    return paths
+
+
+def upload_serial(storage, files: list[Path], prefix: str) -> None:
+    for path in files:
+        storage.client.fput_object(
+            bucket_name=storage.bucket,
+            object_name=f"{prefix}/{path.name}",
+            file_path=str(path),
+        )
+
+
+def upload_parallel(storage, files: list[Path], prefix: str) -> None:
+    uris = storage.save_many([(path, f"{prefix}/{path.name}") for path in files])
+    assert all(uris), uris
+
+
+MODES = {
+    "fput-serial": upload_serial,
+    "put-parallel": upload_parallel,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf-mb", type=float, default=40)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--bandwidth-mb", type=float, default=25)
+    parser.add_argument("--part-mb", type=int, default=config.S3_PART_SIZE // 1024 // 1024)
+    parser.add_argument("--parallel-parts", type=int, default=config.S3_PARALLEL_PARTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config.S3_PART_SIZE = args.part_mb * 1024 * 1024
+    config.S3_PARALLEL_PARTS = args.parallel_parts
+
+    with tempfile.TemporaryDirectory() as tmp, S3Stub(
+        latency=args.latency,
+        bandwidth=args.bandwidth_mb * 1024 * 1024,
+    ) as s3:
+        config.S3_ENDPOINT = s3.endpoint
+
+        from app.services.object_storage import MinIOStorage
+
+        storage = MinIOStorage()
+        storage._ensure_bucket()
+        files = write_issue(Path(tmp), args.pdf_mb)
+
+        report = {}
+        for mode, upload in MODES.items():
+            timings = []
+            for i in range(args.repeat):
+                s3.requests.clear()
+                started = time.perf_counter()
+                upload(storage, files, f"{mode}/{i}")
+                timings.append(time.perf_counter() - started)
+
+            pdf = s3.objects[f"{config.S3_BUCKET}/{mode}/0/issue.pdf"]
+            assert pdf == files[0].read_bytes()
+
+            report[mode] = {
+                "median_seconds": round(statistics.median(timings), 3),
+                "requests": dict(s3.requests),
+            }
+
+    print(json.dumps({
+        "pdf_mb": args.pdf_mb,
+        "part_mb": args.part_mb,
+        "parallel_parts": args.parallel_parts,
+        "upload_workers": config.S3_UPLOAD_WORKERS,
+        "modes": report,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
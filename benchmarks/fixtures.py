@@ -0,0 +1,143 @@
+"""
+Synthetic fixtures for the offline benchmarks.
+"""
+import io
+import random
+from pathlib import Path
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+
+def page_image(seed: int, width: int = 1240, height: int = 1754) -> bytes:
+    """
+    A JPEG that compresses like a scanned newspaper page (noisy blocks).
+    """
+    rnd = random.Random(seed)
+    small = Image.new("L", (width // 8, height // 8))
+    small.putdata([rnd.randrange(256) for _ in range(small.width * small.height)])
+    img = small.resize((width, height)).convert("RGB")
+
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=75)
+    return buf.getvalue()
+
+
+def pdf_bytes(pages: int = 1, seed: int = 0) -> bytes:
+    """
+    An A4 PDF with one page image and some text per page.
+    """
+    doc = fitz.open()
+    try:
+        for n in range(pages):
+            page = doc.new_page(width=595, height=842)
+            page.insert_image(page.rect, stream=page_image(seed * 1000 + n))
+            page.insert_text((40, 60), f"Synthetic page {n + 1} / seed {seed}")
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def write_issue_pages(out_dir: Path, pages: int) -> list[Path]:
+    """
+    One single-page PDF per newspaper page, like Etemad's zip members.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+    for n in range(pages):
+        path = out_dir / f"page_{n + 1:02d}.pdf"
+        path.write_bytes(pdf_bytes(pages=1, seed=n))
+        files.append(path)
+    return files
+
+
+# --------------------------------------------------
+# HTML pages (shape of the real upstream pages)
+# --------------------------------------------------
+PISHKHAN_PDF_TITLE = "دانلود پی‌دی‌اف"
+PISHKHAN_TODAY = "۲۵ مهر"
+
+
+def _filler(items: int, seed: int = 0) -> str:
+    """
+    Navigation, teasers and scripts that the scrapers never look at but
+    the parser still has to get through.
+    """
+    rnd = random.Random(seed)
+    blocks = ['<script>var cfg = {"a": 1, "b": [1, 2, 3]};</script>']
+    for n in range(items):
+        blocks.append(
+            f'<div class="news-item" data-id="{n}">'
+            f'<a href="/news/{n}"><img src="/img/{n}.jpg" alt="خبر {n}"></a>'
+            f'<h4><a href="/news/{n}">عنوان خبر شماره {n}</a></h4>'
+            f'<p>{"متن نمونه " * rnd.randint(10, 30)}</p>'
+            f'<ul class="tags"><li>برچسب</li><li>اخبار</li></ul>'
+            "</div>"
+        )
+    return "\n".join(blocks)
+
+
+def pishkhan_all_page(
+    papers: int = 150,
+    today: str = PISHKHAN_TODAY,
+    past_days: int = 3,
+    viewer_href: str = "/pdfviewer.php?paper={n}",
+) -> str:
+    """
+    Pishkhan /all: a date header plus one section per day, each listing
+    every paper with its viewer link. Only today's section is scraped.
+    """
+    def section(title: str, href: str) -> str:
+        items = []
+        for n in range(papers):
+            link = href.format(n=n)
+            items.append(
+                '<div class="paper-item">'
+                f'<a href="/paper/{n}"><img src="/covers/{n}.jpg"></a>'
+                f'<a class="IconCTL" title="{PISHKHAN_PDF_TITLE}" href="{link}">i</a>'
+                f'<a title="{PISHKHAN_PDF_TITLE}" href="{link}">روزنامه {n}</a>'
+                "</div>"
+            )
+        return (
+            f'<div class="section"><h3 class="section-title">{title}</h3>'
+            + "".join(items)
+            + "</div>"
+        )
+
+    sections = [section(today, viewer_href)]
+    sections += [
+        section(f"{20 - d} مهر", "/old/pdfviewer.php?paper={n}")
+        for d in range(past_days)
+    ]
+
+    return (
+        '<html><head><meta charset="utf-8"><title>پیشخوان</title></head><body>'
+        + _filler(60, seed=1)
+        + f'<div class="mash-list-items right"><p>روزنامه‌های {today} ۱۴۰۵</p></div>'
+        + "".join(sections)
+        + _filler(60, seed=2)
+        + "</body></html>"
+    )
+
+
+def etemad_homepage(issue_no: int = 6123, npn_id: int = 987) -> str:
+    return (
+        '<html><head><meta charset="utf-8"></head><body>'
+        + _filler(120, seed=3)
+        + '<span id="ContentPlaceHolder1_activedate_lblNPNNO">'
+        f"شماره {issue_no}</span>"
+        f'<div id="divcp2" data-npnid="{npn_id}" data-type="1" data-pageno="1"></div>'
+        + _filler(120, seed=4)
+        + "</body></html>"
+    )
+
+
+def iran_homepage(issue_no: int = 8456, pdf_href: str = "/files/full.pdf") -> str:
+    return (
+        '<html><head><meta charset="utf-8"></head><body>'
+        + _filler(120, seed=5)
+        + f'<span class="title" data-title="شماره {issue_no}">روزنامه ایران</span>'
+        f'<a href="{pdf_href}"><span>دانلود تمام صفحات</span></a>'
+        + _filler(120, seed=6)
+        + "</body></html>"
+    )
@@ -0,0 +1,379 @@
+"""
+In-process Redis stand-in for benchmarks: a RESP2 server with the
+commands RedisClient uses (strings with expiry, sets, sorted sets,
+lists, pipelines, MULTI/EXEC and WATCH).
+
+    with RedisStub() as rs:
+        config.REDIS_HOST, config.REDIS_PORT = rs.host, rs.port
+
+Commands run one at a time under a lock, like the real single-threaded
+server. Unknown commands get an error reply (redis-py ignores the one
+for CLIENT SETINFO on connect).
+"""
+import fnmatch
+import math
+import socketserver
+import threading
+import time
+from typing import Optional
+
+
+class _Error(Exception):
+    pass
+
+
+# EXEC reply when a WATCHed key changed (redis-py raises WatchError)
+_ABORTED = object()
+
+
+class RedisStub:
+    def __init__(self):
+        self.data: dict[bytes, object] = {}       # bytes, set, dict member -> score, or list
+        self.expires: dict[bytes, float] = {}
+        self.versions: dict[bytes, int] = {}      # bumped on every write (WATCH)
+        self.lock = threading.Lock()
+        self.commands = 0
+
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def __enter__(self) -> "RedisStub":
+        stub = self
+
+        class Handler(_Handler):
+            redis = stub
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --------------------------------------------------
+    # Keyspace (callers hold self.lock)
+    # --------------------------------------------------
+    def _get(self, key: bytes):
+        expires = self.expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._delete(key)
+        return self.data.get(key)
+
+    def _set(self, key: bytes, value, ttl: Optional[float] = None, keepttl: bool = False) -> None:
+        self.data[key] = value
+        if ttl is not None:
+            self.expires[key] = time.time() + ttl
+        elif not keepttl:
+            self.expires.pop(key, None)
+        self._touch(key)
+
+    def _delete(self, key: bytes) -> bool:
+        existed = self.data.pop(key, None) is not None
+        self.expires.pop(key, None)
+        self._touch(key)
+        return existed
+
+    def _touch(self, key: bytes) -> None:
+        self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _zset(self, key: bytes, create: bool = False) -> Optional[dict]:
+        value = self._get(key)
+        if value is None and create:
+            value = self.data[key] = {}
+        if value is not None and not isinstance(value, dict):
+            raise _Error("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _list(self, key: bytes, create: bool = False) -> Optional[list]:
+        value = self._get(key)
+        if value is None and create:
+            value = self.data[key] = []
+        if value is not None and not isinstance(value, list):
+            raise _Error("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _members(self, key: bytes, create: bool = False) -> Optional[set]:
+        value = self._get(key)
+        if value is None and create:
+            value = self.data[key] = set()
+        if value is not None and not isinstance(value, set):
+            raise _Error("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def _string(self, key: bytes) -> Optional[bytes]:
+        value = self._get(key)
+        if isinstance(value, (dict, list, set)):
+            raise _Error("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    # --------------------------------------------------
+    # Commands
+    # --------------------------------------------------
+    def execute(self, name: str, args: list[bytes]):
+        handler = getattr(self, f"cmd_{name}", None)
+        if handler is None:
+            raise _Error(f"ERR unknown command '{name}'")
+        self.commands += 1
+        return handler(*args)
+
+    def cmd_ping(self, *args):
+        return args[0] if args else "PONG"
+
+    def cmd_get(self, key):
+        return self._string(key)
+
+    def cmd_mget(self, *keys):
+        return [self._string(key) for key in keys]
+
+    def cmd_set(self, key, value, *opts):
+        opts = [o.decode().upper() for o in opts]
+        ttl, nx, xx, keepttl = None, "NX" in opts, "XX" in opts, "KEEPTTL" in opts
+        for i, opt in enumerate(opts):
+            if opt in ("EX", "PX"):
+                ttl = float(opts[i + 1]) / (1000 if opt == "PX" else 1)
+
+        exists = self._get(key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+
+        self._set(key, value, ttl=ttl, keepttl=keepttl)
+        return "OK"
+
+    def cmd_setex(self, key, seconds, value):
+        self._set(key, value, ttl=float(seconds))
+        return "OK"
+
+    def cmd_del(self, *keys):
+        return sum(self._delete(key) for key in keys if self._get(key) is not None)
+
+    def cmd_exists(self, *keys):
+        return sum(self._get(key) is not None for key in keys)
+
+    def cmd_expire(self, key, seconds):
+        if self._get(key) is None:
+            return 0
+        self.expires[key] = time.time() + float(seconds)
+        return 1
+
+    def cmd_ttl(self, key):
+        if self._get(key) is None:
+            return -2
+        expires = self.expires.get(key)
+        return -1 if expires is None else math.ceil(expires - time.time())
+
+    def cmd_keys(self, pattern):
+        pattern = pattern.decode()
+        return [key for key in list(self.data) if self._get(key) is not None
+                and fnmatch.fnmatchcase(key.decode(), pattern)]
+
+    def cmd_flushall(self, *args):
+        for key in list(self.data):
+            self._delete(key)
+        return "OK"
+
+    def cmd_sadd(self, key, *members):
+        items = self._members(key, create=True)
+        added = len(set(members) - items)
+        items.update(members)
+        self._touch(key)
+        return added
+
+    def cmd_smembers(self, key):
+        return sorted(self._members(key) or ())
+
+    def cmd_zadd(self, key, *args):
+        zset = self._zset(key, create=True)
+        added = 0
+        for score, member in zip(args[::2], args[1::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        self._touch(key)
+        return added
+
+    def cmd_zrem(self, key, *members):
+        zset = self._zset(key) or {}
+        removed = sum(zset.pop(m, None) is not None for m in members)
+        if removed:
+            self._touch(key)
+        if zset == {} and key in self.data:
+            self._delete(key)
+        return removed
+
+    def cmd_zcard(self, key):
+        return len(self._zset(key) or {})
+
+    def cmd_zscore(self, key, member):
+        score = (self._zset(key) or {}).get(member)
+        return None if score is None else repr(score).encode()
+
+    def cmd_zrangebyscore(self, key, low, high, *opts):
+        lo, lo_open = _score_bound(low)
+        hi, hi_open = _score_bound(high)
+        opts = [o.decode().upper() for o in opts]
+
+        members = sorted(
+            (score, member)
+            for member, score in (self._zset(key) or {}).items()
+            if (lo < score if lo_open else lo <= score)
+            and (score < hi if hi_open else score <= hi)
+        )
+
+        if "LIMIT" in opts:
+            i = opts.index("LIMIT")
+            offset, count = int(opts[i + 1]), int(opts[i + 2])
+            members = members[offset:] if count < 0 else members[offset:offset + count]
+
+        if "WITHSCORES" in opts:
+            return [x for score, member in members for x in (member, repr(score).encode())]
+        return [member for _, member in members]
+
+    def cmd_lpush(self, key, *values):
+        items = self._list(key, create=True)
+        items[:0] = reversed(values)
+        self._touch(key)
+        return len(items)
+
+    def cmd_ltrim(self, key, start, stop):
+        items = self._list(key)
+        if items is None:
+            return "OK"
+        items[:] = items[_list_slice(len(items), start, stop)]
+        self._touch(key)
+        if not items:
+            self._delete(key)
+        return "OK"
+
+    def cmd_lrange(self, key, start, stop):
+        items = self._list(key) or []
+        return items[_list_slice(len(items), start, stop)]
+
+
+def _list_slice(length: int, start: bytes, stop: bytes) -> slice:
+    """
+    LRANGE / LTRIM indexes: inclusive, negative counts from the end.
+    """
+    start, stop = int(start), int(stop)
+    start = max(start + length if start < 0 else start, 0)
+    stop = stop + length if stop < 0 else stop
+    return slice(start, max(stop + 1, start))
+
+
+def _score_bound(raw: bytes) -> tuple[float, bool]:
+    """
+    ZRANGEBYSCORE min/max: "-inf", "+inf", "1.5" or exclusive "(1.5".
+    """
+    text = raw.decode()
+    exclusive = text.startswith("(")
+    return float(text.lstrip("(")), exclusive
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    redis: RedisStub
+
+    def setup(self) -> None:
+        super().setup()
+        self.watched: dict[bytes, int] = {}
+        self.queued: Optional[list] = None
+
+    # --------------------------------------------------
+    # RESP
+    # --------------------------------------------------
+    def _read_command(self) -> Optional[list[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # inline command
+
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def _encode(self, value) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        if value is _ABORTED:
+            return b"*-1\r\n"
+        if isinstance(value, _Error):
+            return f"-{value}\r\n".encode()
+        if isinstance(value, str):
+            return f"+{value}\r\n".encode()
+        if isinstance(value, int):
+            return f":{int(value)}\r\n".encode()
+        if isinstance(value, bytes):
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(self._encode(v) for v in value)
+        raise TypeError(type(value))
+
+    def handle(self) -> None:
+        while True:
+            args = self._read_command()
+            if not args:
+                return
+
+            name, args = args[0].decode().lower(), args[1:]
+            try:
+                reply = self._dispatch(name, args)
+            except _Error as exc:
+                reply = exc
+            except (ValueError, IndexError, TypeError):
+                reply = _Error("ERR syntax error")
+
+            self.wfile.write(self._encode(reply))
+            self.wfile.flush()
+
+    # --------------------------------------------------
+    # Transactions
+    # --------------------------------------------------
+    def _dispatch(self, name: str, args: list[bytes]):
+        redis = self.redis
+
+        if name == "multi":
+            self.queued = []
+            return "OK"
+
+        if name == "discard":
+            self.queued, self.watched = None, {}
+            return "OK"
+
+        if self.queued is not None and name != "exec":
+            self.queued.append((name, args))
+            return "QUEUED"
+
+        with redis.lock:
+            if name == "watch":
+                for key in args:
+                    self.watched[key] = redis.versions.get(key, 0)
+                return "OK"
+
+            if name == "unwatch":
+                self.watched = {}
+                return "OK"
+
+            if name == "exec":
+                queued, watched = self.queued or [], self.watched
+                self.queued, self.watched = None, {}
+                if any(redis.versions.get(k, 0) != v for k, v in watched.items()):
+                    return _ABORTED
+
+                replies = []
+                for cmd, cmd_args in queued:
+                    try:
+                        replies.append(redis.execute(cmd, cmd_args))
+                    except _Error as exc:
+                        replies.append(exc)
+                return replies
+
+            return redis.execute(name, args)
@@ -0,0 +1,242 @@
+"""
+In-process S3 stand-in for benchmarks: enough of the API for minio-py's
+bucket check, put_object (single and multipart) and stat_object.
+
+    with S3Stub(latency=0.02, bandwidth=20e6) as s3:
+        config.S3_ENDPOINT = s3.endpoint
+        ...
+        s3.objects["newspapers/etemad/x.pdf"]
+
+Signatures are not verified. `latency` (seconds) is added to every
+request and `bandwidth` (bytes/s per connection) throttles uploads, so
+parallel uploads behave like they would against a remote endpoint.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree import ElementTree
+
+S3_NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+def _xml(root: str, **fields: str) -> bytes:
+    body = "".join(f"<{k}>{v}</{k}>" for k, v in fields.items())
+    return (
+        f'<?xml version="1.0" encoding="UTF-8"?>'
+        f'<{root} xmlns="{S3_NS}">{body}</{root}>'
+    ).encode()
+
+
+class S3Stub:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        region: str = "us-east-1",
+    ):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.region = region
+
+        self.buckets: set[str] = set()
+        self.objects: dict[str, bytes] = {}
+        self.etags: dict[str, str] = {}
+        self.metadata: dict[str, dict[str, str]] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.upload_metadata: dict[str, dict[str, str]] = {}
+        self.requests: Counter = Counter()
+        self.lock = threading.Lock()
+
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address
+        return f"{host}:{port}"
+
+    def __enter__(self) -> "S3Stub":
+        stub = self
+
+        class Handler(_Handler):
+            s3 = stub
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    s3: S3Stub
+
+    def log_message(self, *args) -> None:
+        pass
+
+    # --------------------------------------------------
+    # Helpers
+    # --------------------------------------------------
+    def _parse(self) -> tuple[str, str, dict]:
+        parts = urlsplit(self.path)
+        bucket, _, key = unquote(parts.path).lstrip("/").partition("/")
+        query = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        return bucket, key, query
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        if self.s3.bandwidth and body:
+            time.sleep(len(body) / self.s3.bandwidth)
+        return body
+
+    def _reply(
+        self,
+        status: int = 200,
+        body: bytes = b"",
+        headers: Optional[dict] = None,
+    ) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if "Content-Length" not in (headers or {}):
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _user_metadata(self) -> dict[str, str]:
+        return {
+            name.lower(): value
+            for name, value in self.headers.items()
+            if name.lower().startswith("x-amz-meta-")
+        }
+
+    def _begin(self) -> tuple[str, str, dict]:
+        if self.s3.latency:
+            time.sleep(self.s3.latency)
+        bucket, key, query = self._parse()
+        with self.s3.lock:
+            self.s3.requests[self.command] += 1
+        return bucket, key, query
+
+    # --------------------------------------------------
+    # Verbs
+    # --------------------------------------------------
+    def do_HEAD(self) -> None:
+        bucket, key, _ = self._begin()
+
+        if not key:
+            return self._reply(200 if bucket in self.s3.buckets else 404)
+
+        name = f"{bucket}/{key}"
+        data = self.s3.objects.get(name)
+        if data is None:
+            return self._reply(404)
+
+        self._reply(headers={
+            "ETag": f'"{self.s3.etags[name]}"',
+            "Content-Length": str(len(data)),
+            "Content-Type": "application/octet-stream",
+            "Last-Modified": formatdate(usegmt=True),
+            **self.s3.metadata.get(name, {}),
+        })
+
+    def do_GET(self) -> None:
+        bucket, key, query = self._begin()
+
+        if not key and "location" in query:
+            return self._reply(body=(
+                f'<LocationConstraint xmlns="{S3_NS}">'
+                f"{self.s3.region}</LocationConstraint>"
+            ).encode())
+
+        data = self.s3.objects.get(f"{bucket}/{key}")
+        if data is None:
+            return self._reply(404)
+        self._reply(body=data)
+
+    def do_PUT(self) -> None:
+        bucket, key, query = self._begin()
+        body = self._body()
+
+        if not key:
+            self.s3.buckets.add(bucket)
+            return self._reply()
+
+        etag = hashlib.md5(body).hexdigest()
+
+        if "uploadId" in query:
+            with self.s3.lock:
+                self.s3.uploads[query["uploadId"]][int(query["partNumber"])] = body
+        else:
+            with self.s3.lock:
+                self.s3.objects[f"{bucket}/{key}"] = body
+                self.s3.etags[f"{bucket}/{key}"] = etag
+                self.s3.metadata[f"{bucket}/{key}"] = self._user_metadata()
+
+        self._reply(headers={"ETag": f'"{etag}"'})
+
+    def do_POST(self) -> None:
+        bucket, key, query = self._begin()
+        body = self._body()
+
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            with self.s3.lock:
+                self.s3.uploads[upload_id] = {}
+                self.s3.upload_metadata[upload_id] = self._user_metadata()
+            return self._reply(body=_xml(
+                "InitiateMultipartUploadResult",
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+            ))
+
+        # CompleteMultipartUpload: assemble the listed parts in order
+        root = ElementTree.fromstring(body)
+        numbers = [
+            int(el.text)
+            for el in root.iter()
+            if el.tag.endswith("PartNumber")
+        ]
+
+        with self.s3.lock:
+            parts = self.s3.uploads.pop(query["uploadId"])
+            data = b"".join(parts[n] for n in sorted(numbers))
+            etag = f"{hashlib.md5(data).hexdigest()}-{len(numbers)}"
+            self.s3.objects[f"{bucket}/{key}"] = data
+            self.s3.etags[f"{bucket}/{key}"] = etag
+            self.s3.metadata[f"{bucket}/{key}"] = self.s3.upload_metadata.pop(
+                query["uploadId"], {}
+            )
+
+        self._reply(body=_xml(
+            "CompleteMultipartUploadResult",
+            Bucket=bucket,
+            Key=key,
+            ETag=f'"{etag}"',
+        ))
+
+    def do_DELETE(self) -> None:
+        bucket, key, query = self._begin()
+
+        with self.s3.lock:
+            if "uploadId" in query:
+                self.s3.uploads.pop(query["uploadId"], None)
+                self.s3.upload_metadata.pop(query["uploadId"], None)
+            else:
+                self.s3.objects.pop(f"{bucket}/{key}", None)
+                self.s3.etags.pop(f"{bucket}/{key}", None)
+                self.s3.metadata.pop(f"{bucket}/{key}", None)
+        self._reply(204)
@@ -0,0 +1,201 @@
+"""
+Local stand-in for the three upstream sites, serving fixture pages and
+synthetic PDFs / zips in the shape the scrapers expect.
+
+    with UpstreamStub(papers=150, latency=0.05) as upstream:
+        EtemadScraper.BASE_URL = upstream.urls["etemad"]
+        ...
+
+Each site gets its own port (the scrapers join absolute paths onto
+BASE_URL). `latency` (seconds) is added to every request; HTML pages
+carry an ETag and answer conditional requests with 304 like the real
+sites. Every PDF differs (a per-paper trailer comment), so content
+dedup only kicks in where it would upstream.
+"""
+import hashlib
+import io
+import threading
+import time
+import zipfile
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks import fixtures
+
+PISHKHAN_DATE = "14050725"  # matches fixtures.PISHKHAN_TODAY
+
+
+def _unique_pdf(base: bytes, tag: str) -> bytes:
+    # Bytes after %%EOF are ignored by readers, but change the sha256
+    return base + f"\n%{tag}\n".encode()
+
+
+class UpstreamStub:
+    def __init__(
+        self,
+        papers: int = 150,
+        latency: float = 0.0,
+        pdf_pages: int = 4,
+        etemad_pages: int = 16,
+        etemad_issue: int = 6123,
+        iran_issue: int = 8456,
+    ):
+        self.papers = papers
+        self.latency = latency
+
+        page_pdf = fixtures.pdf_bytes(pages=pdf_pages, seed=1)
+
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+            for n in range(etemad_pages):
+                zf.writestr(f"page_{n + 1:02d}.pdf", fixtures.pdf_bytes(pages=1, seed=n))
+
+        self.files: dict[str, dict[str, tuple[bytes, str]]] = {
+            "etemad": {
+                "/": (fixtures.etemad_homepage(issue_no=etemad_issue).encode(), "text/html"),
+                "/fa/download-pages": (buf.getvalue(), "application/zip"),
+            },
+            "iran": {
+                "/": (fixtures.iran_homepage(issue_no=iran_issue).encode(), "text/html"),
+                "/files/full.pdf": (_unique_pdf(page_pdf, "iran"), "application/pdf"),
+            },
+            "pishkhan": {
+                "/all": (fixtures.pishkhan_all_page(papers=papers).encode(), "text/html"),
+            },
+        }
+        self.page_pdf = page_pdf
+
+        self.requests: Counter = Counter()
+        self.lock = threading.Lock()
+        self._servers: dict[str, ThreadingHTTPServer] = {}
+
+    @property
+    def urls(self) -> dict[str, str]:
+        return {
+            site: "http://%s:%d" % server.server_address
+            for site, server in self._servers.items()
+        }
+
+    def __enter__(self) -> "UpstreamStub":
+        stub = self
+
+        for site in self.files:
+            class Handler(_Handler):
+                upstream = stub
+                name = site
+
+            server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._servers[site] = server
+
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+
+    # --------------------------------------------------
+    # Pishkhan viewer protocol
+    # --------------------------------------------------
+    def viewer_page(self, paper: str) -> bytes:
+        return (
+            '<html><head><meta charset="utf-8"></head><body>'
+            '<div id="viewer"></div><script>'
+            f"var cfg = {{paper: {paper}, id: {1000 + int(paper)}, date: '{PISHKHAN_DATE}'}};"
+            "</script></body></html>"
+        ).encode()
+
+    def pdf_path(self, form: dict) -> Optional[str]:
+        paper = form.get("paper", "")
+        if not paper.isdigit() or int(paper) >= self.papers:
+            return None
+        return f"/files/{form.get('date')}/{paper}.pdf"
+
+    def paper_pdf(self, path: str) -> Optional[bytes]:
+        paper = path.rsplit("/", 1)[-1].removesuffix(".pdf")
+        if not paper.isdigit() or int(paper) >= self.papers:
+            return None
+        return _unique_pdf(self.page_pdf, f"pishkhan-{paper}")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    upstream: UpstreamStub
+    name: str
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _begin(self) -> str:
+        if self.upstream.latency:
+            time.sleep(self.upstream.latency)
+        path = urlsplit(self.path).path
+        with self.upstream.lock:
+            self.upstream.requests[f"{self.name} {self.command} {path}"] += 1
+        return path
+
+    def _form(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        return {k: v[0] for k, v in parse_qs(body).items()}
+
+    def _reply(self, status: int = 200, body: bytes = b"", content_type: str = "text/plain") -> None:
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+        if status == 200 and content_type == "text/html" and (
+            self.headers.get("If-None-Match") == etag
+        ):
+            status, body = 304, b""
+
+        self.send_response(status)
+        if content_type.startswith("text/"):
+            content_type += "; charset=utf-8"
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _static(self, path: str) -> bool:
+        found = self.upstream.files[self.name].get(path)
+        if found is None:
+            return False
+        self._reply(body=found[0], content_type=found[1])
+        return True
+
+    def do_GET(self) -> None:
+        path = self._begin()
+
+        if self.name == "pishkhan":
+            if path == "/pdfviewer.php":
+                paper = parse_qs(urlsplit(self.path).query).get("paper", [""])[0]
+                return self._reply(body=self.upstream.viewer_page(paper), content_type="text/html")
+
+            if path.startswith("/files/"):
+                data = self.upstream.paper_pdf(path)
+                if data is not None:
+                    return self._reply(body=data, content_type="application/pdf")
+
+        if not self._static(path):
+            self._reply(404)
+
+    do_HEAD = do_GET
+
+    def do_POST(self) -> None:
+        path = self._begin()
+        form = self._form()
+
+        if self.name == "pishkhan" and path == "/tools/PDFFiles/PDFFiles.php":
+            return self._reply(body=(self.upstream.pdf_path(form) or "null").encode())
+
+        if self.name == "etemad" and path == "/fa/download-pages" and not form.get("npn_id"):
+            return self._reply(400)
+
+        if not self._static(path):
+            self._reply(404)
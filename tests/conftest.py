@@ -0,0 +1,40 @@
+import pytest
+
+from app import config
+from app.services import redis_client
+from app.services.clients import get_redis, reset_clients
+from benchmarks.redis_stub import RedisStub
+from benchmarks.s3_stub import S3Stub
+from benchmarks.upstream_stub import UpstreamStub
+
+
+@pytest.fixture
+def services(monkeypatch, tmp_path):
+    """
+    Stand-ins for Redis and MinIO behind the shared clients, with every
+    output directory under tmp_path. Yields (s3, RedisClient).
+    """
+    with S3Stub() as s3, RedisStub() as rs:
+        monkeypatch.setattr(redis_client, "REDIS_HOST", rs.host)
+        monkeypatch.setattr(redis_client, "REDIS_PORT", rs.port)
+        monkeypatch.setattr(config, "S3_ENDPOINT", s3.endpoint)
+        monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path / "output")
+        monkeypatch.setattr(config, "TEMP_DIR", tmp_path / "output" / "tmp")
+        monkeypatch.setattr(config, "PARTIAL_DIR", tmp_path / "output" / "partial")
+        monkeypatch.setattr(config, "METRICS_DIR", tmp_path / "output" / "metrics")
+        monkeypatch.setattr(config, "COVER_RENDER_WORKERS", 0)
+
+        reset_clients()
+        try:
+            yield s3, get_redis()
+        finally:
+            reset_clients()
+
+
+@pytest.fixture
+def stack(services):
+    """
+    services plus the upstream sites. Yields (upstream, s3, RedisClient).
+    """
+    with UpstreamStub(papers=3, latency=0) as upstream:
+        yield (upstream, *services)
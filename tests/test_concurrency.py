@@ -0,0 +1,125 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.concurrency import KeyedLimiter, bounded_map
+
+
+class _Gauge:
+    """
+    Tracks how many calls are in flight, overall and per key.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current: dict = {}
+        self.peak: dict = {}
+
+    def __call__(self, key, seconds: float = 0.02):
+        with self.lock:
+            for k in (None, key):
+                self.current[k] = self.current.get(k, 0) + 1
+                self.peak[k] = max(self.peak.get(k, 0), self.current[k])
+        time.sleep(seconds)
+        with self.lock:
+            for k in (None, key):
+                self.current[k] -= 1
+
+
+def test_results_keep_input_order():
+    def slow_for_small(n):
+        time.sleep(0.01 * (10 - n))
+        return n * n
+
+    assert bounded_map(slow_for_small, range(10), workers=5) == [n * n for n in range(10)]
+
+
+def test_empty_input():
+    assert bounded_map(lambda x: x, [], workers=4) == []
+
+
+def test_workers_cap_concurrency():
+    gauge = _Gauge()
+    bounded_map(lambda i: gauge("host"), range(20), workers=3)
+    assert gauge.peak[None] == 3
+
+
+def test_per_key_limit():
+    gauge = _Gauge()
+    items = [("a.example", i) for i in range(12)] + [("b.example", i) for i in range(12)]
+
+    bounded_map(
+        lambda item: gauge(item[0]),
+        items,
+        workers=8,
+        key=lambda item: item[0],
+        per_key_limit=2,
+    )
+
+    assert gauge.peak["a.example"] <= 2
+    assert gauge.peak["b.example"] <= 2
+    assert gauge.peak[None] > 2  # the two hosts still run side by side
+
+
+def test_first_exception_is_raised():
+    def fail_on_three(n):
+        if n == 3:
+            raise KeyError(n)
+        return n
+
+    with pytest.raises(KeyError):
+        bounded_map(fail_on_three, range(8), workers=4)
+
+    with pytest.raises(KeyError):
+        bounded_map(fail_on_three, range(8), workers=1)
+
+
+def test_keyed_limiter_hold_forgets_released_keys():
+    limiter = KeyedLimiter(1)
+    gauge = _Gauge()
+
+    def work(n):
+        with limiter.hold(n % 2):
+            gauge(n % 2)
+
+    bounded_map(work, range(8), workers=8)
+
+    assert gauge.peak[0] == gauge.peak[1] == 1
+    assert limiter._semaphores == {}
+
+
+def test_keyed_limiter_shares_one_semaphore_per_key():
+    limiter = KeyedLimiter(2)
+    assert limiter.get("a") is limiter.get("a")
+    assert limiter.get("a") is not limiter.get("b")
+
+    with pytest.raises(ValueError):
+        KeyedLimiter(0)
+
+
+# --------------------------------------------------
+# Pishkhan viewer resolution against the local stand-in
+# --------------------------------------------------
+@pytest.mark.parametrize("engine", ["threads", "aiohttp"])
+def test_pishkhan_resolves_viewers_in_order(monkeypatch, engine):
+    from app import config
+    from app.scrapers.pishkhan import PishkhanScraper
+    from benchmarks.upstream_stub import PISHKHAN_DATE, UpstreamStub
+
+    monkeypatch.setattr(config, "PISHKHAN_HTTP_ENGINE", engine)
+    monkeypatch.setattr(config, "PISHKHAN_RESOLVE_WORKERS", 4)
+    monkeypatch.setattr(config, "PISHKHAN_PER_HOST_LIMIT", 2)
+
+    with UpstreamStub(papers=6, latency=0.01) as upstream:
+        scraper = PishkhanScraper()
+        scraper.BASE_URL = upstream.urls["pishkhan"]
+
+        # Papers 6 and 7 have no PDF upstream and are dropped
+        viewers = [f"{scraper.BASE_URL}/pdfviewer.php?paper={n}" for n in (5, 0, 7, 3, 1, 6, 2, 4)]
+        resolved = scraper._resolve_viewers(viewers)
+
+    assert [paper for paper, _, _ in resolved] == ["5", "0", "3", "1", "2", "4"]
+    assert all(date == PISHKHAN_DATE for _, date, _ in resolved)
+    assert resolved[0][2] == f"{scraper.BASE_URL}/files/{PISHKHAN_DATE}/5.pdf"
+    assert upstream.requests["pishkhan GET /pdfviewer.php"] == len(viewers)
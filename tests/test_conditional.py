@@ -0,0 +1,126 @@
+import pytest
+import requests
+
+from app import runner
+from app.scrapers.base import BaseScraper, NotModified
+
+
+class _Store:
+    def __init__(self, **saved):
+        self.saved = dict(saved)
+
+    def get_validators(self, url):
+        return self.saved.get(url)
+
+    def set_validators(self, url, validators):
+        self.saved[url] = validators
+
+
+class _Response:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class _Session:
+    """
+    Records the headers of every GET and answers with `responses` in turn.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent.append(headers or {})
+        return self.responses.pop(0)
+
+
+class _Scraper(BaseScraper):
+    agency = "test"
+
+
+def _iran(upstream):
+    from app.scrapers.iran import IranScraper
+
+    scraper = IranScraper()
+    scraper.BASE_URL = upstream.urls["iran"]
+    return scraper
+
+
+def test_validators_sent_on_the_first_request_of_a_run_only():
+    scraper = _Scraper()
+    scraper.begin_run(_Store(u={"etag": '"v1"', "last_modified": "Fri, 16 Oct 2026"}))
+    session = _Session(_Response(headers={"ETag": '"v2"'}), _Response())
+
+    scraper.conditional_get(session, "u")
+    scraper.conditional_get(session, "u")
+
+    assert session.sent[0] == {"If-None-Match": '"v1"', "If-Modified-Since": "Fri, 16 Oct 2026"}
+    assert session.sent[1] == {}
+
+
+def test_new_validators_wait_for_commit():
+    store = _Store(u={"etag": '"v1"'})
+    scraper = _Scraper()
+    scraper.begin_run(store)
+
+    scraper.conditional_get(_Session(_Response(headers={"ETag": '"v2"'})), "u")
+    assert store.saved["u"] == {"etag": '"v1"'}
+
+    scraper.commit_validators()
+    assert store.saved["u"] == {"etag": '"v2"'}
+
+
+def test_discarded_validators_are_never_stored():
+    store = _Store()
+    scraper = _Scraper()
+    scraper.begin_run(store)
+
+    scraper.conditional_get(_Session(_Response(headers={"ETag": '"v2"'})), "u")
+    scraper.discard_validators()
+    scraper.commit_validators()
+
+    assert store.saved == {}
+
+
+def test_304_raises_not_modified():
+    scraper = _Scraper()
+    scraper.begin_run(_Store(u={"etag": '"v1"'}))
+
+    with pytest.raises(NotModified):
+        scraper.conditional_get(_Session(_Response(304)), "u")
+
+
+def test_unchanged_homepage_skips_the_run(stack, tmp_path):
+    upstream, _, redis = stack
+
+    runner.run(_iran(upstream), "iran", tmp_path)
+    assert redis.get_validators(upstream.urls["iran"])
+    upstream.requests.clear()
+
+    runner.run(_iran(upstream), "iran", tmp_path)
+
+    assert upstream.requests == {"iran GET /": 1}
+    assert len(redis.r.keys("downloaded:iran:*")) == 1
+
+
+def test_failed_run_keeps_the_old_validators(stack, tmp_path):
+    upstream, _, redis = stack
+    pdf = upstream.files["iran"].pop("/files/full.pdf")
+
+    with pytest.raises(requests.HTTPError):
+        runner.run(_iran(upstream), "iran", tmp_path)
+    assert redis.get_validators(upstream.urls["iran"]) is None
+
+    # Next run fetches the homepage in full and stores the issue
+    upstream.files["iran"]["/files/full.pdf"] = pdf
+    upstream.requests.clear()
+    runner.run(_iran(upstream), "iran", tmp_path)
+
+    assert upstream.requests["iran GET /files/full.pdf"] == 1
+    assert len(redis.r.keys("downloaded:iran:*")) == 1
+    assert redis.get_validators(upstream.urls["iran"])
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from app.services import redis_client
+from app.services.content_index import content_entry, duplicate_payload
+from benchmarks.redis_stub import RedisStub
+
+SHA = "ab" * 32
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    with RedisStub() as rs:
+        monkeypatch.setattr(redis_client, "REDIS_HOST", rs.host)
+        monkeypatch.setattr(redis_client, "REDIS_PORT", rs.port)
+        yield redis_client.RedisClient()
+
+
+def _queued_payload() -> dict:
+    # Outbox mode: stored locally, uploads still queued
+    return {
+        "pdf": {"local": "/data/a.pdf", "remote": None},
+        "png": {"local": "/data/a.png", "remote": None},
+        "derivatives": {"600w": {"local": "/data/a-600w.webp", "remote": None}},
+        "sha256": SHA,
+    }
+
+
+def _record(redis, agency, issue_no) -> dict:
+    return json.loads(redis.r.get(redis._download_key(agency, issue_no)))
+
+
+def _store_original(redis):
+    payload = _queued_payload()
+    redis.record_downloads(
+        "pishkhan",
+        [("p1", payload)],
+        {SHA: content_entry("pishkhan", "p1", payload)},
+    )
+    return redis.get_content(SHA)
+
+
+def test_drainer_patches_duplicates_recorded_before_the_upload(redis):
+    entry = _store_original(redis)
+    redis.record_downloads("pishkhan", [("p2", duplicate_payload(entry, SHA, paper="2"))])
+    redis.record_download("iran", "i1", duplicate_payload(entry, SHA))
+
+    redis.patch_remote("pishkhan", "p1", ["pdf"], "s3://b/a.pdf", sha256=SHA)
+    redis.patch_remote("pishkhan", "p1", ["derivatives", "600w"], "s3://b/a-600w.webp", sha256=SHA)
+
+    for agency, issue_no in (("pishkhan", "p1"), ("pishkhan", "p2"), ("iran", "i1")):
+        record = _record(redis, agency, issue_no)
+        assert record["pdf"]["remote"] == "s3://b/a.pdf"
+        assert record["derivatives"]["600w"]["remote"] == "s3://b/a-600w.webp"
+        assert record["png"]["remote"] is None
+
+
+def test_duplicate_recorded_after_the_upload_copies_its_uris(redis):
+    entry = _store_original(redis)
+    # Drained between reading the entry and recording the duplicate
+    redis.patch_remote("pishkhan", "p1", ["pdf"], "s3://b/a.pdf", sha256=SHA)
+
+    redis.record_download("iran", "i1", duplicate_payload(entry, SHA))
+
+    assert _record(redis, "iran", "i1")["pdf"]["remote"] == "s3://b/a.pdf"
+
+
+def test_complete_duplicates_are_not_registered(redis):
+    payload = _queued_payload()
+    payload["pdf"]["remote"] = payload["png"]["remote"] = "s3://b/x"
+    payload["derivatives"]["600w"]["remote"] = "s3://b/y"
+    entry = content_entry("pishkhan", "p1", payload)
+
+    redis.record_download("iran", "i1", duplicate_payload(entry, SHA))
+
+    assert not redis.r.exists(redis._duplicates_key(SHA))
+
+
+def test_missing_cover_does_not_keep_a_duplicate_registered(redis):
+    payload = _queued_payload()
+    payload["pdf"]["remote"] = "s3://b/x"
+    payload["png"] = {"local": None, "remote": None}
+    payload["derivatives"] = {}
+    entry = content_entry("pishkhan", "p1", payload)
+
+    redis.record_download("iran", "i1", duplicate_payload(entry, SHA))
+
+    assert not redis.r.exists(redis._duplicates_key(SHA))
@@ -0,0 +1,184 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app import config
+from app.services import downloader
+from app.services.downloader import stream_download
+
+BODY = b"%PDF-1.4\n" + bytes(range(256)) * 64
+
+
+class _Server:
+    """
+    Serves BODY at /doc.pdf with Range support. `script` holds canned
+    statuses for the next requests ("cut" sends half the body then
+    closes the connection, "head" answers a Range request with a 206
+    for the start of the file).
+    """
+
+    def __init__(self):
+        self.script: list = []
+        self.ranges: list = []
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.peak = max(server.peak, server.in_flight)
+                    action = server.script.pop(0) if server.script else 200
+                    server.ranges.append(self.headers.get("Range"))
+                try:
+                    self._serve(action)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def _serve(self, action):
+                time.sleep(0.02)
+                if isinstance(action, int) and action not in (200, 206):
+                    self.send_response(action)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if action == "head":
+                    body = BODY[:1024]
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes 0-{len(body) - 1}/{len(BODY)}")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                start = 0
+                rng = self.headers.get("Range")
+                if rng and action != 200:
+                    start = int(rng.split("=")[1].rstrip("-"))
+
+                body = BODY[start:]
+                self.send_response(206 if start else 200)
+                if start:
+                    self.send_header("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+
+                if action == "cut":
+                    self.wfile.write(body[: len(body) // 2])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    self.connection.shutdown(2)
+                    return
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = "http://%s:%d/doc.pdf" % self.httpd.server_address
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PARTIAL_DIR", tmp_path / "partial")
+    with _Server() as s:
+        yield s
+
+
+def test_resumes_after_interruption(server, tmp_path):
+    server.script = ["cut", 206]
+    dest = tmp_path / "out" / "doc.pdf"
+
+    with pytest.raises(requests.RequestException):
+        stream_download(requests.Session(), server.url, dest, resume=True, chunk_size=512)
+
+    result = stream_download(requests.Session(), server.url, dest, resume=True, chunk_size=512)
+
+    assert dest.read_bytes() == BODY
+    assert result.resumed_from > 0
+    assert server.ranges[-1] == f"bytes={result.resumed_from}-"
+
+
+def test_range_not_satisfiable_restarts_from_zero(server, tmp_path):
+    part, sidecar = downloader._partial_paths(server.url)
+    part.parent.mkdir(parents=True)
+    part.write_bytes(BODY + b"stale")
+    downloader._write_sidecar(sidecar, {"url": server.url, "etag": '"v0"'})
+
+    server.script = [416, 200]
+    dest = tmp_path / "doc.pdf"
+    result = stream_download(requests.Session(), server.url, dest, resume=True)
+
+    assert dest.read_bytes() == BODY
+    assert result.resumed_from == 0
+    assert server.ranges == [f"bytes={len(BODY) + 5}-", None]
+
+
+def test_206_for_another_range_restarts_from_zero(server, tmp_path):
+    part, sidecar = downloader._partial_paths(server.url)
+    part.parent.mkdir(parents=True)
+    part.write_bytes(BODY[:100])
+    downloader._write_sidecar(sidecar, {"url": server.url, "etag": '"v1"'})
+
+    server.script = ["head", 200]
+    dest = tmp_path / "doc.pdf"
+    result = stream_download(requests.Session(), server.url, dest, resume=True)
+
+    assert dest.read_bytes() == BODY
+    assert result.resumed_from == 0
+    assert server.ranges == ["bytes=100-", None]
+
+
+def test_failure_after_416_leaves_no_stale_partial(server, tmp_path):
+    part, sidecar = downloader._partial_paths(server.url)
+    part.parent.mkdir(parents=True)
+    part.write_bytes(BODY + b"stale")
+    downloader._write_sidecar(sidecar, {"url": server.url})
+
+    server.script = [416, 500]
+    with pytest.raises(requests.HTTPError):
+        stream_download(requests.Session(), server.url, tmp_path / "doc.pdf", resume=True)
+
+    assert not part.exists()
+    assert not sidecar.exists()
+
+
+def test_same_url_downloads_take_turns(server, tmp_path):
+    errors = []
+
+    def fetch(n):
+        try:
+            stream_download(requests.Session(), server.url, tmp_path / f"{n}.pdf", resume=True)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=fetch, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    assert server.peak == 1
+    assert all((tmp_path / f"{n}.pdf").read_bytes() == BODY for n in range(4))
+    # Per-URL locks are dropped once released
+    assert downloader._partial_locks._semaphores == {}
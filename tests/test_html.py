@@ -0,0 +1,34 @@
+from app.scrapers.pishkhan import PishkhanScraper
+from app.utils.html import keep_elements, parse_html
+from benchmarks import fixtures
+
+
+def test_keep_elements_by_tag_attribute():
+    soup = parse_html(
+        '<div><a title="pdf" href="/1">1</a><a title="x" href="/2">2</a>'
+        '<p title="pdf">p</p></div>',
+        keep_elements(attrs=(("a", "title", "pdf"),)),
+    )
+    assert [a["href"] for a in soup.find_all("a")] == ["/1"]
+    assert soup.find("p") is None
+
+
+def test_pishkhan_restricted_parse_finds_todays_viewers():
+    markup = fixtures.pishkhan_all_page(papers=5).encode()
+    scraper = PishkhanScraper()
+
+    restricted = parse_html(markup, PishkhanScraper.ALL_PAGE_NODES)
+    viewers = scraper._collect_viewers(restricted)
+
+    assert viewers == scraper._collect_viewers(parse_html(markup))
+    assert viewers == sorted(
+        f"{scraper.BASE_URL}/pdfviewer.php?paper={n}" for n in range(5)
+    )
+    assert scraper._extract_shamsi_date(restricted) == scraper._extract_shamsi_date(
+        parse_html(markup)
+    )
+    # Only the PDF links (icon + text, 4 days x 5 papers) are built, no
+    # covers or paper blocks
+    assert restricted.find("img") is None
+    assert restricted.find("div", class_="paper-item") is None
+    assert len(restricted.find_all("a")) == 2 * 4 * 5
@@ -0,0 +1,36 @@
+import asyncio
+import contextvars
+
+from app.scrapers.base import run_sync
+from app.services.http_async import HttpResponse
+
+_var = contextvars.ContextVar("var", default=None)
+
+
+async def _answer():
+    await asyncio.sleep(0)
+    return 42, _var.get()
+
+
+def test_run_sync_from_blocking_code():
+    assert run_sync(_answer()) == (42, None)
+
+
+def test_run_sync_inside_a_running_loop():
+    async def caller():
+        _var.set("agency")
+        return run_sync(_answer())
+
+    # The coroutine runs on its own loop and still sees the caller's context
+    assert asyncio.run(caller()) == (42, "agency")
+
+
+def test_text_uses_the_declared_charset():
+    body = "روزنامه".encode("cp1256")
+    assert HttpResponse(200, "http://x", body=body, charset="windows-1256").text == "روزنامه"
+
+
+def test_text_falls_back_to_utf8():
+    body = "روزنامه".encode()
+    assert HttpResponse(200, "http://x", body=body).text == "روزنامه"
+    assert HttpResponse(200, "http://x", body=body, charset="no-such-codec").text == "روزنامه"
@@ -0,0 +1,23 @@
+import statistics
+from pathlib import Path
+
+from benchmarks.bench_import import HEAVY, measure
+
+BUDGET_MS = 150
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_import_main_within_budget(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    runs = [measure() for _ in range(3)]
+
+    loaded = sorted({
+        name.split(".")[0]
+        for r in runs
+        for name in r["modules"]
+        if name.split(".")[0] in HEAVY
+    })
+    assert loaded == []
+
+    median_ms = statistics.median(r["seconds"] for r in runs) * 1000
+    assert median_ms < BUDGET_MS
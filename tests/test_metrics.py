@@ -0,0 +1,29 @@
+import time
+
+from app.utils.metrics import Metrics
+
+
+def test_agency_reset_restarts_report_window():
+    m = Metrics()
+    with m.agency("a"):
+        m.inc("runs_ok")
+    with m.agency("b"):
+        m.inc("runs_ok")
+    first = m.summary()
+
+    time.sleep(0.01)
+    m.reset("a")
+    with m.agency("a"):
+        m.inc("runs_ok")
+    summary = m.summary()
+
+    assert summary["started"] > first["started"]
+    assert summary["agency_started"] == {"a": summary["started"]}
+    assert summary["counters"] == {"a": {"runs_ok": 1}, "b": {"runs_ok": 1}}
+
+
+def test_full_reset_forgets_agency_starts():
+    m = Metrics()
+    m.reset("a")
+    m.reset()
+    assert m.summary()["agency_started"] == {}
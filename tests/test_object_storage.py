@@ -0,0 +1,62 @@
+import pytest
+
+from app import config
+from app.services import redis_client
+from app.services.object_storage import MinIOStorage
+from benchmarks.redis_stub import RedisStub
+from benchmarks.s3_stub import S3Stub
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    with S3Stub() as s3, RedisStub() as rs:
+        monkeypatch.setattr(config, "S3_ENDPOINT", s3.endpoint)
+        monkeypatch.setattr(redis_client, "REDIS_HOST", rs.host)
+        monkeypatch.setattr(redis_client, "REDIS_PORT", rs.port)
+        yield s3, redis_client.RedisClient()
+
+
+@pytest.mark.parametrize("mode", ["manifest", "stat"])
+def test_same_content_under_a_new_key_reuses_the_object(backends, tmp_path, monkeypatch, mode):
+    s3, manifest = backends
+    monkeypatch.setattr(config, "UPLOAD_SKIP_MODE", mode)
+    storage = MinIOStorage(manifest=manifest)
+
+    pdf = tmp_path / "iran-1000.pdf"
+    pdf.write_bytes(b"%PDF-1.4 same bytes")
+
+    first = storage.save(pdf, "iran/2026-10-16/iran-1000.pdf")
+    # A retry or re-processed issue: new timestamped key, same bytes
+    second = storage.save(pdf, "iran/2026-10-16/iran-1042.pdf")
+
+    assert first == second == f"s3://{config.S3_BUCKET}/iran/2026-10-16/iran-1000.pdf"
+    assert len(s3.objects) == 1
+
+
+def test_stat_mode_uploads_when_the_object_is_gone(backends, tmp_path, monkeypatch):
+    s3, manifest = backends
+    monkeypatch.setattr(config, "UPLOAD_SKIP_MODE", "stat")
+    storage = MinIOStorage(manifest=manifest)
+
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4 bytes")
+    storage.save(pdf, "x/a-1.pdf")
+    s3.objects.clear()
+    s3.metadata.clear()
+
+    assert storage.save(pdf, "x/a-2.pdf") == f"s3://{config.S3_BUCKET}/x/a-2.pdf"
+    assert list(s3.objects) == [f"{config.S3_BUCKET}/x/a-2.pdf"]
+
+
+def test_changed_content_is_uploaded(backends, tmp_path, monkeypatch):
+    s3, manifest = backends
+    monkeypatch.setattr(config, "UPLOAD_SKIP_MODE", "manifest")
+    storage = MinIOStorage(manifest=manifest)
+
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4 v1")
+    storage.save(pdf, "x/a-1.pdf")
+    pdf.write_bytes(b"%PDF-1.4 v2")
+
+    assert storage.save(pdf, "x/a-2.pdf").endswith("x/a-2.pdf")
+    assert len(s3.objects) == 2
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import config
+from app.services.release_schedule import (
+    DAY_MINUTES,
+    format_window,
+    in_window,
+    learn_window,
+    next_poll,
+)
+
+UTC = timezone.utc
+
+
+@pytest.fixture(autouse=True)
+def schedule(monkeypatch):
+    monkeypatch.setattr(config, "RELEASE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(config, "RELEASE_WINDOW_COVERAGE", 0.8)
+    monkeypatch.setattr(config, "RELEASE_WINDOW_MARGIN_MINUTES", 30)
+    monkeypatch.setattr(config, "RELEASE_WINDOW_MAX_MINUTES", 4 * 60)
+    monkeypatch.setattr(config, "POLL_FAST_SECONDS", 5 * 60)
+    monkeypatch.setattr(config, "POLL_SLOW_SECONDS", 60 * 60)
+
+
+def _releases(*times: str) -> list[float]:
+    # One release per day at each "HH:MM"
+    day = datetime(2026, 10, 1, tzinfo=UTC)
+    out = []
+    for n, hhmm in enumerate(times):
+        hour, minute = map(int, hhmm.split(":"))
+        out.append((day + timedelta(days=n, hours=hour, minutes=minute)).timestamp())
+    return out
+
+
+def _at(hhmm: str) -> datetime:
+    hour, minute = map(int, hhmm.split(":"))
+    return datetime(2026, 10, 17, hour, minute, tzinfo=UTC)
+
+
+def test_no_window_until_enough_samples():
+    assert learn_window(_releases("06:00", "06:05", "06:10", "06:15"), UTC) is None
+
+
+def test_window_holds_most_releases_plus_margin():
+    # 4 of 5 releases (80%) fall within 06:00-06:15; 07:30 is the outlier
+    window = learn_window(_releases("06:00", "06:05", "07:30", "06:10", "06:15"), UTC)
+    assert window == (5 * 60 + 30, 6 * 60 + 46)
+    assert format_window(window) == "05:30-06:46"
+
+
+def test_window_wraps_past_midnight():
+    window = learn_window(_releases("23:50", "23:55", "00:05", "00:10", "00:15"), UTC)
+    assert window == (23 * 60 + 20, 41)
+    assert format_window(window) == "23:20-00:41"
+
+
+def test_releases_spread_over_the_day_give_no_window():
+    times = ("00:00", "04:00", "08:00", "12:00", "16:00", "20:00")
+    assert learn_window(_releases(*times), UTC) is None
+
+
+def test_window_width_is_capped(monkeypatch):
+    times = ("06:00", "06:30", "07:00", "07:30", "08:00")
+    # 120 minutes of releases + 61 of margin
+    monkeypatch.setattr(config, "RELEASE_WINDOW_COVERAGE", 1.0)
+    assert learn_window(_releases(*times), UTC) == (5 * 60 + 30, 8 * 60 + 31)
+
+    monkeypatch.setattr(config, "RELEASE_WINDOW_MAX_MINUTES", 180)
+    assert learn_window(_releases(*times), UTC) is None
+
+
+def test_in_window():
+    assert in_window((360, 420), 360)
+    assert in_window((360, 420), 419.5)
+    assert not in_window((360, 420), 420)
+    assert not in_window((360, 420), 100)
+
+
+def test_in_window_past_midnight():
+    window = (1400, 41)
+    assert in_window(window, 1420)
+    assert in_window(window, 0)
+    assert in_window(window, 40)
+    assert not in_window(window, 41)
+    assert not in_window(window, 1399)
+    assert not in_window(window, 720)
+
+
+def test_whole_day_window():
+    assert in_window((0, DAY_MINUTES), 0)
+    assert in_window((0, DAY_MINUTES), DAY_MINUTES - 1)
+    assert format_window((0, DAY_MINUTES)) == "all day"
+
+
+def test_next_poll_without_window_is_slow():
+    now = _at("12:00")
+    assert next_poll(now, None, UTC) == now + timedelta(hours=1)
+
+
+def test_next_poll_inside_window_is_fast():
+    now = _at("06:10")
+    assert next_poll(now, (360, 420), UTC) == now + timedelta(minutes=5)
+
+
+def test_next_poll_outside_window_stops_at_its_start():
+    assert next_poll(_at("05:45"), (360, 420), UTC) == _at("06:00")
+    now = _at("12:00")
+    assert next_poll(now, (360, 420), UTC) == now + timedelta(hours=1)
+
+
+def test_next_poll_across_midnight():
+    window = (1400, 41)
+    assert next_poll(_at("23:00"), window, UTC) == _at("23:20")
+    now = _at("00:30")
+    assert next_poll(now, window, UTC) == now + timedelta(minutes=5)
+    now = _at("01:00")
+    assert next_poll(now, window, UTC) == now + timedelta(hours=1)
@@ -0,0 +1,42 @@
+import hashlib
+import json
+
+from app import config, runner
+
+
+def _scraper(cls, upstream, agency):
+    scraper = cls()
+    scraper.BASE_URL = upstream.urls[agency]
+    return scraper
+
+
+def test_pishkhan_run_records_one_release(stack, tmp_path, monkeypatch):
+    from app.scrapers.pishkhan import PishkhanScraper
+
+    upstream, _, redis = stack
+    monkeypatch.setattr(config, "PISHKHAN_RECORD_BATCH", 2)
+
+    runner.run(_scraper(PishkhanScraper, upstream, "pishkhan"), "pishkhan", tmp_path)
+    assert len(redis.r.keys("downloaded:pishkhan:*")) == 3
+    assert len(redis.release_history("pishkhan")) == 1
+
+    # Nothing new: no release
+    runner.run(_scraper(PishkhanScraper, upstream, "pishkhan"), "pishkhan", tmp_path)
+    assert len(redis.release_history("pishkhan")) == 1
+
+
+def test_single_issue_hash_comes_from_the_download(stack, tmp_path, monkeypatch):
+    from app.scrapers.iran import IranScraper
+
+    upstream, _, redis = stack
+
+    def no_rehash(path):
+        raise AssertionError(f"{path} hashed twice")
+
+    monkeypatch.setattr(runner, "sha256_file", no_rehash)
+
+    runner.run(_scraper(IranScraper, upstream, "iran"), "iran", tmp_path)
+
+    body, _ = upstream.files["iran"]["/files/full.pdf"]
+    (key,) = redis.r.keys("downloaded:iran:*")
+    assert json.loads(redis.r.get(key))["sha256"] == hashlib.sha256(body).hexdigest()
@@ -0,0 +1,27 @@
+import socket
+
+from app import main
+from app.services import redis_client
+
+
+def _closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_status_without_redis_prints_one_line_no_traceback(monkeypatch, capfd, caplog):
+    monkeypatch.setattr(redis_client, "REDIS_HOST", "127.0.0.1")
+    monkeypatch.setattr(redis_client, "REDIS_PORT", _closed_port())
+
+    assert main.status() == 1
+
+    out, _ = capfd.readouterr()
+    assert out.splitlines()[-1].endswith("unreachable")
+    assert [(r.levelname, r.exc_info) for r in caplog.records] == [("WARNING", None)]
+
+
+def test_status_with_redis(services, capfd):
+    _, redis = services
+    assert main.status() == 0
+    assert "ok, 0 uploads queued" in capfd.readouterr().out
@@ -0,0 +1,157 @@
+import json
+import time
+
+import pytest
+
+from app import config
+from app.services import redis_client
+from app.services.clients import get_storage
+from app.services.content_index import content_entry, duplicate_payload
+from app.services.upload_outbox import UploadOutbox
+
+SHA = "cd" * 32
+
+
+class _FailingRemote:
+    def __init__(self):
+        self.calls = 0
+
+    def save(self, local, key):
+        self.calls += 1
+        return None
+
+
+class _FailingStorage:
+    def __init__(self):
+        self.remote = _FailingRemote()
+
+
+@pytest.fixture
+def outbox(services, monkeypatch):
+    monkeypatch.setattr(config, "OUTBOX_BACKOFF_SECONDS", 30)
+    monkeypatch.setattr(config, "OUTBOX_BACKOFF_MAX_SECONDS", 100)
+    s3, redis = services
+    return UploadOutbox(redis, get_storage()), redis, s3
+
+
+def _record(redis, agency, issue_no) -> dict:
+    return json.loads(redis.r.get(redis._download_key(agency, issue_no)))
+
+
+def _store_queued(redis, tmp_path, agency="etemad", issue_no="e1"):
+    pdf = tmp_path / f"{issue_no}.pdf"
+    pdf.write_bytes(b"%PDF-1.4 " + issue_no.encode())
+    payload = {
+        "pdf": {"local": str(pdf), "remote": None},
+        "png": {"local": None, "remote": None},
+        "derivatives": {},
+        "sha256": SHA,
+    }
+    redis.record_downloads(agency, [(issue_no, payload)], {SHA: content_entry(agency, issue_no, payload)})
+    return pdf, payload
+
+
+def test_drain_uploads_and_patches_record_index_and_duplicates(outbox, tmp_path):
+    box, redis, s3 = outbox
+    pdf, _ = _store_queued(redis, tmp_path)
+    redis.record_download("iran", "i1", duplicate_payload(redis.get_content(SHA), SHA))
+
+    box.enqueue("etemad", "e1", [(pdf, "etemad/e1.pdf", "pdf")], sha256=SHA)
+    assert box.drain_once() == 1
+
+    uri = f"s3://{config.S3_BUCKET}/etemad/e1.pdf"
+    assert _record(redis, "etemad", "e1")["pdf"]["remote"] == uri
+    assert redis.get_content(SHA)["pdf"]["remote"] == uri
+    assert _record(redis, "iran", "i1")["pdf"]["remote"] == uri
+    assert redis.pending_uploads() == 0
+    assert len(s3.objects) == 1
+
+
+def test_upload_of_an_expired_record_still_completes(outbox, tmp_path):
+    box, redis, _ = outbox
+    pdf = tmp_path / "gone.pdf"
+    pdf.write_bytes(b"%PDF-1.4 gone")
+
+    box.enqueue("etemad", "gone", [(pdf, "etemad/gone.pdf", "pdf")])
+    box.drain_once()
+
+    assert not redis.r.exists(redis._download_key("etemad", "gone"))
+    assert redis.pending_uploads() == 0
+
+
+def test_lost_local_file_drops_the_job(outbox, tmp_path):
+    box, redis, s3 = outbox
+    pdf, _ = _store_queued(redis, tmp_path)
+    box.enqueue("etemad", "e1", [(pdf, "etemad/e1.pdf", "pdf")], sha256=SHA)
+    pdf.unlink()
+
+    assert box.drain_once() == 1
+    assert redis.pending_uploads() == 0
+    assert _record(redis, "etemad", "e1")["pdf"]["remote"] is None
+    assert not s3.objects
+
+
+def test_failed_upload_backs_off_exponentially(outbox, tmp_path):
+    _, redis, _ = outbox
+    box = UploadOutbox(redis, _FailingStorage())
+    pdf, _ = _store_queued(redis, tmp_path)
+    box.enqueue("etemad", "e1", [(pdf, "etemad/e1.pdf", "pdf")], sha256=SHA)
+
+    delays = []
+    for _ in range(4):
+        started = time.time()
+        (job,) = redis.claim_uploads(now=started + 10**6, limit=10, lease=60)
+        box._process(job)
+        due = redis.r.zscore(redis._outbox_key(), job["id"])
+        delays.append(round(due - started))
+
+    assert delays == [30, 60, 100, 100]  # capped by OUTBOX_BACKOFF_MAX_SECONDS
+    (job,) = redis.claim_uploads(now=time.time() + 10**6, limit=10, lease=60)
+    assert job["attempts"] == 4
+    assert box.storage.remote.calls == 4
+    assert box.drain_once() == 0  # nothing due yet
+
+
+def test_concurrent_claim_never_shares_a_job(outbox, tmp_path):
+    _, redis, _ = outbox
+    box = UploadOutbox(redis, get_storage())
+    files = []
+    for n in range(3):
+        path = tmp_path / f"{n}.pdf"
+        path.write_bytes(b"%PDF")
+        files.append((path, f"etemad/{n}.pdf", "pdf"))
+    box.enqueue("etemad", "e1", files)
+
+    other = redis_client.RedisClient()
+    now = time.time()
+    raced = []
+
+    # Another drainer claims between this one's WATCH and EXEC
+    real_pipeline = redis.r.pipeline
+
+    def pipeline(*args, **kwargs):
+        pipe = real_pipeline(*args, **kwargs)
+        real_range = pipe.zrangebyscore
+
+        def zrangebyscore(*a, **kw):
+            ids = real_range(*a, **kw)
+            if not raced:
+                raced.append(other.claim_uploads(now=now, limit=10, lease=60))
+            return ids
+
+        pipe.zrangebyscore = zrangebyscore
+        return pipe
+
+    redis.r.pipeline = pipeline
+    try:
+        mine = redis.claim_uploads(now=now, limit=10, lease=60)
+    finally:
+        del redis.r.pipeline
+
+    assert len(raced[0]) == 3
+    assert mine == []
+    # The lease pushed every job past `now`
+    assert all(
+        score == now + 60
+        for _, score in redis.r.zrangebyscore(redis._outbox_key(), "-inf", "+inf", withscores=True)
+    )